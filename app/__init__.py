@@ -8,6 +8,9 @@ from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from app.config import config
 from app.database.base import db, migrate, login_man
+from app.utils.cache import init_cache
+from app.utils.tasks import init_tasks
+from app.utils.pubsub import init_pubsub
 
 
 def create_app(config_name=None):
@@ -26,15 +29,35 @@ def create_app(config_name=None):
     db.init_app(app)
     migrate.init_app(app, db)
     login_man.init_app(app)
+    init_cache(app)
+    init_tasks(app)
+    init_pubsub(app)
     
     # Configure login manager
     login_man.login_view = "auth.login"
     login_man.login_message = "Silakan login untuk mengakses halaman ini."
     login_man.login_message_category = "info"
     
-    # Create database tables
+    # Create database tables and prepare the search indexes
     with app.app_context():
+        from app.database import models  # noqa: F401 - registers the tables
         db.create_all()
+        from app.services.search_index import init_search
+        from app.services.suggestion_index import init_suggestions
+        from app.services.view_counter import init_views
+        from app.services.stats_service import init_stats
+        from app.services.last_seen import init_last_seen
+        from app.services.notification_dispatcher import init_notifications
+        from app.services.notification_streams import init_notification_streams
+        from app.services.audit_sink import init_audit
+        init_search(app)
+        init_suggestions(app)
+        init_views(app)
+        init_stats(app)
+        init_last_seen(app)
+        init_notifications(app)
+        init_notification_streams(app)
+        init_audit(app)
     
     # Register blueprints
     register_blueprints(app)
@@ -323,13 +346,8 @@ def register_context_processors(app):
         """Inject user statistics if logged in."""
         from flask_login import current_user
         if current_user.is_authenticated:
-            # Avoid circular imports by using current_user methods directly
-            return dict(
-                unread_notifications=current_user.notifications.filter_by(is_read=False).count() if hasattr(current_user, 'notifications') else 0,
-                user_projects_count=current_user.projects.count() if hasattr(current_user, 'projects') else 0,
-                user_kebutuhan_count=current_user.kebutuhan.count() if hasattr(current_user, 'kebutuhan') else 0,
-                user_supports_count=current_user.dukungan.count() if hasattr(current_user, 'dukungan') else 0
-            )
+            from app.services.user_service import get_user_counts
+            return get_user_counts(current_user.id)
         return dict(
             unread_notifications=0,
             user_projects_count=0,
@@ -342,7 +360,7 @@ def register_context_processors(app):
         """Inject utility functions."""
         def get_categories():
             # Import here to avoid circular imports
-            from app.database.models import Kategori
-            return Kategori.query.order_by(Kategori.nama).all()
+            from app.services.category_service import get_category_catalog
+            return get_category_catalog()
         
         return dict(get_categories=get_categories)
\ No newline at end of file
@@ -30,6 +30,8 @@ class Config:
     # Pagination
     ITEMS_PER_PAGE = 12
     ITEMS_PER_PAGE_ADMIN = 20
+    PAGINATION_EXACT_COUNT_LIMIT = 10000  # Larger totals may be estimated
+    PAGINATION_COUNT_CACHE_TTL = 300  # Seconds a large count is reused off PostgreSQL
     MAX_SEARCH_RESULTS = 100
     
     # Session config
@@ -71,12 +73,77 @@ class Config:
     ENABLE_AUDIT_LOG = os.environ.get('ENABLE_AUDIT_LOG', 'true').lower() in ['true', 'on', '1']
     
     # Cache settings
+    # null, simple (per-process LRU), shared (file, all workers) or redis
     CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'simple'
     CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_MAX_SIZE = 1024  # Entries per process for the simple cache
+    CACHE_PATH = os.environ.get('CACHE_PATH')  # Shared cache file, temp dir by default
+    CACHE_SHARED_MAX_SIZE = 10000
     
     # Search settings
     ELASTICSEARCH_URL = os.environ.get('ELASTICSEARCH_URL')
     SEARCH_MIN_LENGTH = 2
+    # auto (pick by database), postgresql, sqlite (FTS5) or memory
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND') or 'auto'
+    SEARCH_MAX_RESULTS = 1000  # Cap on ranked hits for the memory backend
+    SEARCH_INDEX_BATCH_SIZE = 500  # Documents per incremental index write
+    # Autocomplete snapshot shared by worker processes; None keeps it in memory
+    SUGGEST_SNAPSHOT_PATH = os.environ.get('SUGGEST_SNAPSHOT_PATH') or os.path.join(basedir, 'suggestions.idx')
+    SUGGEST_MAX_CANDIDATES = 1000  # Entries kept per autocomplete prefix, highest weight first
+    SUGGEST_DELTA_LIMIT = 500  # Changed entries kept beside the snapshot before they are merged into it
+    SUGGEST_FLUSH_INTERVAL = 1  # Seconds between applying committed changes to the index
+    
+    # View counts
+    VIEW_FLUSH_INTERVAL = 5  # Seconds between batched view count writes
+    VIEW_MAX_PENDING = 10000  # Buffered rows that trigger an early write
+    
+    # Daily stats rollup
+    STATS_FLUSH_INTERVAL = 5  # Seconds between batched daily_stats writes
+    STATS_MAX_PENDING = 10000  # Buffered rollup rows that trigger an early write
+    
+    # Last seen tracking
+    LAST_SEEN_GRANULARITY = 300  # Seconds before last_seen is written again
+    LAST_SEEN_FLUSH_INTERVAL = 30  # Seconds between bulk last_seen writes
+    LAST_SEEN_MAX_PENDING = 10000
+    
+    # Background jobs
+    # sync (inline), sqlite (durable local queue) or rq
+    TASK_BACKEND = os.environ.get('TASK_BACKEND') or 'sync'
+    TASK_QUEUE_PATH = os.environ.get('TASK_QUEUE_PATH')  # SQLite queue file, temp dir by default
+    TASK_REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
+    TASK_WORKER_THREADS = 1  # Worker threads per process serving requests; 0 leaves jobs to `flask task-worker`
+    TASK_MAX_RETRIES = 3
+    TASK_RETRY_BACKOFF = 5  # Seconds before the first retry, doubled for each further retry
+    TASK_POLL_INTERVAL = 1  # Seconds between checks of an idle queue
+    TASK_TIMEOUT = 600  # Seconds before a job left running is queued again
+    
+    # Notification fan-out
+    NOTIFICATION_FLUSH_INTERVAL = 1  # Seconds between background inserts
+    NOTIFICATION_BATCH_SIZE = 500  # Queued notifications that trigger an early insert
+    NOTIFICATION_CHUNK_SIZE = 1000  # Users per INSERT/COPY in bulk_create_notifications
+    
+    # Notification push (Server-Sent Events)
+    # memory (per-process) or redis (shared by every worker)
+    PUBSUB_TYPE = os.environ.get('PUBSUB_TYPE') or 'memory'
+    PUBSUB_REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
+    NOTIFICATION_STREAM_KEEPALIVE = 15  # Seconds between keep-alive comments
+    NOTIFICATION_STREAM_TIMEOUT = 300  # Seconds before a stream is closed; browsers reconnect
+    # Each open stream holds a gunicorn thread (16 per worker); keep the rest for requests
+    NOTIFICATION_STREAMS_PER_WORKER = 8  # Open streams per process
+    NOTIFICATION_STREAMS_PER_USER = 2  # Open streams per user and process; tabs share one
+    NOTIFICATION_POLL_INTERVAL = 60  # Seconds between unread count polls when a stream is refused
+    
+    # Audit log writes
+    AUDIT_FLUSH_INTERVAL = 2  # Seconds between batched inserts
+    AUDIT_BUFFER_SIZE = 1000  # Buffered entries that trigger an early insert
+    AUDIT_SPOOL = True  # Keep unwritten entries in a local spool file
+    AUDIT_SPOOL_DIR = os.environ.get('AUDIT_SPOOL_DIR')  # Temp dir by default
+    AUDIT_SPOOL_FSYNC = False  # fsync every entry; survives power loss, not just crashes
+    AUDIT_PARTITIONS_AHEAD = 3  # Monthly audit_logs partitions prepared ahead (PostgreSQL)
+    
+    # Retention jobs
+    RETENTION_BATCH_SIZE = 5000  # Primary key values per DELETE batch
+    RETENTION_BATCH_SLEEP = 0.1  # Seconds between batches
     
     # Admin settings
     ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL') or 'admin@komunitech.id'
@@ -170,6 +237,22 @@ class TestConfig(Config):
     
     # Faster password hashing for tests
     BCRYPT_LOG_ROUNDS = 4
+    
+    # Keep the autocomplete snapshot in memory
+    SUGGEST_SNAPSHOT_PATH = None
+    
+    # Run background jobs inline
+    TASK_BACKEND = 'sync'
+    
+    # Write buffered suggestion changes, view counts, daily stats, last_seen,
+    # notifications and audit logs only when flushed explicitly
+    SUGGEST_FLUSH_INTERVAL = None
+    VIEW_FLUSH_INTERVAL = None
+    STATS_FLUSH_INTERVAL = None
+    LAST_SEEN_FLUSH_INTERVAL = None
+    NOTIFICATION_FLUSH_INTERVAL = None
+    AUDIT_FLUSH_INTERVAL = None
+    AUDIT_SPOOL = False
 
 
 class ProdConfig(Config):
@@ -191,6 +274,12 @@ class ProdConfig(Config):
     CACHE_TYPE = 'redis'
     CACHE_REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
     
+    # Push notifications to streams held by any worker
+    PUBSUB_TYPE = 'redis'
+    
+    # Run background jobs outside the request
+    TASK_BACKEND = os.environ.get('TASK_BACKEND') or 'sqlite'
+    
     # Email verification required in production
     ENABLE_EMAIL_VERIFICATION = True
     
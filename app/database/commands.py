@@ -1,9 +1,23 @@
 # /your_project_directory/your_app_module/commands.py
 
+import multiprocessing
+
 import click
+from flask import current_app
 from flask.cli import with_appcontext
 from .base import db  # Assuming db is in base.py
 from .models import Pengguna, Kategori  # Assuming models are in models.py
+from app.services.kebutuhan_service import recount_kebutuhan_counters
+from app.services.comment_service import rebuild_comment_depths
+from app.services.search_index import reindex
+from app.services.suggestion_index import rebuild_suggestions
+from app.services.stats_service import rollup_daily_stats
+from app.services.file_service import cleanup_temp_files
+from app.services.notification_service import delete_old_notifications, recount_unread_notifications
+from app.services.audit_service import clean_old_audit_logs
+from app.services.audit_actions import backfill_action_ids
+from .partitions import ensure_audit_partitions, is_partitioned, list_partitions, partition_audit_logs
+from app.utils.tasks import SQLiteTaskQueue, get_job, get_task_queue
 
 
 @click.command(name="seed-db")
@@ -58,6 +72,177 @@ def seed_db_command():
     click.echo("Database seeded successfully!")
 
 
+@click.command(name="recount-counters")
+@with_appcontext
+def recount_counters_command():
+    """Recomputes denormalized counters and comment depths from their source tables."""
+    click.echo("Recounting kebutuhan support/comment counters...")
+    corrected = recount_kebutuhan_counters()
+    click.echo(f"Corrected {corrected} kebutuhan row(s).")
+    click.echo("Rebuilding comment depths...")
+    corrected = rebuild_comment_depths()
+    click.echo(f"Corrected {corrected} comment(s).")
+    click.echo("Recounting unread notification counters...")
+    corrected = recount_unread_notifications()
+    click.echo(f"Corrected {corrected} user(s).")
+    click.echo("Linking audit logs to their actions...")
+    corrected = backfill_action_ids()
+    click.echo(f"Corrected {corrected} audit log(s).")
+
+
+@click.command(name="search-reindex")
+@click.option("--since", type=click.DateTime(), default=None,
+              help="Only reindex rows changed at or after this time.")
+@with_appcontext
+def search_reindex_command(since):
+    """Backfills the full-text search and autocomplete indexes from the source tables."""
+    if since is None:
+        click.echo("Rebuilding the search index...")
+    else:
+        click.echo(f"Reindexing documents changed since {since}...")
+    total = reindex(since)
+    click.echo(f"Indexed {total} document(s).")
+    click.echo("Rebuilding autocomplete suggestions...")
+    total = rebuild_suggestions()
+    click.echo(f"Indexed {total} suggestion(s).")
+
+
+@click.command(name="rollup-stats")
+@click.option("--since", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Only recompute days from this date on.")
+@with_appcontext
+def rollup_stats_command(since):
+    """Recomputes the daily_stats rollup from the source tables."""
+    click.echo("Rolling up daily statistics...")
+    total = rollup_daily_stats(since.date() if since else None)
+    click.echo(f"Wrote {total} daily stat row(s).")
+
+
+def _run_worker(burst):
+    # Forked children must not reuse the parent's database connections
+    db.engine.dispose(close=False)
+    get_task_queue().work(burst=burst)
+
+
+@click.command(name="task-worker")
+@click.option("--processes", default=1, show_default=True, help="Worker processes to run.")
+@click.option("--burst", is_flag=True, help="Exit once no job is due.")
+@with_appcontext
+def task_worker_command(processes, burst):
+    """Runs background jobs from the SQLite task queue."""
+    queue = get_task_queue()
+    if not isinstance(queue, SQLiteTaskQueue):
+        raise click.ClickException("task-worker only drains the sqlite backend; use `rq worker` for rq.")
+
+    click.echo(f"Starting {processes} task worker(s) on {queue.path}...")
+    if processes == 1:
+        _run_worker(burst)
+        return
+
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_run_worker, args=(burst,)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+@click.command(name="task-status")
+@click.argument("job_id", required=False)
+@with_appcontext
+def task_status_command(job_id):
+    """Shows one job, or the number of jobs per status."""
+    if job_id is None:
+        for status, count in sorted(get_task_queue().stats().items()):
+            click.echo(f"{status}: {count}")
+        return
+
+    job = get_job(job_id)
+    if job is None:
+        raise click.ClickException(f"Unknown job {job_id}")
+    for key, value in job.items():
+        click.echo(f"{key}: {value}")
+
+
+@click.command(name="cleanup")
+@click.option("--temp-hours", default=24, show_default=True, help="Age of temp uploads to delete.")
+@click.option("--notification-days", default=30, show_default=True, help="Age of notifications to delete.")
+@click.option("--audit-days", default=365, show_default=True, help="Age of audit logs to delete.")
+@with_appcontext
+def cleanup_command(temp_hours, notification_days, audit_days):
+    """Queues the cleanup jobs for temp uploads, notifications and audit logs."""
+    click.echo(f"Queued temp upload cleanup: {cleanup_temp_files(temp_hours)}")
+    click.echo(f"Queued notification cleanup: {delete_old_notifications(notification_days)}")
+    click.echo(f"Queued audit log cleanup: {clean_old_audit_logs(audit_days)}")
+
+
+@click.command(name="audit-partitions")
+@click.option("--months-ahead", type=int, default=None,
+              help="Months of partitions to prepare [default: AUDIT_PARTITIONS_AHEAD].")
+@with_appcontext
+def audit_partitions_command(months_ahead):
+    """Partitions audit_logs by month on PostgreSQL and prepares the coming months."""
+    if db.engine.dialect.name != "postgresql":
+        click.echo("audit_logs is only partitioned on PostgreSQL.")
+        return
+    if months_ahead is None:
+        months_ahead = current_app.config.get("AUDIT_PARTITIONS_AHEAD", 3)
+
+    with db.engine.begin() as connection:
+        if not is_partitioned(connection):
+            click.echo("Converting audit_logs to a partitioned table...")
+            click.echo(f"Copied {partition_audit_logs(connection, months_ahead)} audit log(s).")
+        created = ensure_audit_partitions(connection, months_ahead)
+        click.echo(f"Created {created} partition(s); {len(list_partitions(connection))} in total.")
+
+
+@click.group(name="prune")
+def prune_group():
+    """Deletes expired notifications and audit logs in bounded batches."""
+
+
+def _prune_options(default_days):
+    def decorate(f):
+        f = click.option("--dry-run", is_flag=True, help="Only count the rows that would be deleted.")(f)
+        f = click.option("--sleep", type=float, default=None,
+                         help="Seconds between batches [default: RETENTION_BATCH_SLEEP].")(f)
+        f = click.option("--batch-size", type=int, default=None,
+                         help="Primary key values per batch [default: RETENTION_BATCH_SIZE].")(f)
+        f = click.option("--days", default=default_days, show_default=True, help="Age of rows to delete.")(f)
+        return f
+    return decorate
+
+
+def _report_prune(what, count, dry_run):
+    click.echo(f"Would delete {count} {what}." if dry_run else f"Deleted {count} {what}.")
+
+
+@prune_group.command(name="notifications")
+@_prune_options(30)
+@with_appcontext
+def prune_notifications_command(days, batch_size, sleep, dry_run):
+    """Deletes notifications older than --days."""
+    count = delete_old_notifications.run(days, batch_size=batch_size, sleep=sleep, dry_run=dry_run)
+    _report_prune("notification(s)", count, dry_run)
+
+
+@prune_group.command(name="audit-logs")
+@_prune_options(365)
+@with_appcontext
+def prune_audit_logs_command(days, batch_size, sleep, dry_run):
+    """Deletes audit logs older than --days."""
+    count = clean_old_audit_logs.run(days, batch_size=batch_size, sleep=sleep, dry_run=dry_run)
+    _report_prune("audit log(s)", count, dry_run)
+
+
 def register_commands(app):
     """Registers CLI commands with the Flask app."""
     app.cli.add_command(seed_db_command)
+    app.cli.add_command(recount_counters_command)
+    app.cli.add_command(search_reindex_command)
+    app.cli.add_command(rollup_stats_command)
+    app.cli.add_command(task_worker_command)
+    app.cli.add_command(task_status_command)
+    app.cli.add_command(cleanup_command)
+    app.cli.add_command(audit_partitions_command)
+    app.cli.add_command(prune_group)
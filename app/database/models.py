@@ -1,11 +1,20 @@
 # app/database/models.py - Complete Fixed Version
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import event, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import now
 from .base import db, login_man
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
 
+@compiles(now, "sqlite")
+def _sqlite_now(element, compiler, **kw):
+    # SQLite compares timestamps as text; CURRENT_TIMESTAMP drops the
+    # microseconds the DateTime type writes, so the two would not order
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
 class Pengguna(UserMixin, db.Model):
     __tablename__ = "users"
 
@@ -23,6 +32,8 @@ class Pengguna(UserMixin, db.Model):
     last_seen = db.Column(db.DateTime, default=func.now())
     is_active = db.Column(db.Boolean, default=True)
     email_verified = db.Column(db.Boolean, default=False)
+    # Denormalized counter, kept in sync by notification_service
+    unread_notification_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
     
     # Relationships - Fixed with foreign_keys specification
     projects = db.relationship("Project", backref="pemilik", lazy="dynamic", cascade="all, delete-orphan")
@@ -74,9 +85,9 @@ class Pengguna(UserMixin, db.Model):
         return self.role == "Developer"
     
     def update_last_seen(self):
-        self.last_seen = datetime.utcnow()
-        db.session.add(self)
-        db.session.commit()
+        # Coalesced and written in batches by the last_seen tracker
+        from app.services.last_seen import touch_user
+        touch_user(self)
     
     def get_notifications(self, unread_only=False):
         query = self.notifications
@@ -133,6 +144,11 @@ class Project(db.Model):
     gambar_url = db.Column(db.String(200))
     view_count = db.Column(db.Integer, default=0)
     
+    __table_args__ = (
+        # Listings by status, newest first
+        db.Index('ix_projects_status_timestamp', 'status', 'timestamp'),
+    )
+    
     # Relationships
     kebutuhan = db.relationship(
         "Kebutuhan", backref="project", lazy="dynamic", cascade="all, delete-orphan"
@@ -144,14 +160,28 @@ class Project(db.Model):
     def __repr__(self):
         return f"<Project {self.judul}>"
     
+    # Populated in bulk by project_service.load_project_aggregates();
+    # cleared whenever the instance is expired or refreshed.
+    _aggregates = None
+
+    @property
+    def kebutuhan_count(self):
+        if self._aggregates is not None:
+            return self._aggregates["kebutuhan_count"]
+        return self.kebutuhan.count()
+
     @property
     def total_support(self):
-        return db.session.query(func.sum(Kebutuhan.jumlah_dukungan)).filter(
+        if self._aggregates is not None:
+            return self._aggregates["total_support"]
+        return db.session.query(func.sum(Kebutuhan.support_count)).filter(
             Kebutuhan.project_id == self.id
         ).scalar() or 0
     
     @property
     def completion_percentage(self):
+        if self._aggregates is not None:
+            return self._aggregates["completion_percentage"]
         total = self.kebutuhan.count()
         if total == 0:
             return 0
@@ -159,9 +189,9 @@ class Project(db.Model):
         return int((completed / total) * 100)
     
     def increment_views(self):
-        self.view_count += 1
-        db.session.add(self)
-        db.session.commit()
+        # Buffered and written in batches by the view counter
+        from app.services.view_counter import record_view
+        record_view(self)
     
     def is_collaborator(self, user_id):
         return self.collaborators.filter_by(user_id=user_id).first() is not None
@@ -170,6 +200,12 @@ class Project(db.Model):
         return user.id == self.pengguna_id or user.is_admin or self.is_collaborator(user.id)
 
 
+@event.listens_for(Project, "expire")
+@event.listens_for(Project, "refresh")
+def _reset_project_aggregates(target, *args):
+    target._aggregates = None
+
+
 class Kebutuhan(db.Model):
     __tablename__ = "requirements"
 
@@ -187,11 +223,21 @@ class Kebutuhan(db.Model):
     prioritas = db.Column(db.String(20), default="Sedang")
     gambar_url = db.Column(db.String(200))
     view_count = db.Column(db.Integer, default=0)
+    # Denormalized counters, kept in sync by support_service/comment_service
+    support_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    comment_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
     # Tracking fields
     processed_at = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
     processed_by = db.Column(db.Integer, db.ForeignKey("users.id"))
     
+    __table_args__ = (
+        # A project's kebutuhan by status
+        db.Index('ix_requirements_project_status', 'project_id', 'status'),
+        # Listings by status, newest first
+        db.Index('ix_requirements_status_timestamp', 'status', 'timestamp'),
+    )
+    
     # Relationships
     komentar = db.relationship(
         "Komentar",
@@ -211,16 +257,16 @@ class Kebutuhan(db.Model):
 
     @property
     def jumlah_dukungan(self):
-        return self.dukungan.count()
+        return self.support_count or 0
     
     @property
     def jumlah_komentar(self):
-        return self.komentar.count()
+        return self.comment_count or 0
     
     def increment_views(self):
-        self.view_count += 1
-        db.session.add(self)
-        db.session.commit()
+        # Buffered and written in batches by the view counter
+        from app.services.view_counter import record_view
+        record_view(self)
     
     def update_status(self, new_status, user_id=None):
         old_status = self.status
@@ -253,6 +299,13 @@ class Komentar(db.Model):
     
     # For threaded comments
     parent_id = db.Column(db.Integer, db.ForeignKey("comments.id"))
+    # Nesting level (0 for top-level comments), set by comment_service
+    depth = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    
+    __table_args__ = (
+        # A kebutuhan's thread, top-level comments or replies, in order
+        db.Index('ix_comments_kebutuhan_parent_timestamp', 'kebutuhan_id', 'parent_id', 'timestamp'),
+    )
     replies = db.relationship(
         "Komentar", backref=db.backref("parent", remote_side=[id]),
         lazy="dynamic", cascade="all, delete-orphan"
@@ -281,6 +334,8 @@ class Dukungan(db.Model):
     # Unique constraint to prevent duplicate supports
     __table_args__ = (
         db.UniqueConstraint('pengguna_id', 'kebutuhan_id', name='unique_user_requirement_support'),
+        # Supporters of a kebutuhan, newest first, and trending windows
+        db.Index('ix_supports_kebutuhan_timestamp', 'kebutuhan_id', 'timestamp'),
     )
 
     def __repr__(self):
@@ -315,7 +370,13 @@ class Notification(db.Model):
     message = db.Column(db.Text)
     link = db.Column(db.String(200))
     is_read = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=func.now())
+    created_at = db.Column(db.DateTime, index=True, default=func.now())
+    
+    __table_args__ = (
+        # Per-user listings, all or unread only, newest first
+        db.Index('ix_notifications_user_created', 'user_id', 'created_at'),
+        db.Index('ix_notifications_user_read_created', 'user_id', 'is_read', 'created_at'),
+    )
     
     def __repr__(self):
         return f"<Notification {self.type} for {self.user_id}>"
@@ -340,19 +401,123 @@ class ProjectCollaborator(db.Model):
         return f"<ProjectCollaborator {self.user_id} on {self.project_id}>"
 
 
+class AuditAction(db.Model):
+    """Lookup of audit action names, so action filters are equality matches."""
+    __tablename__ = "audit_actions"
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    
+    def __repr__(self):
+        return f"<AuditAction {self.name}>"
+
+
 class AuditLog(db.Model):
+    """Append-only audit trail.
+
+    On PostgreSQL the table is partitioned by month on ``timestamp``, see
+    app.database.partitions.
+    """
     __tablename__ = "audit_logs"
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     action = db.Column(db.String(100), nullable=False)
+    # Set from ``action`` on insert
+    action_id = db.Column(db.Integer, db.ForeignKey("audit_actions.id"))
     entity_type = db.Column(db.String(50))  # project, kebutuhan, user, etc.
     entity_id = db.Column(db.Integer)
     old_value = db.Column(db.Text)
     new_value = db.Column(db.Text)
     ip_address = db.Column(db.String(50))
     user_agent = db.Column(db.String(200))
-    timestamp = db.Column(db.DateTime, default=func.now())
+    timestamp = db.Column(db.DateTime, index=True, default=func.now())
     
+    __table_args__ = (
+        # Newest first per user, per entity and per action
+        db.Index('ix_audit_logs_user_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_audit_logs_entity_timestamp', 'entity_type', 'entity_id', 'timestamp'),
+        db.Index('ix_audit_logs_action_timestamp', 'action_id', 'timestamp'),
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
+    
+    def __repr__(self):
+        return f"<AuditLog {self.action} by {self.user_id}>"
+
+
+# A partitioned table's primary key must include the partition key
+AuditLog.__table__.primary_key.ddl_if(
+    callable_=lambda ddl, target, bind, dialect=None, **kw: dialect.name != "postgresql"
+)
+event.listen(
+    AuditLog.__table__,
+    "after_create",
+    db.DDL(
+        "ALTER TABLE audit_logs ADD PRIMARY KEY (id, timestamp); "
+        "CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
+
+
+@event.listens_for(AuditLog, "before_insert")
+def _resolve_audit_action(mapper, connection, target):
+    if target.action_id is None and target.action:
+        from app.services.audit_actions import resolve_action_ids
+        target.action_id = resolve_action_ids(connection, [target.action])[target.action]
+
+
+class DailyStat(db.Model):
+    """Per-day rollup of created rows, kept by app.services.stats_service.
+
+    ``dimension`` is empty for the daily total of a metric, or
+    ``"<name>:<value>"`` (e.g. ``status:Aktif``) for a breakdown of it.
+    """
+    __tablename__ = "daily_stats"
+
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    metric = db.Column(db.String(30), nullable=False)
+    dimension = db.Column(db.String(60), nullable=False, default="", server_default="")
+    value = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        db.UniqueConstraint('date', 'metric', 'dimension', name='unique_daily_stat'),
+        db.Index('ix_daily_stats_metric_date', 'metric', 'date'),
+    )
+
     def __repr__(self):
-        return f"<AuditLog {self.action} by {self.user_id}>"
\ No newline at end of file
+        return f"<DailyStat {self.date} {self.metric} {self.dimension}={self.value}>"
+
+def search_vector(*fields):
+    """Weighted ``tsvector`` over ``(column, weight)`` pairs.
+
+    Shared by the PostgreSQL GIN indexes below and the search queries in
+    app.services.search_index so the planner can match the expression.
+    Constants are rendered inline for the same reason.
+    """
+    config = db.literal_column("'simple'")
+    vector = None
+    for column, weight in fields:
+        part = func.setweight(
+            func.to_tsvector(config, func.coalesce(column, db.literal_column("''"))),
+            db.literal_column(f"'{weight}'"),
+        )
+        vector = part if vector is None else vector.op("||")(part)
+    return vector
+
+
+# Full-text searchable fields per model; weight "A" ranks above "B"
+SEARCH_FIELDS = {
+    Project: ((Project.judul, "A"), (Project.deskripsi, "B")),
+    Kebutuhan: ((Kebutuhan.judul, "A"), (Kebutuhan.deskripsi, "B")),
+    Pengguna: ((Pengguna.username, "A"), (Pengguna.nama, "A")),
+}
+
+for _model, _fields in SEARCH_FIELDS.items():
+    _model.__table__.append_constraint(
+        db.Index(
+            f"ix_{_model.__tablename__}_search",
+            search_vector(*_fields),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql")
+    )
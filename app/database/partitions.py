@@ -0,0 +1,139 @@
+# app/database/partitions.py
+"""Monthly range partitions of ``audit_logs`` on PostgreSQL.
+
+On PostgreSQL the AuditLog model creates the table ``PARTITION BY RANGE
+(timestamp)`` with a primary key of ``(id, timestamp)`` and a DEFAULT
+partition, so an insert never fails for want of a partition.
+``ensure_audit_partitions()`` adds ``audit_logs_pYYYYMM`` partitions for
+the coming months; it runs at startup and from ``flask audit-partitions``,
+which also converts an existing unpartitioned table. Migrations never
+convert the table, since the copy holds it for as long as it runs; on an
+existing database run ``flask audit-partitions`` after ``flask db upgrade``.
+Retention drops whole expired partitions instead of deleting their rows.
+
+Other databases keep one plain table; see the composite indexes on
+AuditLog.
+"""
+import re
+from datetime import date, datetime
+from typing import List
+
+from sqlalchemy import func, select, text
+
+from .models import AuditLog
+
+PARENT = AuditLog.__tablename__
+PARTITION_PATTERN = re.compile(rf"^{PARENT}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_p{month.year:04d}{month.month:02d}"
+
+
+def is_partitioned(connection) -> bool:
+    """Whether ``audit_logs`` is a partitioned table."""
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :name"
+    ), {"name": PARENT}).first() is not None
+
+
+def list_partitions(connection) -> List[str]:
+    """Names of the monthly partitions, oldest first."""
+    names = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :name"
+    ), {"name": PARENT}).scalars()
+    return sorted(name for name in names if PARTITION_PATTERN.match(name))
+
+
+def ensure_audit_partitions(connection, months_ahead: int = 3, since: date = None) -> int:
+    """Create the monthly partitions from ``since`` to ``months_ahead`` months ahead.
+
+    Args:
+        connection: Connection to a database where audit_logs is partitioned
+        months_ahead: Months after the current one to prepare
+        since: First month, the current one by default
+
+    Returns:
+        int: Number of partitions created
+    """
+    existing = set(list_partitions(connection))
+    month = month_start(since or datetime.utcnow())
+    last = add_months(month_start(datetime.utcnow()), months_ahead)
+
+    created = 0
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created += 1
+        month = add_months(month, 1)
+    return created
+
+
+def drop_expired_partitions(connection, cutoff: datetime) -> int:
+    """Drop the monthly partitions that end before ``cutoff``.
+
+    Returns:
+        int: Number of rows dropped with them
+    """
+    dropped = 0
+    for name in list_partitions(connection):
+        year, month = PARTITION_PATTERN.match(name).groups()
+        if datetime.combine(add_months(date(int(year), int(month), 1), 1), datetime.min.time()) > cutoff:
+            break
+        dropped += connection.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+        connection.execute(text(f"DROP TABLE {name}"))
+    return dropped
+
+
+def partition_audit_logs(connection, months_ahead: int = 3) -> int:
+    """Convert an unpartitioned ``audit_logs`` into a partitioned one.
+
+    The old table is renamed, the partitioned table is created with every
+    partition its rows need, the rows are copied and the old table is
+    dropped, all in the caller's transaction.
+
+    Returns:
+        int: Number of rows copied
+    """
+    table = AuditLog.__table__
+    old = f"{PARENT}_unpartitioned"
+
+    columns = [row[0] for row in connection.execute(text(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = :name"
+    ), {"name": PARENT})]
+    first = connection.execute(select(func.min(table.c.timestamp))).scalar()
+
+    connection.execute(text(f"ALTER TABLE {PARENT} RENAME TO {old}"))
+    connection.execute(text(f"ALTER TABLE {old} RENAME CONSTRAINT {PARENT}_pkey TO {old}_pkey"))
+    for index in table.indexes:
+        connection.execute(text(f"ALTER INDEX IF EXISTS {index.name} RENAME TO {index.name}_unpartitioned"))
+
+    table.create(connection)
+    ensure_audit_partitions(connection, months_ahead, since=first)
+
+    shared = ", ".join(column for column in columns if column in table.c)
+    copied = connection.execute(text(f"INSERT INTO {PARENT} ({shared}) SELECT {shared} FROM {old}")).rowcount
+    connection.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{PARENT}', 'id'), "
+        f"(SELECT coalesce(max(id), 0) + 1 FROM {PARENT}), false)"
+    ))
+    connection.execute(text(f"DROP TABLE {old}"))
+    return copied
@@ -14,6 +14,7 @@ from wtforms import (
 )
 from wtforms.validators import DataRequired, Email, EqualTo, Length, ValidationError, Optional, Regexp, URL
 from app.database.models import Pengguna, Kategori
+from app.services.category_service import get_category_catalog
 import re
 
 
@@ -90,7 +91,7 @@ class ProjectForm(FlaskForm):
     def __init__(self, *args, **kwargs):
         super(ProjectForm, self).__init__(*args, **kwargs)
         self.kategori.choices = [(0, "-- Pilih Kategori --")] + [
-            (k.id, k.nama) for k in Kategori.query.order_by(Kategori.nama).all()
+            (k.id, k.nama) for k in get_category_catalog()
         ]
 
     def validate_kategori(self, kategori):
@@ -123,7 +124,7 @@ class KebutuhanForm(FlaskForm):
     def __init__(self, *args, **kwargs):
         super(KebutuhanForm, self).__init__(*args, **kwargs)
         self.kategori.choices = [(0, "-- Pilih Kategori --")] + [
-            (k.id, k.nama) for k in Kategori.query.order_by(Kategori.nama).all()
+            (k.id, k.nama) for k in get_category_catalog()
         ]
 
     def validate_kategori(self, kategori):
@@ -225,7 +226,7 @@ class SearchForm(FlaskForm):
     def __init__(self, *args, **kwargs):
         super(SearchForm, self).__init__(*args, **kwargs)
         self.category.choices = [(0, "Semua Kategori")] + [
-            (k.id, k.nama) for k in Kategori.query.order_by(Kategori.nama).all()
+            (k.id, k.nama) for k in get_category_catalog()
         ]
 
 
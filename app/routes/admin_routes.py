@@ -7,7 +7,7 @@ from app.forms import (
 )
 from app.services.category_service import (
     get_all_categories, create_category, update_category, 
-    delete_category, get_category_by_id
+    delete_category, get_category_by_id, get_category_catalog
 )
 from app.services.user_service import (
     get_all_users, get_user_by_id, update_user, 
@@ -22,11 +22,11 @@ from app.services.kebutuhan_service import (
 from app.services.audit_service import (
     log_admin_action, get_audit_logs
 )
+from app.services.stats_service import get_trend_stats, BUCKETS
 from app.utils.decorators import admin_required
-from app.utils.pagination import get_pagination_args
+from app.utils.pagination import get_pagination_args, paginate
 from app.database.base import db
 from app.database.models import Project, Kebutuhan, Pengguna, Komentar, Dukungan
-from datetime import datetime, timedelta
 import json
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
@@ -56,26 +56,7 @@ def dashboard():
     recent_users = Pengguna.query.order_by(Pengguna.created_at.desc()).limit(5).all()
     
     # Get trend data (last 7 days)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    daily_stats = []
-    for i in range(7):
-        date = week_ago + timedelta(days=i)
-        next_date = date + timedelta(days=1)
-        daily_stats.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'projects': Project.query.filter(
-                Project.timestamp >= date,
-                Project.timestamp < next_date
-            ).count(),
-            'kebutuhan': Kebutuhan.query.filter(
-                Kebutuhan.timestamp >= date,
-                Kebutuhan.timestamp < next_date
-            ).count(),
-            'users': Pengguna.query.filter(
-                Pengguna.created_at >= date,
-                Pengguna.created_at < next_date
-            ).count()
-        })
+    daily_stats = get_trend_stats(7, series=['projects', 'kebutuhan', 'users'])
     
     return render_template(
         "admin/dashboard.html",
@@ -183,7 +164,7 @@ def delete_category(id):
 @admin_required
 def users():
     """List all users with pagination and search."""
-    page, per_page = get_pagination_args()
+    page, per_page, total_estimated = get_pagination_args(total_estimated=True)
     search_query = request.args.get('q', '')
     role_filter = request.args.get('role', '')
     status_filter = request.args.get('status', '')
@@ -208,9 +189,7 @@ def users():
     elif status_filter == 'inactive':
         query = query.filter_by(is_active=False)
     
-    users = query.order_by(Pengguna.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    users = paginate(query.order_by(Pengguna.created_at.desc()), page, per_page, total_estimated)
     
     return render_template(
         "admin/users.html",
@@ -286,7 +265,7 @@ def edit_user(id):
 @admin_required
 def projects():
     """List all projects with filters."""
-    page, per_page = get_pagination_args()
+    page, per_page, total_estimated = get_pagination_args(total_estimated=True)
     search_query = request.args.get('q', '')
     status_filter = request.args.get('status', '')
     category_filter = request.args.get('category', '')
@@ -308,12 +287,10 @@ def projects():
     if category_filter:
         query = query.filter_by(kategori_id=category_filter)
     
-    projects = query.order_by(Project.timestamp.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    projects = paginate(query.order_by(Project.timestamp.desc()), page, per_page, total_estimated)
     
     # Get categories for filter
-    categories = get_all_categories()
+    categories = get_category_catalog()
     
     return render_template(
         "admin/projects.html",
@@ -363,7 +340,7 @@ def update_project_status(id):
 @admin_required
 def kebutuhan():
     """List all kebutuhan with filters."""
-    page, per_page = get_pagination_args()
+    page, per_page, total_estimated = get_pagination_args(total_estimated=True)
     search_query = request.args.get('q', '')
     status_filter = request.args.get('status', '')
     priority_filter = request.args.get('priority', '')
@@ -385,9 +362,7 @@ def kebutuhan():
     if priority_filter:
         query = query.filter_by(prioritas=priority_filter)
     
-    kebutuhan_list = query.order_by(Kebutuhan.timestamp.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    kebutuhan_list = paginate(query.order_by(Kebutuhan.timestamp.desc()), page, per_page, total_estimated)
     
     return render_template(
         "admin/kebutuhan.html",
@@ -437,7 +412,7 @@ def bulk_action():
 @admin_required
 def audit_logs():
     """View audit logs."""
-    page, per_page = get_pagination_args()
+    page, per_page, total_estimated = get_pagination_args(total_estimated=True)
     user_filter = request.args.get('user', '')
     action_filter = request.args.get('action', '')
     date_from = request.args.get('date_from', '')
@@ -449,7 +424,8 @@ def audit_logs():
         user_id=user_filter,
         action=action_filter,
         date_from=date_from,
-        date_to=date_to
+        date_to=date_to,
+        total_estimated=total_estimated
     )
     
     # Get users for filter
@@ -489,33 +465,11 @@ def api_stats():
     else:
         days = 365
     
-    start_date = datetime.utcnow() - timedelta(days=days)
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        return jsonify({'success': False, 'message': 'Invalid bucket'}), 400
     
-    # Get daily stats
-    stats = []
-    for i in range(days):
-        date = start_date + timedelta(days=i)
-        next_date = date + timedelta(days=1)
-        
-        stats.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'projects': Project.query.filter(
-                Project.timestamp >= date,
-                Project.timestamp < next_date
-            ).count(),
-            'kebutuhan': Kebutuhan.query.filter(
-                Kebutuhan.timestamp >= date,
-                Kebutuhan.timestamp < next_date
-            ).count(),
-            'users': Pengguna.query.filter(
-                Pengguna.created_at >= date,
-                Pengguna.created_at < next_date
-            ).count(),
-            'supports': Dukungan.query.filter(
-                Dukungan.timestamp >= date,
-                Dukungan.timestamp < next_date
-            ).count()
-        })
+    stats = get_trend_stats(days, bucket)
     
     return jsonify({
         'success': True,
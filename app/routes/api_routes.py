@@ -3,7 +3,7 @@ from flask import Blueprint, jsonify, request, current_app
 from flask_login import login_required, current_user
 from functools import wraps
 from app.services.project_service import (
-    get_recent_projects, get_project_by_id, create_project
+    get_recent_projects, get_project_by_id, create_project, load_project_aggregates
 )
 from app.services.kebutuhan_service import (
     get_all_kebutuhan, get_kebutuhan_by_id, create_kebutuhan
@@ -11,6 +11,7 @@ from app.services.kebutuhan_service import (
 from app.services.support_service import create_support, remove_support, has_supported
 from app.services.user_service import get_user_by_username
 from app.services.search_service import search_all
+from app.utils.pagination import get_list_pagination_args, pagination_meta
 from app.database.base import db
 import jwt
 from datetime import datetime, timedelta
@@ -58,12 +59,13 @@ def generate_api_response(success=True, data=None, message=None, errors=None, pa
 @api_bp.route("/projects", methods=["GET"])
 def get_projects():
     """Get list of projects."""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
     status = request.args.get('status', 'Aktif')
     category_id = request.args.get('category_id', type=int)
     
-    projects = get_recent_projects(page=page, per_page=per_page)
+    try:
+        projects = get_recent_projects(**get_list_pagination_args(total_estimated=True))
+    except ValueError as e:
+        return generate_api_response(success=False, message=str(e)), 400
     
     data = [{
         'id': p.id,
@@ -81,22 +83,13 @@ def get_projects():
             'nama': p.kategori_project.nama
         },
         'stats': {
-            'kebutuhan_count': p.kebutuhan.count(),
+            'kebutuhan_count': p.kebutuhan_count,
             'completion_percentage': p.completion_percentage,
             'view_count': p.view_count
         }
     } for p in projects.items]
     
-    pagination = {
-        'page': projects.page,
-        'pages': projects.pages,
-        'per_page': projects.per_page,
-        'total': projects.total,
-        'has_next': projects.has_next,
-        'has_prev': projects.has_prev
-    }
-    
-    return generate_api_response(data=data, pagination=pagination)
+    return generate_api_response(data=data, pagination=pagination_meta(projects))
 
 
 @api_bp.route("/projects/<int:id>", methods=["GET"])
@@ -108,6 +101,7 @@ def get_project(id):
     
     # Increment view count
     project.increment_views()
+    load_project_aggregates([project])
     
     data = {
         'id': project.id,
@@ -128,7 +122,7 @@ def get_project(id):
             'nama': project.kategori_project.nama
         },
         'stats': {
-            'kebutuhan_count': project.kebutuhan.count(),
+            'kebutuhan_count': project.kebutuhan_count,
             'completion_percentage': project.completion_percentage,
             'total_support': project.total_support,
             'view_count': project.view_count
@@ -149,18 +143,18 @@ def get_project(id):
 @api_bp.route("/kebutuhan", methods=["GET"])
 def get_kebutuhan_list():
     """Get list of kebutuhan."""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
     status = request.args.get('status')
     priority = request.args.get('priority')
     project_id = request.args.get('project_id', type=int)
     
-    kebutuhan = get_all_kebutuhan(
-        page=page,
-        per_page=per_page,
-        status=status,
-        prioritas=priority
-    )
+    try:
+        kebutuhan = get_all_kebutuhan(
+            status=status,
+            prioritas=priority,
+            **get_list_pagination_args(total_estimated=True)
+        )
+    except ValueError as e:
+        return generate_api_response(success=False, message=str(e)), 400
     
     data = [{
         'id': k.id,
@@ -189,16 +183,7 @@ def get_kebutuhan_list():
         }
     } for k in kebutuhan.items]
     
-    pagination = {
-        'page': kebutuhan.page,
-        'pages': kebutuhan.pages,
-        'per_page': kebutuhan.per_page,
-        'total': kebutuhan.total,
-        'has_next': kebutuhan.has_next,
-        'has_prev': kebutuhan.has_prev
-    }
-    
-    return generate_api_response(data=data, pagination=pagination)
+    return generate_api_response(data=data, pagination=pagination_meta(kebutuhan))
 
 
 @api_bp.route("/search", methods=["GET"])
@@ -1,5 +1,5 @@
 # app/routes/kebutuhan_routes.py - Complete Fixed Version
-from flask import Blueprint, render_template, flash, redirect, url_for, abort, request
+from flask import Blueprint, render_template, flash, redirect, url_for, abort, request, current_app
 from flask_login import login_required, current_user
 from app.forms import KebutuhanForm, KomentarForm, StatusUpdateForm
 from app.services.kebutuhan_service import (
@@ -11,10 +11,11 @@ from app.services.project_service import get_project_by_id
 from app.services.comment_service import create_comment, get_kebutuhan_comments
 from app.services.support_service import has_supported
 from app.services.file_service import save_kebutuhan_image, save_comment_image
-from app.services.notification_service import create_notification
+from app.services.notification_service import queue_notification
 from app.utils.file_utils import delete_file
 from app.utils.decorators import admin_required
 from app.database.base import db
+from app.database.models import Kebutuhan
 
 kebutuhan_bp = Blueprint("kebutuhan", __name__, url_prefix="/kebutuhan")
 
@@ -52,7 +53,7 @@ def create(project_id):
             
             # Notify project owner
             if project.pengguna_id != current_user.id:
-                create_notification(
+                queue_notification(
                     user_id=project.pengguna_id,
                     type="new_kebutuhan",
                     title="Kebutuhan baru pada project Anda",
@@ -106,7 +107,7 @@ def detail(project_id, id):
             
             # Notify kebutuhan owner
             if kebutuhan.pengguna_id != current_user.id:
-                create_notification(
+                queue_notification(
                     user_id=kebutuhan.pengguna_id,
                     type="comment",
                     title="Komentar baru pada kebutuhan Anda",
@@ -267,7 +268,7 @@ def update_status(project_id, id):
             
             # Notify kebutuhan owner if status changed
             if old_status != form.status.data:
-                create_notification(
+                queue_notification(
                     user_id=kebutuhan.pengguna_id,
                     type="status_change",
                     title="Status kebutuhan Anda diperbarui",
@@ -317,9 +318,7 @@ def list_all():
     elif sort == 'oldest':
         query = query.order_by(Kebutuhan.timestamp.asc())
     elif sort == 'most_supported':
-        query = query.join(Dukungan).group_by(Kebutuhan.id).order_by(
-            db.func.count(Dukungan.id).desc()
-        )
+        query = query.order_by(Kebutuhan.support_count.desc(), Kebutuhan.timestamp.desc())
     elif sort == 'high_priority':
         query = query.order_by(
             db.case(
@@ -332,8 +331,8 @@ def list_all():
     kebutuhan = query.paginate(page=page, per_page=per_page, error_out=False)
     
     # Get categories for filter
-    from app.services.category_service import get_all_categories
-    categories = get_all_categories()
+    from app.services.category_service import get_category_catalog
+    categories = get_category_catalog()
     
     return render_template(
         "kebutuhan/list.html",
@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template
 from app.database.models import Project
+from app.services.project_service import load_project_aggregates
 
 
 main_bp = Blueprint("main", __name__, url_prefix="/")
@@ -9,6 +10,7 @@ main_bp = Blueprint("main", __name__, url_prefix="/")
 def beranda():
     # Ambil beberapa project terbaru untuk ditampilkan di homepage
     projects = Project.query.order_by(Project.timestamp.desc()).limit(6).all()
+    load_project_aggregates(projects)
     return render_template("index.html", title="Beranda", projects=projects)
 
 
@@ -5,11 +5,10 @@ from app.services.project_service import (
     create_project,
     get_project_by_id,
     update_project,
-    get_user_projects,
     get_recent_projects,
 )
 from app.services.file_service import save_project_image
-from app.utils.pagination import generate_pagination_links
+from app.utils.pagination import generate_cursor_links
 from app.utils.helpers import is_owner_or_admin
 from app.utils.file_utils import delete_file
 
@@ -18,10 +17,12 @@ project_bp = Blueprint("project", __name__, url_prefix="/project")
 
 @project_bp.route("/", methods=["GET"])
 def list_projects():
-    page = request.args.get("page", 1, type=int)
-    projects = get_recent_projects() if page == 1 else get_user_projects(page=page)
+    try:
+        projects = get_recent_projects(cursor=request.args.get("cursor"), keyset=True)
+    except ValueError:
+        abort(400)
 
-    next_url, prev_url = generate_pagination_links(projects, "project.list_projects")
+    next_url, prev_url = generate_cursor_links(projects, "project.list_projects")
 
     return render_template(
         "project/list.html",
@@ -26,15 +26,15 @@ def search():
         category = form.category.data or request.args.get('category', 0, type=int)
         search_type = form.search_type.data or request.args.get('type', 'all')
         
-        page, per_page = get_pagination_args()
+        page, per_page, total_estimated = get_pagination_args(total_estimated=True)
         
         if search_type == 'all':
-            results = search_all(query, category, page, per_page)
+            results = search_all(query, category, page, per_page, total_estimated)
         elif search_type == 'projects':
-            results['projects'] = search_projects(query, category, page, per_page)
+            results['projects'] = search_projects(query, category, page, per_page, total_estimated)
             results['total'] = results['projects'].total if results['projects'] else 0
         elif search_type == 'kebutuhan':
-            results['kebutuhan'] = search_kebutuhan(query, category, page, per_page)
+            results['kebutuhan'] = search_kebutuhan(query, category, page, per_page, total_estimated)
             results['total'] = results['kebutuhan'].total if results['kebutuhan'] else 0
         
         # Update form data for GET requests
@@ -6,7 +6,8 @@ from app.services.support_service import (
     get_support_by_id, get_kebutuhan_supporters
 )
 from app.services.kebutuhan_service import get_kebutuhan_by_id
-from app.services.notification_service import create_notification
+from app.services.notification_service import queue_notification
+from app.utils.pagination import get_list_pagination_args, pagination_meta
 from app.database.base import db
 
 support_bp = Blueprint("support", __name__, url_prefix="/support")
@@ -40,7 +41,7 @@ def toggle_support(kebutuhan_id):
             action = "supported"
             
             # Create notification for kebutuhan owner
-            create_notification(
+            queue_notification(
                 user_id=kebutuhan.pengguna_id,
                 type="support",
                 title="Kebutuhan Anda mendapat dukungan",
@@ -51,7 +52,7 @@ def toggle_support(kebutuhan_id):
             # Check if threshold reached
             if kebutuhan.jumlah_dukungan % 10 == 0:  # Every 10 supports
                 # Notify project owner
-                create_notification(
+                queue_notification(
                     user_id=kebutuhan.project.pengguna_id,
                     type="milestone",
                     title="Milestone dukungan tercapai",
@@ -101,10 +102,10 @@ def get_supporters(kebutuhan_id):
     if not kebutuhan:
         return jsonify({'error': 'Kebutuhan not found'}), 404
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
-    supporters = get_kebutuhan_supporters(kebutuhan_id, page=page, per_page=per_page)
+    try:
+        supporters = get_kebutuhan_supporters(kebutuhan_id, **get_list_pagination_args(default_per_page=20))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
         'success': True,
@@ -115,14 +116,7 @@ def get_supporters(kebutuhan_id):
             'avatar_url': s.pendukung.avatar_url,
             'supported_at': s.timestamp.isoformat()
         } for s in supporters.items],
-        'pagination': {
-            'page': supporters.page,
-            'pages': supporters.pages,
-            'per_page': supporters.per_page,
-            'total': supporters.total,
-            'has_next': supporters.has_next,
-            'has_prev': supporters.has_prev
-        }
+        'pagination': pagination_meta(supporters)
     })
 
 
@@ -1,5 +1,5 @@
 # app/routes/user_routes.py - Complete Fixed Version
-from flask import Blueprint, render_template, request, flash, redirect, url_for, abort, jsonify
+from flask import Blueprint, Response, current_app, render_template, request, flash, redirect, url_for, abort, jsonify
 from flask_login import login_required, current_user
 from app.forms import UserProfileForm, ChangePasswordForm, PasswordResetRequestForm, PasswordResetForm
 from app.services.support_service import get_user_supports
@@ -11,14 +11,17 @@ from app.services.user_service import (
 )
 from app.services.notification_service import (
     get_user_notifications, mark_notification_read, 
-    mark_all_notifications_read
+    mark_all_notifications_read, get_unread_count, subscribe_notifications
 )
+from app.services.notification_streams import acquire_stream, release_stream
 from app.services.file_service import save_avatar_image
-from app.utils.pagination import generate_pagination_links
+from app.utils.pagination import generate_cursor_links
 from app.utils.file_utils import delete_file
 from app.database.base import db
 from app.database.models import Pengguna
+import json
 import secrets
+import time
 
 user_bp = Blueprint("user", __name__, url_prefix="/user")
 
@@ -174,14 +177,16 @@ def reset_password(token):
 @login_required
 def supports():
     """View user's supported kebutuhan."""
-    page = request.args.get("page", 1, type=int)
-    supports = get_user_supports(current_user.id, page=page)
+    try:
+        supports = get_user_supports(current_user.id, cursor=request.args.get("cursor"), keyset=True)
+    except ValueError:
+        abort(400)
     
-    next_url, prev_url = generate_pagination_links(supports, "user.supports")
+    next_url, prev_url = generate_cursor_links(supports, "user.supports")
     
     return render_template(
         "user/supports.html",
-        supports=supports.items,
+        dukungan=supports.items,
         next_url=next_url,
         prev_url=prev_url,
         pagination=supports
@@ -192,10 +197,12 @@ def supports():
 @login_required
 def kebutuhans():
     """View user's submitted kebutuhan."""
-    page = request.args.get("page", 1, type=int)
-    kebutuhan = get_user_kebutuhan(current_user.id, page=page)
+    try:
+        kebutuhan = get_user_kebutuhan(current_user.id, cursor=request.args.get("cursor"), keyset=True)
+    except ValueError:
+        abort(400)
     
-    next_url, prev_url = generate_pagination_links(kebutuhan, "user.kebutuhans")
+    next_url, prev_url = generate_cursor_links(kebutuhan, "user.kebutuhans")
     
     return render_template(
         "user/kebutuhan.html",
@@ -210,10 +217,12 @@ def kebutuhans():
 @login_required
 def projects():
     """View user's projects."""
-    page = request.args.get("page", 1, type=int)
-    projects = get_user_projects(current_user.id, page=page)
+    try:
+        projects = get_user_projects(current_user.id, cursor=request.args.get("cursor"), keyset=True)
+    except ValueError:
+        abort(400)
     
-    next_url, prev_url = generate_pagination_links(projects, "user.projects")
+    next_url, prev_url = generate_cursor_links(projects, "user.projects")
     
     return render_template(
         "user/projects.html",
@@ -228,22 +237,91 @@ def projects():
 @login_required
 def notifications():
     """View user notifications."""
-    page = request.args.get("page", 1, type=int)
     unread_only = request.args.get("unread", "false").lower() == "true"
     
-    notifications = get_user_notifications(
-        current_user.id,
-        unread_only=unread_only,
-        page=page
-    )
+    try:
+        notifications = get_user_notifications(
+            current_user.id,
+            unread_only=unread_only,
+            cursor=request.args.get("cursor"),
+            keyset=True
+        )
+    except ValueError:
+        abort(400)
+    
+    unread = "true" if unread_only else None
+    next_url, prev_url = generate_cursor_links(notifications, "user.notifications", unread=unread)
     
     return render_template(
         "user/notifications.html",
         notifications=notifications,
-        unread_only=unread_only
+        unread_only=unread_only,
+        next_url=next_url,
+        prev_url=prev_url
     )
 
 
+@user_bp.route("/notifications/stream")
+@login_required
+def notification_stream():
+    """Push new notifications to the browser as Server-Sent Events.
+
+    The stream opens with the current unread count, sends keep-alive
+    comments while idle and closes after NOTIFICATION_STREAM_TIMEOUT
+    seconds; EventSource reconnects on its own. Over the stream caps the
+    request is refused with 503, and the browser polls
+    notification_count instead.
+    """
+    user_id = current_user.id
+    if not acquire_stream(user_id):
+        response = Response("Terlalu banyak stream notifikasi", status=503, mimetype="text/plain")
+        response.headers["Retry-After"] = str(current_app.config.get("NOTIFICATION_POLL_INTERVAL", 60))
+        return response
+
+    keepalive = current_app.config.get("NOTIFICATION_STREAM_KEEPALIVE", 15)
+    timeout = current_app.config.get("NOTIFICATION_STREAM_TIMEOUT", 300)
+    try:
+        unread = get_unread_count(user_id)
+        # Subscribe before returning so nothing committed from here on is missed
+        subscription = subscribe_notifications(user_id)
+    except Exception:
+        release_stream(user_id)
+        raise
+
+    def close():
+        subscription.close()
+        release_stream(user_id)
+
+    def events():
+        deadline = time.monotonic() + timeout
+        yield f"retry: 5000\nevent: unread\ndata: {json.dumps({'count': unread})}\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            event = subscription.get(timeout=min(keepalive, remaining))
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: notification\ndata: {json.dumps(event)}\n\n"
+
+    response = Response(events(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Tell nginx not to buffer this response
+        "X-Accel-Buffering": "no",
+    })
+    # Runs when the client disconnects, even if the stream never started
+    response.call_on_close(close)
+    return response
+
+
+@user_bp.route("/notifications/count")
+@login_required
+def notification_count():
+    """Unread notification count, polled when the stream is refused."""
+    return jsonify({'count': get_unread_count(current_user.id)})
+
+
 @user_bp.route("/notifications/<int:id>/read", methods=["POST"])
 @login_required
 def mark_notification_as_read(id):
@@ -0,0 +1,60 @@
+# app/services/audit_actions.py
+"""Audit action name lookup.
+
+Audit logs reference their action through ``action_id``, so filtering by
+action is an equality match on an indexed integer instead of a LIKE over
+every row. Names are added to ``audit_actions`` the first time they are
+logged.
+"""
+from typing import Dict, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.database.base import db
+from app.database.models import AuditAction, AuditLog
+
+
+def resolve_action_ids(connection, names: Iterable[str]) -> Dict[str, int]:
+    """Map action names to their IDs, adding the names not seen before.
+
+    Args:
+        connection: Connection of the transaction inserting the logs
+        names: Action names
+
+    Returns:
+        Dict: Action name -> ID
+    """
+    table = AuditAction.__table__
+    names = set(names)
+    ids = dict(connection.execute(select(table.c.name, table.c.id).where(table.c.name.in_(names))).all())
+
+    missing = names - ids.keys()
+    if missing:
+        try:
+            with connection.begin_nested():
+                connection.execute(table.insert(), [{"name": name} for name in sorted(missing)])
+        except IntegrityError:
+            pass  # Another process added some of them first
+        ids.update(connection.execute(select(table.c.name, table.c.id).where(table.c.name.in_(missing))).all())
+    return ids
+
+
+def backfill_action_ids() -> int:
+    """Set ``action_id`` on audit logs written before it existed.
+
+    Returns:
+        int: Number of logs updated
+    """
+    updated = 0
+    with db.engine.begin() as connection:
+        names = connection.execute(
+            select(AuditLog.action).where(AuditLog.action_id.is_(None)).distinct()
+        ).scalars().all()
+        for name, action_id in resolve_action_ids(connection, names).items():
+            updated += connection.execute(
+                AuditLog.__table__.update()
+                .where(AuditLog.action == name, AuditLog.action_id.is_(None))
+                .values(action_id=action_id)
+            ).rowcount
+    return updated
@@ -1,8 +1,14 @@
 # app/services/audit_service.py
 from typing import Optional, Dict, Any
-from flask import current_app, request
-from app.database.models import AuditLog, Pengguna
+from flask import current_app, has_request_context, request
+from sqlalchemy import select
+from app.database.models import AuditAction, AuditLog, Pengguna
 from app.database.base import db
+from app.database.partitions import drop_expired_partitions, is_partitioned
+from app.services.audit_sink import get_audit_sink
+from app.utils.decorators import async_task
+from app.utils.pagination import paginate
+from app.utils.retention import prune
 from datetime import datetime
 
 
@@ -13,9 +19,14 @@ def log_admin_action(
     entity_id: int = None,
     old_value: str = None,
     new_value: str = None
-) -> AuditLog:
+):
     """Log an admin action for audit trail.
 
+    The entry is spooled and buffered, then inserted in a batch on a
+    separate connection, so the caller's session is neither flushed nor
+    committed. Nothing is returned: the entry has no id until its batch is
+    inserted, whereas this used to return the committed AuditLog.
+
     Args:
         user_id: User performing the action
         action: Action description
@@ -23,37 +34,30 @@ def log_admin_action(
         entity_id: ID of the entity
         old_value: Previous value
         new_value: New value
-
-    Returns:
-        AuditLog: Created audit log entry
     """
     # Get request context if available
     ip_address = None
     user_agent = None
     
-    if request:
+    if has_request_context():
         ip_address = request.remote_addr
         user_agent = request.headers.get('User-Agent', '')[:200]  # Limit length
     
-    log = AuditLog(
-        user_id=user_id,
-        action=action,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        old_value=old_value,
-        new_value=new_value,
-        ip_address=ip_address,
-        user_agent=user_agent
-    )
-    
-    db.session.add(log)
-    db.session.commit()
-    
     current_app.logger.info(
         f"Audit log: User {user_id} performed {action} on {entity_type} {entity_id}"
     )
     
-    return log
+    get_audit_sink().record({
+        'user_id': user_id,
+        'action': action,
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'old_value': old_value,
+        'new_value': new_value,
+        'ip_address': ip_address,
+        'user_agent': user_agent,
+        'timestamp': datetime.utcnow()
+    })
 
 
 def get_audit_logs(
@@ -63,7 +67,8 @@ def get_audit_logs(
     action: Optional[str] = None,
     entity_type: Optional[str] = None,
     date_from: Optional[str] = None,
-    date_to: Optional[str] = None
+    date_to: Optional[str] = None,
+    total_estimated: bool = False
 ):
     """Get audit logs with filters.
 
@@ -75,6 +80,7 @@ def get_audit_logs(
         entity_type: Filter by entity type
         date_from: Filter from date (YYYY-MM-DD format)
         date_to: Filter to date (YYYY-MM-DD format)
+        total_estimated: Let a large total be estimated
 
     Returns:
         Pagination: Paginated audit logs
@@ -87,7 +93,10 @@ def get_audit_logs(
     if user_id:
         query = query.filter_by(user_id=user_id)
     if action:
-        query = query.filter(AuditLog.action.contains(action))
+        # Partial match over the few action names, then an indexed IN
+        query = query.filter(AuditLog.action_id.in_(
+            select(AuditAction.id).where(AuditAction.name.contains(action))
+        ))
     if entity_type:
         query = query.filter_by(entity_type=entity_type)
     
@@ -107,9 +116,7 @@ def get_audit_logs(
         except ValueError:
             current_app.logger.warning(f"Invalid date_to format: {date_to}")
     
-    return query.order_by(AuditLog.timestamp.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    return paginate(query.order_by(AuditLog.timestamp.desc()), page, per_page, total_estimated)
 
 
 def get_user_audit_logs(user_id: int, limit: int = 50) -> list:
@@ -152,13 +159,16 @@ def get_audit_stats() -> Dict[str, Any]:
     """
     total_logs = AuditLog.query.count()
     
-    # Count by action
+    # Count by action; grouping the indexed action_id, then naming the top 10
+    top_actions = db.session.query(
+        AuditLog.action_id,
+        db.func.count(AuditLog.id).label('total')
+    ).group_by(AuditLog.action_id).order_by(db.desc('total')).limit(10).subquery()
     by_action = db.session.query(
-        AuditLog.action,
-        db.func.count(AuditLog.id)
-    ).group_by(AuditLog.action).order_by(
-        db.func.count(AuditLog.id).desc()
-    ).limit(10).all()
+        AuditAction.name, top_actions.c.total
+    ).join(
+        top_actions, AuditAction.id == top_actions.c.action_id
+    ).order_by(top_actions.c.total.desc()).all()
     
     # Count by entity type
     by_entity_type = db.session.query(
@@ -168,17 +178,16 @@ def get_audit_stats() -> Dict[str, Any]:
         db.func.count(AuditLog.id).desc()
     ).all()
     
-    # Count by user
+    # Count by user; join only the top 10 to users
+    top_users = db.session.query(
+        AuditLog.user_id,
+        db.func.count(AuditLog.id).label('total')
+    ).group_by(AuditLog.user_id).order_by(db.desc('total')).limit(10).subquery()
     by_user = db.session.query(
-        Pengguna.nama,
-        db.func.count(AuditLog.id)
+        Pengguna.nama, top_users.c.total
     ).join(
-        AuditLog, Pengguna.id == AuditLog.user_id
-    ).group_by(
-        Pengguna.nama
-    ).order_by(
-        db.func.count(AuditLog.id).desc()
-    ).limit(10).all()
+        top_users, Pengguna.id == top_users.c.user_id
+    ).order_by(top_users.c.total.desc()).all()
     
     # Get recent activity
     recent_logs = AuditLog.query.order_by(
@@ -204,11 +213,23 @@ def get_audit_stats() -> Dict[str, Any]:
     }
 
 
-def clean_old_audit_logs(days: int = 365) -> int:
+@async_task
+def clean_old_audit_logs(
+    days: int = 365,
+    batch_size: int = None,
+    sleep: float = None,
+    dry_run: bool = False
+) -> int:
     """Clean up old audit logs.
 
+    Monthly partitions that expired as a whole are dropped, the remaining
+    old logs are deleted in primary key batches.
+
     Args:
         days: Number of days to keep
+        batch_size: Log IDs per batch, RETENTION_BATCH_SIZE by default
+        sleep: Seconds between batches, RETENTION_BATCH_SLEEP by default
+        dry_run: Only count the logs that would be deleted
 
     Returns:
         int: Number of logs deleted
@@ -216,14 +237,17 @@ def clean_old_audit_logs(days: int = 365) -> int:
     from datetime import timedelta
     
     cutoff_date = datetime.utcnow() - timedelta(days=days)
+    table = AuditLog.__table__
     
-    count = AuditLog.query.filter(
-        AuditLog.timestamp < cutoff_date
-    ).delete()
-    
-    db.session.commit()
+    count = 0
+    if not dry_run:
+        with db.engine.begin() as connection:
+            if is_partitioned(connection):
+                count = drop_expired_partitions(connection, cutoff_date)
+    count += prune(table, table.c.timestamp, cutoff_date, batch_size, sleep, dry_run)
     
-    current_app.logger.info(f"Cleaned up {count} old audit logs (older than {days} days)")
+    if not dry_run:
+        current_app.logger.info(f"Cleaned up {count} old audit logs (older than {days} days)")
     return count
 
 
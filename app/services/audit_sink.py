@@ -0,0 +1,228 @@
+# app/services/audit_sink.py
+"""Buffered audit log writer.
+
+``record()`` appends the entry to a local spool file and to the in-memory
+buffer, then returns; nothing touches the database or the request's
+session. A background thread inserts the buffer every AUDIT_FLUSH_INTERVAL
+seconds, or as soon as AUDIT_BUFFER_SIZE entries are waiting, with one
+executemany INSERT on its own connection.
+
+The spool file (one per process, ``audit-spool-<pid>-<token>.jsonl`` in
+AUDIT_SPOOL_DIR) holds every entry not committed yet, so entries
+survive a crashed worker: at startup the spools of dead processes are
+claimed and replayed. PIDs repeat after a container restart, so the
+random token keeps a new process from appending to a dead one's spool. Delivery is at least once; a crash between the
+INSERT commit and the spool rewrite replays those entries again.
+"""
+import glob
+import itertools
+import json
+import os
+import tempfile
+import uuid
+from datetime import datetime
+from typing import Any, Dict
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.database.base import db
+from app.database.models import AuditLog, Pengguna
+from app.database.partitions import ensure_audit_partitions, is_partitioned
+from app.services.audit_actions import resolve_action_ids
+from app.utils.write_behind import WriteBehindBuffer
+
+SPOOL_PREFIX = "audit-spool-"
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot spool {type(value).__name__}")
+
+
+def _decode(entry: Dict[str, Any]) -> Dict[str, Any]:
+    if entry.get("timestamp"):
+        entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+    return entry
+
+
+def _alive(pid: int) -> bool:
+    if pid == os.getpid():
+        # A previous process with our PID, not us: our own spool is skipped
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class AuditSink(WriteBehindBuffer):
+    """Buffer of audit log entries keyed by arrival order."""
+
+    name = "audit-sink"
+
+    def __init__(self, app, interval: float = None, max_pending: int = 1000,
+                 spool_dir: str = None, fsync: bool = False):
+        super().__init__(app, interval, max_pending)
+        self.spool_dir = spool_dir
+        self.fsync = fsync
+        self._sequence = itertools.count()
+        self._spool = None
+        self._spool_pid = None
+        self._spool_path = None
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+
+    @property
+    def spool_path(self) -> str:
+        """This process's spool file, or None before its first entry."""
+        if self._spool_pid != os.getpid():
+            return None
+        return self._spool_path
+
+    def _open_spool(self):
+        # Exclusive create: never append to a file another process wrote
+        while True:
+            token = uuid.uuid4().hex[:12]
+            path = os.path.join(self.spool_dir, f"{SPOOL_PREFIX}{os.getpid()}-{token}.jsonl")
+            try:
+                self._spool = open(path, "x", encoding="utf-8")
+            except FileExistsError:
+                continue
+            self._spool_path = path
+            self._spool_pid = os.getpid()
+            return
+
+    def record(self, entry: Dict[str, Any]):
+        """Buffer one audit log entry, given as AuditLog column values."""
+        key = next(self._sequence)
+        if self.spool_dir:
+            line = json.dumps({"key": key, "entry": entry}, default=_encode) + "\n"
+            with self._lock:
+                self._append(line)
+        self._queue(key, entry)
+
+    def _append(self, line: str):
+        # Forked workers spool to their own file
+        if self._spool_pid != os.getpid():
+            self._open_spool()
+        self._spool.write(line)
+        self._spool.flush()
+        if self.fsync:
+            os.fsync(self._spool.fileno())
+
+    def discard(self):
+        super().discard()
+        if self.spool_dir:
+            with self._lock:
+                if self._spool_pid == os.getpid():
+                    self._spool.truncate(0)
+
+    def _write(self, connection, batch):
+        rows = [batch[key] for key in sorted(batch)]
+        user_ids = {row["user_id"] for row in rows}
+        existing = set(connection.execute(
+            select(Pengguna.id).where(Pengguna.id.in_(user_ids))
+        ).scalars())
+        if existing != user_ids:
+            self.app.logger.warning(f"Dropping audit logs of missing users {sorted(user_ids - existing)}")
+            rows = [row for row in rows if row["user_id"] in existing]
+        if rows:
+            action_ids = resolve_action_ids(connection, {row["action"] for row in rows})
+            connection.execute(
+                AuditLog.__table__.insert(),
+                [dict(row, action_id=action_ids[row["action"]]) for row in rows]
+            )
+
+    def _written(self, batch):
+        if not self.spool_dir:
+            return
+        # Rewrite the spool without the committed entries
+        with self._lock:
+            if self._spool_pid != os.getpid():
+                return
+            self._spool.close()
+            with open(self.spool_path, encoding="utf-8") as spool:
+                lines = [line for line in spool
+                         if line.endswith("\n") and json.loads(line)["key"] not in batch]
+            temporary = f"{self.spool_path}.tmp"
+            with open(temporary, "w", encoding="utf-8") as spool:
+                spool.writelines(lines)
+                if self.fsync:
+                    spool.flush()
+                    os.fsync(spool.fileno())
+            os.replace(temporary, self.spool_path)
+            self._spool = open(self.spool_path, "a", encoding="utf-8")
+
+    def recover(self) -> int:
+        """Buffer the entries spooled by processes that died.
+
+        Returns:
+            int: Number of entries recovered
+        """
+        if not self.spool_dir:
+            return 0
+
+        recovered = 0
+        for path in glob.glob(os.path.join(self.spool_dir, f"{SPOOL_PREFIX}*.jsonl")):
+            if path == self.spool_path:
+                continue
+            pid = os.path.basename(path)[len(SPOOL_PREFIX):-len(".jsonl")].split("-")[0]
+            if not pid.isdigit() or _alive(int(pid)):
+                continue
+            # Only one starting process wins the rename
+            claimed = f"{path}.{uuid.uuid4().hex[:12]}.claimed"
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue
+            with open(claimed, encoding="utf-8") as spool:
+                for line in spool:
+                    # A torn last line was never acknowledged to anyone
+                    if line.endswith("\n"):
+                        self.record(_decode(json.loads(line)["entry"]))
+                        recovered += 1
+            os.remove(claimed)
+
+        if recovered:
+            self.app.logger.warning(f"Recovered {recovered} spooled audit log(s)")
+        return recovered
+
+
+def init_audit(app) -> AuditSink:
+    """Create the audit sink for ``app``, prepare the coming months'
+    partitions and replay orphaned spools."""
+    spool_dir = None
+    if app.config.get("AUDIT_SPOOL", True):
+        spool_dir = app.config.get("AUDIT_SPOOL_DIR") or os.path.join(tempfile.gettempdir(), "komunitech-audit")
+
+    sink = AuditSink(
+        app,
+        app.config.get("AUDIT_FLUSH_INTERVAL", 2),
+        app.config.get("AUDIT_BUFFER_SIZE", 1000),
+        spool_dir,
+        app.config.get("AUDIT_SPOOL_FSYNC", False),
+    )
+    app.extensions["audit_sink"] = sink
+
+    if db.engine.dialect.name == "postgresql":
+        with db.engine.begin() as connection:
+            if is_partitioned(connection):
+                ensure_audit_partitions(connection, app.config.get("AUDIT_PARTITIONS_AHEAD", 3))
+
+    sink.recover()
+    return sink
+
+
+def get_audit_sink() -> AuditSink:
+    """Get the audit sink of the current app."""
+    return current_app.extensions["audit_sink"]
+
+
+def flush_audit_logs() -> int:
+    """Write the current app's buffered audit logs now."""
+    return get_audit_sink().flush()
@@ -1,13 +1,75 @@
 # app/services/category_service.py
-from typing import List, Optional, Dict, Any
-from flask import current_app
+import uuid
+from typing import List, Optional, Dict, Any, NamedTuple
+from flask import current_app, g, has_request_context
 from app.database.models import Kategori, Project, Kebutuhan
 from app.database.base import db
+from app.utils.cache import get_cache
+
+
+class CategoryEntry(NamedTuple):
+    """Detached, read-only category row held in the catalog cache."""
+    id: int
+    nama: str
+    deskripsi: str
+
+
+# Key of the catalog version stamp in the app cache. Each process keeps its
+# own copy of the catalog and reloads it only when the stamp changes, so
+# with a shared cache backend every worker sees category edits.
+CATALOG_VERSION_KEY = "komunitech:category_catalog:version"
+
+_catalog = {'version': None, 'entries': []}
+
+
+def _catalog_version() -> str:
+    cache = get_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Missing or evicted stamp: start a new version, forcing a reload
+        version = uuid.uuid4().hex
+        cache.set(CATALOG_VERSION_KEY, version, timeout=0)
+    return version
+
+
+def get_category_catalog() -> List[CategoryEntry]:
+    """Get all categories ordered by name, cached in this process.
+
+    The version stamp is read at most once per request.
+
+    Returns:
+        List[CategoryEntry]: Plain category entries, safe to keep across requests
+    """
+    if has_request_context():
+        if 'category_catalog_version' not in g:
+            g.category_catalog_version = _catalog_version()
+        version = g.category_catalog_version
+    else:
+        version = _catalog_version()
+
+    if _catalog['version'] != version:
+        _catalog['entries'] = [
+            CategoryEntry(*row) for row in db.session.query(
+                Kategori.id, Kategori.nama, Kategori.deskripsi
+            ).order_by(Kategori.nama).all()
+        ]
+        _catalog['version'] = version
+    return _catalog['entries']
+
+
+def reset_category_catalog():
+    """Publish a new catalog version so every process reloads."""
+    get_cache().set(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=0)
+    _catalog['version'] = None
+    if has_request_context():
+        g.pop('category_catalog_version', None)
 
 
 def get_all_categories() -> List[Kategori]:
     """Get all categories ordered by name.
 
+    Use get_category_catalog() where only ids and names are needed.
+
     Returns:
         List[Kategori]: List of all categories
     """
@@ -59,6 +121,7 @@ def create_category(nama: str, deskripsi: str) -> Kategori:
     category = Kategori(nama=nama, deskripsi=deskripsi)
     db.session.add(category)
     db.session.commit()
+    reset_category_catalog()
 
     current_app.logger.info(f"New category created: {nama}")
     return category
@@ -97,6 +160,7 @@ def update_category(
         category.deskripsi = deskripsi
 
     db.session.commit()
+    reset_category_catalog()
 
     current_app.logger.info(f"Category updated: {category.nama}")
     return category
@@ -124,6 +188,7 @@ def delete_category(category_id: int) -> bool:
 
     db.session.delete(category)
     db.session.commit()
+    reset_category_catalog()
 
     current_app.logger.info(f"Category deleted: {category.nama}")
     return True
@@ -155,13 +220,19 @@ def get_category_stats(category_id: int = None) -> Dict[str, Any]:
             'updated_at': category.updated_at
         }
 
-    # Global stats for all categories
-    categories = get_all_categories()
+    # Global stats for all categories, two grouped counts in total
+    project_counts = dict(
+        db.session.query(Project.kategori_id, db.func.count(Project.id)).group_by(Project.kategori_id).all()
+    )
+    kebutuhan_counts = dict(
+        db.session.query(Kebutuhan.kategori_id, db.func.count(Kebutuhan.id)).group_by(Kebutuhan.kategori_id).all()
+    )
+    categories = get_category_catalog()
     stats = []
 
     for category in categories:
-        project_count = category.projects.count()
-        kebutuhan_count = category.kebutuhan.count()
+        project_count = project_counts.get(category.id, 0)
+        kebutuhan_count = kebutuhan_counts.get(category.id, 0)
         
         stats.append({
             'id': category.id,
@@ -4,6 +4,7 @@ from flask import current_app
 from app.database.models import Komentar, Kebutuhan
 from app.database.base import db
 from datetime import datetime, timedelta
+from sqlalchemy.orm import joinedload
 
 
 def create_comment(
@@ -20,6 +21,7 @@ def create_comment(
         raise ValueError("Kebutuhan tidak ditemukan")
     
     # Validate parent comment if provided
+    depth = 0
     if parent_id:
         parent = Komentar.query.get(parent_id)
         if not parent:
@@ -28,20 +30,26 @@ def create_comment(
             raise ValueError("Komentar induk tidak sesuai dengan kebutuhan")
         
         # Check nesting depth
-        depth = get_comment_depth(parent_id)
         max_depth = current_app.config.get('MAX_COMMENT_DEPTH', 3)
-        if depth >= max_depth:
+        if parent.depth >= max_depth:
             raise ValueError(f"Maksimal kedalaman reply adalah {max_depth} level")
+        depth = parent.depth + 1
     
     komentar = Komentar(
         isi=isi,
         kebutuhan_id=kebutuhan_id,
         pengguna_id=penulis_id,
         gambar_url=gambar_url,
-        parent_id=parent_id
+        parent_id=parent_id,
+        depth=depth
     )
     
     db.session.add(komentar)
+    # Keep the denormalized counter in the same transaction as the insert
+    Kebutuhan.query.filter_by(id=kebutuhan_id).update(
+        {Kebutuhan.comment_count: Kebutuhan.comment_count + 1},
+        synchronize_session=False
+    )
     db.session.commit()
     
     current_app.logger.info(f"New comment created on kebutuhan {kebutuhan_id}")
@@ -94,6 +102,10 @@ def delete_comment(comment_id: int, user_id: int, is_admin: bool = False) -> boo
     else:
         # Hard delete
         db.session.delete(comment)
+        Kebutuhan.query.filter_by(id=comment.kebutuhan_id).update(
+            {Kebutuhan.comment_count: Kebutuhan.comment_count - 1},
+            synchronize_session=False
+        )
         db.session.commit()
         current_app.logger.info(f"Comment {comment_id} hard deleted")
     
@@ -101,46 +113,80 @@ def delete_comment(comment_id: int, user_id: int, is_admin: bool = False) -> boo
 
 
 def get_kebutuhan_comments(kebutuhan_id: int, threaded: bool = True) -> List[Komentar]:
-    """Get all comments for a kebutuhan, optionally in threaded format."""
-    # Get root comments (no parent)
-    root_comments = Komentar.query.filter_by(
-        kebutuhan_id=kebutuhan_id,
-        parent_id=None
-    ).order_by(Komentar.timestamp.asc()).all()
+    """Get all comments for a kebutuhan, optionally in threaded format.
+    
+    All comments and their authors are loaded in a single query; the
+    thread is assembled in memory. Replies nested deeper than
+    MAX_COMMENT_DEPTH are left out of the threaded result.
+    """
+    comments = Komentar.query.options(
+        joinedload(Komentar.penulis)
+    ).filter_by(
+        kebutuhan_id=kebutuhan_id
+    ).order_by(Komentar.timestamp.asc(), Komentar.id.asc()).all()
     
     if not threaded:
         # Return flat list
-        return Komentar.query.filter_by(
-            kebutuhan_id=kebutuhan_id
-        ).order_by(Komentar.timestamp.asc()).all()
+        return comments
     
     # Build threaded structure
-    def build_thread(comment):
-        """Recursively build comment thread."""
-        thread = {
-            'comment': comment,
-            'replies': []
-        }
-        
-        for reply in comment.replies.order_by(Komentar.timestamp.asc()):
-            thread['replies'].append(build_thread(reply))
-        
-        return thread
+    max_depth = current_app.config.get('MAX_COMMENT_DEPTH', 3)
+    threads = {comment.id: {'comment': comment, 'replies': []} for comment in comments}
+    roots = []
+    
+    for comment in comments:
+        if comment.parent_id is None:
+            roots.append(threads[comment.id])
     
-    threads = [build_thread(comment) for comment in root_comments]
-    return threads
+    # Attach replies level by level so depth comes from the actual tree
+    level = roots
+    depth = 0
+    while level and depth < max_depth:
+        parents = {thread['comment'].id: thread for thread in level}
+        next_level = []
+        for comment in comments:
+            parent = parents.get(comment.parent_id)
+            if parent is not None:
+                parent['replies'].append(threads[comment.id])
+                next_level.append(threads[comment.id])
+        level = next_level
+        depth += 1
+    
+    return roots
 
 
 def get_comment_depth(comment_id: int) -> int:
     """Get the depth of a comment in the thread."""
-    depth = 0
-    comment = Komentar.query.get(comment_id)
+    depth = db.session.query(Komentar.depth).filter_by(id=comment_id).scalar()
+    return depth or 0
+
+
+def rebuild_comment_depths() -> int:
+    """Recompute the stored depth of every comment from parent links.
     
-    while comment and comment.parent_id:
-        depth += 1
-        comment = comment.parent
+    Returns:
+        int: Number of comments whose depth was corrected
+    """
+    corrected = Komentar.query.filter(
+        Komentar.parent_id.is_(None),
+        Komentar.depth != 0
+    ).update({Komentar.depth: 0}, synchronize_session=False)
     
-    return depth
+    level = 0
+    parent_ids = [row.id for row in db.session.query(Komentar.id).filter(Komentar.parent_id.is_(None))]
+    while parent_ids:
+        level += 1
+        corrected += Komentar.query.filter(
+            Komentar.parent_id.in_(parent_ids),
+            Komentar.depth != level
+        ).update({Komentar.depth: level}, synchronize_session=False)
+        parent_ids = [
+            row.id for row in db.session.query(Komentar.id).filter(Komentar.parent_id.in_(parent_ids))
+        ]
+    
+    db.session.commit()
+    current_app.logger.info(f"Rebuilt comment depths, {corrected} comments corrected")
+    return corrected
 
 
 def get_user_comments(
@@ -4,6 +4,7 @@ from typing import Optional, Tuple
 from flask import current_app
 from werkzeug.utils import secure_filename
 from app.utils.file_utils import save_file, delete_file, allowed_file
+from app.utils.decorators import async_task
 from PIL import Image
 import secrets
 import string
@@ -50,6 +51,12 @@ def resize_image(image_path: str, max_size: Tuple[int, int]) -> None:
         current_app.logger.error(f"Error resizing image: {e}")
 
 
+@async_task
+def resize_upload(image_path: str, max_size: Tuple[int, int]) -> None:
+    """Resize an uploaded image in the background."""
+    resize_image(image_path, max_size)
+
+
 def save_project_image(file, project_id: Optional[int] = None) -> Optional[str]:
     """Save project image file."""
     if not file or not allowed_file(file.filename):
@@ -69,7 +76,7 @@ def save_project_image(file, project_id: Optional[int] = None) -> Optional[str]:
     # Resize if it's an image
     if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
         max_size = current_app.config.get('MEDIUM_SIZE', (800, 800))
-        resize_image(filepath, max_size)
+        resize_upload(filepath, max_size)
     
     # Return relative path
     return f"/static/uploads/projects/{filename}"
@@ -94,7 +101,7 @@ def save_kebutuhan_image(file, kebutuhan_id: Optional[int] = None) -> Optional[s
     # Resize if it's an image
     if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
         max_size = current_app.config.get('MEDIUM_SIZE', (800, 800))
-        resize_image(filepath, max_size)
+        resize_upload(filepath, max_size)
     
     # Return relative path
     return f"/static/uploads/kebutuhan/{filename}"
@@ -119,7 +126,7 @@ def save_comment_image(file) -> Optional[str]:
     # Resize if it's an image - smaller for comments
     if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
         max_size = (600, 600)
-        resize_image(filepath, max_size)
+        resize_upload(filepath, max_size)
     
     # Return relative path
     return f"/static/uploads/comments/{filename}"
@@ -143,36 +150,42 @@ def save_avatar_image(file, user_id: int) -> Optional[str]:
     
     # Create thumbnail for avatar
     if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
-        try:
-            with Image.open(filepath) as img:
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'LA'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[-1])
-                    img = background
-                
-                # Crop to square
-                width, height = img.size
-                size = min(width, height)
-                left = (width - size) // 2
-                top = (height - size) // 2
-                right = left + size
-                bottom = top + size
-                img = img.crop((left, top, right, bottom))
-                
-                # Resize to standard avatar size
-                avatar_size = (300, 300)
-                img = img.resize(avatar_size, Image.Resampling.LANCZOS)
-                
-                # Save
-                img.save(filepath, 'JPEG', quality=90, optimize=True)
-        except Exception as e:
-            current_app.logger.error(f"Error processing avatar: {e}")
+        crop_avatar(filepath)
     
     # Return relative path
     return f"/static/uploads/avatars/{filename}"
 
 
+@async_task
+def crop_avatar(image_path: str) -> None:
+    """Crop an uploaded avatar to a 300x300 square in the background."""
+    try:
+        with Image.open(image_path) as img:
+            # Convert to RGB if necessary
+            if img.mode in ('RGBA', 'LA'):
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[-1])
+                img = background
+            
+            # Crop to square
+            width, height = img.size
+            size = min(width, height)
+            left = (width - size) // 2
+            top = (height - size) // 2
+            right = left + size
+            bottom = top + size
+            img = img.crop((left, top, right, bottom))
+            
+            # Resize to standard avatar size
+            avatar_size = (300, 300)
+            img = img.resize(avatar_size, Image.Resampling.LANCZOS)
+            
+            # Save
+            img.save(image_path, 'JPEG', quality=90, optimize=True)
+    except Exception as e:
+        current_app.logger.error(f"Error processing avatar: {e}")
+
+
 def save_temp_file(file) -> Optional[str]:
     """Save file temporarily for processing."""
     if not file:
@@ -193,6 +206,7 @@ def save_temp_file(file) -> Optional[str]:
     return filepath
 
 
+@async_task
 def cleanup_temp_files(age_hours: int = 24) -> int:
     """Clean up old temporary files."""
     from datetime import datetime, timedelta
@@ -1,7 +1,10 @@
 from typing import List, Optional, Dict, Any
 from flask import current_app
-from app.database.models import Kebutuhan, Project, Kategori
+from app.database.models import Kebutuhan, Project, Kategori, Dukungan, Komentar
 from app.database.base import db
+from app.services.query_options import kebutuhan_list_options
+from app.services.stats_service import get_rollup_totals, breakdown, record_bulk_status_change
+from app.utils.pagination import keyset_paginate, paginate
 from datetime import datetime
 
 
@@ -155,7 +158,8 @@ def get_project_kebutuhan(project_id: int, status: str = None) -> List[Kebutuhan
 
 
 def get_user_kebutuhan(
-    user_id: int, page: int = 1, per_page: int = 10
+    user_id: int, page: int = 1, per_page: int = 10,
+    cursor: str = None, keyset: bool = False, with_total: bool = False
 ):
     """Get paginated kebutuhan submitted by a user.
 
@@ -163,14 +167,18 @@ def get_user_kebutuhan(
         user_id: Submitter user ID
         page: Page number
         per_page: Items per page
+        cursor: Cursor from the previous page, with ``keyset``
+        keyset: Paginate on (timestamp, id) instead of page numbers
+        with_total: Count every match, with ``keyset``
 
     Returns:
-        Pagination: Paginated kebutuhan
+        Pagination or CursorPage: Paginated kebutuhan
     """
-    return (
-        Kebutuhan.query.filter_by(pengguna_id=user_id)
-        .order_by(Kebutuhan.timestamp.desc())
-        .paginate(page=page, per_page=per_page, error_out=False)
+    query = Kebutuhan.query.options(*kebutuhan_list_options()).filter_by(pengguna_id=user_id)
+    if keyset:
+        return keyset_paginate(query, Kebutuhan.timestamp, Kebutuhan.id, cursor, per_page, with_total)
+    return query.order_by(Kebutuhan.timestamp.desc()).paginate(
+        page=page, per_page=per_page, error_out=False
     )
 
 
@@ -180,7 +188,11 @@ def get_all_kebutuhan(
     status: str = None,
     prioritas: str = None,
     kategori_id: int = None,
-    search: str = None
+    search: str = None,
+    cursor: str = None,
+    keyset: bool = False,
+    with_total: bool = False,
+    total_estimated: bool = False
 ):
     """Get all kebutuhan with optional filters.
 
@@ -191,14 +203,18 @@ def get_all_kebutuhan(
         prioritas: Priority filter
         kategori_id: Category filter
         search: Search query
+        cursor: Cursor from the previous page, with ``keyset``
+        keyset: Paginate on (timestamp, id) instead of page numbers
+        with_total: Count every match, with ``keyset``
+        total_estimated: Let a large total be estimated
 
     Returns:
-        Pagination: Paginated kebutuhan
+        Pagination or CursorPage: Paginated kebutuhan
     """
     if per_page is None:
         per_page = current_app.config.get('ITEMS_PER_PAGE', 12)
 
-    query = Kebutuhan.query
+    query = Kebutuhan.query.options(*kebutuhan_list_options())
 
     if status:
         query = query.filter_by(status=status)
@@ -214,9 +230,11 @@ def get_all_kebutuhan(
             )
         )
 
-    return query.order_by(Kebutuhan.timestamp.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    if keyset:
+        return keyset_paginate(
+            query, Kebutuhan.timestamp, Kebutuhan.id, cursor, per_page, with_total, total_estimated
+        )
+    return paginate(query.order_by(Kebutuhan.timestamp.desc()), page, per_page, total_estimated)
 
 
 def get_kebutuhan_stats(kebutuhan_id: int = None) -> Dict[str, Any]:
@@ -243,26 +261,18 @@ def get_kebutuhan_stats(kebutuhan_id: int = None) -> Dict[str, Any]:
             'updated_at': kebutuhan.updated_at
         }
     
-    # Global stats
-    total = Kebutuhan.query.count()
-    by_status = db.session.query(
-        Kebutuhan.status, 
-        db.func.count(Kebutuhan.id)
-    ).group_by(Kebutuhan.status).all()
-    
-    by_priority = db.session.query(
-        Kebutuhan.prioritas,
-        db.func.count(Kebutuhan.id)
-    ).group_by(Kebutuhan.prioritas).all()
+    # Global stats, from the daily_stats rollup
+    totals = get_rollup_totals('kebutuhan')
+    by_status = breakdown(totals, 'status')
     
     return {
-        'total': total,
-        'by_status': dict(by_status),
-        'by_priority': dict(by_priority),
-        'pending': Kebutuhan.query.filter_by(status='Diajukan').count(),
-        'in_progress': Kebutuhan.query.filter_by(status='Diproses').count(),
-        'completed': Kebutuhan.query.filter_by(status='Selesai').count(),
-        'rejected': Kebutuhan.query.filter_by(status='Ditolak').count()
+        'total': totals.get('', 0),
+        'by_status': by_status,
+        'by_priority': breakdown(totals, 'priority'),
+        'pending': by_status.get('Diajukan', 0),
+        'in_progress': by_status.get('Diproses', 0),
+        'completed': by_status.get('Selesai', 0),
+        'rejected': by_status.get('Ditolak', 0)
     }
 
 
@@ -287,16 +297,19 @@ def bulk_update_kebutuhan(kebutuhan_ids: List[int], action: str) -> Dict[str, An
 
     try:
         if action == 'approve':
+            record_bulk_status_change(Kebutuhan, kebutuhan_ids, 'Diproses')
             affected = Kebutuhan.query.filter(
                 Kebutuhan.id.in_(kebutuhan_ids)
             ).update({'status': 'Diproses'}, synchronize_session=False)
             
         elif action == 'reject':
+            record_bulk_status_change(Kebutuhan, kebutuhan_ids, 'Ditolak')
             affected = Kebutuhan.query.filter(
                 Kebutuhan.id.in_(kebutuhan_ids)
             ).update({'status': 'Ditolak'}, synchronize_session=False)
             
         elif action == 'complete':
+            record_bulk_status_change(Kebutuhan, kebutuhan_ids, 'Selesai')
             affected = Kebutuhan.query.filter(
                 Kebutuhan.id.in_(kebutuhan_ids)
             ).update({'status': 'Selesai'}, synchronize_session=False)
@@ -350,10 +363,44 @@ def get_popular_kebutuhan(limit: int = 10) -> List[Kebutuhan]:
     Returns:
         List[Kebutuhan]: Popular kebutuhan
     """
-    return Kebutuhan.query.join(
-        Kebutuhan.dukungan
-    ).group_by(
-        Kebutuhan.id
+    return Kebutuhan.query.filter(
+        Kebutuhan.support_count > 0
     ).order_by(
-        db.func.count(Kebutuhan.dukungan).desc()
-    ).limit(limit).all()
\ No newline at end of file
+        Kebutuhan.support_count.desc()
+    ).limit(limit).all()
+
+
+def recount_kebutuhan_counters() -> int:
+    """Recompute the denormalized support/comment counters of every kebutuhan.
+
+    Repairs drift caused by writes that bypass the services (cascading
+    deletes, manual SQL, bulk imports).
+
+    Returns:
+        int: Number of kebutuhan whose counters were corrected
+    """
+    support_total = db.session.query(
+        db.func.count(Dukungan.id)
+    ).filter(
+        Dukungan.kebutuhan_id == Kebutuhan.id
+    ).correlate(Kebutuhan).scalar_subquery()
+
+    comment_total = db.session.query(
+        db.func.count(Komentar.id)
+    ).filter(
+        Komentar.kebutuhan_id == Kebutuhan.id
+    ).correlate(Kebutuhan).scalar_subquery()
+
+    affected = Kebutuhan.query.filter(
+        db.or_(
+            Kebutuhan.support_count != support_total,
+            Kebutuhan.comment_count != comment_total
+        )
+    ).update({
+        Kebutuhan.support_count: support_total,
+        Kebutuhan.comment_count: comment_total
+    }, synchronize_session=False)
+
+    db.session.commit()
+    current_app.logger.info(f"Recounted counters, {affected} kebutuhan corrected")
+    return affected
\ No newline at end of file
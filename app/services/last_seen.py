@@ -0,0 +1,127 @@
+# app/services/last_seen.py
+"""Coalesced last_seen tracking.
+
+A touch only queues a write when the user's last_seen is older than
+LAST_SEEN_GRANULARITY seconds. Queued timestamps are written in bulk every
+LAST_SEEN_FLUSH_INTERVAL seconds by a background thread, so an active user
+costs at most one UPDATE per granularity window per process instead of a
+commit per request. Users loaded while a timestamp is queued see it.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy import bindparam, event, or_
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.database.models import Pengguna
+from app.utils.write_behind import WriteBehindBuffer
+
+
+class LastSeenTracker(WriteBehindBuffer):
+    """Buffer of last_seen timestamps keyed by user id."""
+
+    name = "last-seen"
+
+    def __init__(self, app, granularity: int = 300, interval: float = None, max_pending: int = 10000):
+        super().__init__(app, interval, max_pending)
+        self.granularity = timedelta(seconds=granularity)
+        # Latest timestamp written or queued by this process per user
+        self._known = {}
+
+    def _merge(self, pending, user_id, seen):
+        if pending.get(user_id) is None or pending[user_id] < seen:
+            pending[user_id] = seen
+
+    def discard(self):
+        super().discard()
+        self._known.clear()
+
+    def pending(self, user_id: int) -> Optional[datetime]:
+        """Get the queued last_seen of a user, if any."""
+        return self._pending.get(user_id) or self._flushing.get(user_id)
+
+    def touch(self, user_id: int, stored: datetime = None, now: datetime = None) -> Optional[datetime]:
+        """Mark a user as seen, queueing a write if the stored value is stale.
+
+        Args:
+            user_id: User ID
+            stored: The user's last_seen, when already loaded
+            now: Time of the visit, defaults to now
+
+        Returns:
+            datetime: The queued timestamp, or None if no write was needed
+        """
+        now = now or datetime.utcnow()
+        known = max(filter(None, (stored, self._known.get(user_id))), default=None)
+        if known is not None and now - known < self.granularity:
+            return None
+
+        if len(self._known) >= self.max_pending:
+            self._known.clear()
+        self._known[user_id] = now
+        self._queue(user_id, now)
+        return now
+
+    def _write(self, connection, batch):
+        table = Pengguna.__table__
+        # Never move last_seen backwards, e.g. when another process wrote later
+        connection.execute(
+            table.update()
+            .where(
+                table.c.id == bindparam("user_id"),
+                or_(table.c.last_seen.is_(None), table.c.last_seen < bindparam("seen"))
+            )
+            .values(last_seen=bindparam("seen")),
+            [{"user_id": user_id, "seen": seen} for user_id, seen in batch.items()]
+        )
+
+
+def init_last_seen(app) -> LastSeenTracker:
+    """Create the last_seen tracker for ``app``."""
+    tracker = LastSeenTracker(
+        app,
+        app.config.get("LAST_SEEN_GRANULARITY", 300),
+        app.config.get("LAST_SEEN_FLUSH_INTERVAL", 30),
+        app.config.get("LAST_SEEN_MAX_PENDING", 10000),
+    )
+    app.extensions["last_seen"] = tracker
+    return tracker
+
+
+def get_last_seen_tracker() -> LastSeenTracker:
+    """Get the last_seen tracker of the current app."""
+    return current_app.extensions["last_seen"]
+
+
+def touch_user(user: Pengguna) -> bool:
+    """Mark ``user`` as seen now without writing to the database now.
+
+    Returns:
+        bool: True if a write was queued
+    """
+    seen = get_last_seen_tracker().touch(user.id, user.last_seen)
+    if seen is None:
+        return False
+    # Show the new value on this instance without marking it dirty
+    set_committed_value(user, "last_seen", seen)
+    return True
+
+
+def flush_last_seen() -> int:
+    """Write the current app's queued last_seen timestamps now."""
+    return get_last_seen_tracker().flush()
+
+
+# Merging queued timestamps into loaded users
+
+@event.listens_for(Pengguna, "load")
+@event.listens_for(Pengguna, "refresh")
+def _add_pending(target, context, attrs=None):
+    if attrs is not None and "last_seen" not in attrs:
+        return
+    if not has_app_context() or "last_seen" not in current_app.extensions:
+        return
+    seen = get_last_seen_tracker().pending(target.id)
+    if seen is not None and (target.last_seen is None or target.last_seen < seen):
+        set_committed_value(target, "last_seen", seen)
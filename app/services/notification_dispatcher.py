@@ -0,0 +1,124 @@
+# app/services/notification_dispatcher.py
+"""Background notification fan-out.
+
+Requests queue notifications with ``dispatch()`` and return at once. A
+background thread hands the queue to the task queue every
+NOTIFICATION_FLUSH_INTERVAL seconds, or as soon as NOTIFICATION_BATCH_SIZE
+are waiting, as one insert_notifications job that writes the batch with
+``bulk_insert_mappings``. Notifications for users that no longer exist are
+dropped at write time. A batch whose job fails inline (the ``sync``
+backend) is kept for the next flush; queued backends retry the job.
+"""
+import itertools
+from collections import Counter
+from typing import Any, Dict, List
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.database.base import db
+from app.database.models import Notification, Pengguna
+from app.services.user_service import invalidate_user_counts
+from app.utils.decorators import async_task
+from app.utils.tasks import FAILED, get_job
+from app.utils.write_behind import WriteBehindBuffer
+
+
+class NotificationDispatcher(WriteBehindBuffer):
+    """Queue of notification rows keyed by arrival order."""
+
+    name = "notification-dispatcher"
+
+    def __init__(self, app, interval: float = None, max_pending: int = 500):
+        super().__init__(app, interval, max_pending)
+        self._sequence = itertools.count()
+
+    def dispatch(self, user_id: int, type: str, title: str, message: str = None, link: str = None):
+        """Queue a notification for ``user_id``."""
+        self._queue(next(self._sequence), {
+            "user_id": user_id,
+            "type": type,
+            "title": title,
+            "message": message,
+            "link": link,
+            "is_read": False,
+        })
+
+    def flush(self) -> int:
+        """Hand the queued notifications to the task queue as one job.
+
+        Returns:
+            int: Number of notifications handed over
+        """
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+
+        try:
+            with self.app.app_context():
+                job_id = insert_notifications([batch[key] for key in sorted(batch)])
+                job = get_job(job_id)
+            # The sync backend runs the job inline and records its failure
+            # on the job rather than raising it
+            if job is not None and job["status"] == FAILED:
+                raise RuntimeError(f"insert_notifications job {job_id} failed")
+        except Exception:
+            # Keep the notifications for the next attempt
+            with self._lock:
+                self._pending.update(batch)
+            raise
+        return len(batch)
+
+
+@async_task
+def insert_notifications(rows: List[Dict[str, Any]]) -> int:
+    """Insert notification rows with one bulk_insert_mappings.
+
+    Rows for users that no longer exist are dropped.
+
+    Returns:
+        int: Number of notifications inserted
+    """
+    user_ids = {row["user_id"] for row in rows}
+    existing = set(db.session.execute(
+        select(Pengguna.id).where(Pengguna.id.in_(user_ids))
+    ).scalars())
+    if existing != user_ids:
+        current_app.logger.warning(f"Dropping notifications for missing users {sorted(user_ids - existing)}")
+        rows = [row for row in rows if row["user_id"] in existing]
+    if not rows:
+        return 0
+
+    from app.services.notification_service import adjust_unread_counts, publish_notifications
+
+    db.session.bulk_insert_mappings(Notification, rows)
+    adjust_unread_counts(Counter(row["user_id"] for row in rows))
+    db.session.commit()
+
+    # Bulk inserts skip the mapper events that invalidate cached counts
+    invalidate_user_counts(*existing)
+    publish_notifications(rows)
+    current_app.logger.info(f"Inserted {len(rows)} queued notification(s)")
+    return len(rows)
+
+
+def init_notifications(app) -> NotificationDispatcher:
+    """Create the notification dispatcher for ``app``."""
+    dispatcher = NotificationDispatcher(
+        app,
+        app.config.get("NOTIFICATION_FLUSH_INTERVAL", 1),
+        app.config.get("NOTIFICATION_BATCH_SIZE", 500),
+    )
+    app.extensions["notification_dispatcher"] = dispatcher
+    return dispatcher
+
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """Get the notification dispatcher of the current app."""
+    return current_app.extensions["notification_dispatcher"]
+
+
+def flush_notifications() -> int:
+    """Write the current app's queued notifications now."""
+    return get_notification_dispatcher().flush()
@@ -1,8 +1,20 @@
 # app/services/notification_service.py
-from typing import List, Optional, Dict, Any
+import csv
+import io
+import itertools
+import time
+from collections import Counter
+from typing import List, Optional, Dict, Any, Iterable
 from flask import current_app
+from sqlalchemy import bindparam, select
 from app.database.models import Notification, Pengguna
 from app.database.base import db
+from app.services.user_service import invalidate_user_counts
+from app.services.notification_dispatcher import get_notification_dispatcher
+from app.utils.decorators import async_task
+from app.utils.pagination import keyset_paginate
+from app.utils.pubsub import get_broker
+from app.utils.retention import prune
 from datetime import datetime, timedelta
 
 
@@ -41,12 +53,94 @@ def create_notification(
     )
     
     db.session.add(notification)
+    # Keep the denormalized counter in the same transaction as the insert
+    adjust_unread_counts({user_id: 1})
     db.session.commit()
+    publish_notifications([{
+        'id': notification.id, 'user_id': user_id, 'type': type, 'title': title,
+        'message': message, 'link': link, 'created_at': notification.created_at
+    }])
     
     current_app.logger.info(f"Notification created for user {user_id}: {title}")
     return notification
 
 
+def adjust_unread_counts(deltas: Dict[int, int], connection=None):
+    """Add ``deltas`` keyed by user ID to the users' unread counters.
+
+    Args:
+        deltas: User ID -> change in unread notifications
+        connection: Connection to write with, the session's by default
+    """
+    params = [{'user_pk': user_id, 'delta': delta} for user_id, delta in deltas.items() if delta]
+    if not params:
+        return
+
+    table = Pengguna.__table__
+    statement = table.update().where(
+        table.c.id == bindparam('user_pk')
+    ).values(unread_notification_count=table.c.unread_notification_count + bindparam('delta'))
+    (connection or db.session.connection()).execute(statement, params)
+
+
+def _stream_channel(user_id: int) -> str:
+    return f"notifications:{user_id}"
+
+
+def publish_notifications(rows: Iterable[Dict[str, Any]]) -> int:
+    """Push committed notifications to their users' open streams.
+
+    Args:
+        rows: Notification dicts with at least 'user_id', 'type' and 'title'
+
+    Returns:
+        int: Number of deliveries to subscribed streams
+    """
+    return get_broker().publish_many(
+        (_stream_channel(row['user_id']), {
+            'id': row.get('id'),
+            'type': row['type'],
+            'title': row['title'],
+            'message': row.get('message'),
+            'link': row.get('link'),
+            'created_at': row['created_at'].isoformat() if isinstance(row.get('created_at'), datetime)
+            else row.get('created_at'),
+        })
+        for row in rows
+    )
+
+
+def subscribe_notifications(user_id: int):
+    """Subscribe to the notifications published for ``user_id``.
+
+    Returns:
+        Subscription with ``get(timeout)`` and ``close()``
+    """
+    return get_broker().subscribe(_stream_channel(user_id))
+
+
+def queue_notification(
+    user_id: int,
+    type: str,
+    title: str,
+    message: str = None,
+    link: str = None
+):
+    """Queue a notification for a user without writing it now.
+
+    The notification dispatcher inserts queued notifications in batches
+    from a background thread; ones for missing users are dropped there.
+
+    Args:
+        user_id: Target user ID
+        type: Notification type
+        title: Notification title
+        message: Optional notification message
+        link: Optional link URL
+    """
+    get_notification_dispatcher().dispatch(user_id, type, title, message, link)
+
+
 def mark_notification_read(notification_id: int, user_id: int) -> bool:
     """Mark a notification as read.
 
@@ -60,19 +154,23 @@ def mark_notification_read(notification_id: int, user_id: int) -> bool:
     Raises:
         ValueError: If notification not found or doesn't belong to user
     """
-    notification = Notification.query.filter_by(
+    # Only the request whose UPDATE flips the row decrements the counter
+    marked = Notification.query.filter_by(
         id=notification_id,
-        user_id=user_id
-    ).first()
-    
-    if not notification:
-        raise ValueError("Notifikasi tidak ditemukan")
+        user_id=user_id,
+        is_read=False
+    ).update({'is_read': True})
     
-    if not notification.is_read:
-        notification.is_read = True
-        db.session.commit()
-        current_app.logger.info(f"Notification {notification_id} marked as read")
+    if not marked:
+        if Notification.query.filter_by(id=notification_id, user_id=user_id).first() is None:
+            raise ValueError("Notifikasi tidak ditemukan")
+        return True
     
+    adjust_unread_counts({user_id: -marked})
+    db.session.commit()
+    # Bulk UPDATE skips the mapper events that invalidate the cached counts
+    invalidate_user_counts(user_id)
+    current_app.logger.info(f"Notification {notification_id} marked as read")
     return True
 
 
@@ -89,8 +187,14 @@ def mark_all_notifications_read(user_id: int) -> int:
         user_id=user_id,
         is_read=False
     ).update({'is_read': True})
+    Pengguna.query.filter_by(id=user_id).update(
+        {Pengguna.unread_notification_count: 0},
+        synchronize_session=False
+    )
     
     db.session.commit()
+    # Bulk UPDATE skips the mapper events that invalidate the cached counts
+    invalidate_user_counts(user_id)
     current_app.logger.info(f"Marked {count} notifications as read for user {user_id}")
     return count
 
@@ -99,7 +203,10 @@ def get_user_notifications(
     user_id: int,
     unread_only: bool = False,
     page: int = 1,
-    per_page: int = 20
+    per_page: int = 20,
+    cursor: str = None,
+    keyset: bool = False,
+    with_total: bool = False
 ):
     """Get paginated notifications for a user.
 
@@ -108,15 +215,20 @@ def get_user_notifications(
         unread_only: Whether to get only unread notifications
         page: Page number
         per_page: Items per page
+        cursor: Cursor from the previous page, with ``keyset``
+        keyset: Paginate on (created_at, id) instead of page numbers
+        with_total: Count every match, with ``keyset``
 
     Returns:
-        Pagination: Paginated notifications
+        Pagination or CursorPage: Paginated notifications
     """
     query = Notification.query.filter_by(user_id=user_id)
     
     if unread_only:
         query = query.filter_by(is_read=False)
     
+    if keyset:
+        return keyset_paginate(query, Notification.created_at, Notification.id, cursor, per_page, with_total)
     return query.order_by(Notification.created_at.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
@@ -131,10 +243,9 @@ def get_unread_count(user_id: int) -> int:
     Returns:
         int: Number of unread notifications
     """
-    return Notification.query.filter_by(
-        user_id=user_id,
-        is_read=False
-    ).count()
+    return db.session.query(Pengguna.unread_notification_count).filter_by(
+        id=user_id
+    ).scalar() or 0
 
 
 def delete_notification(notification_id: int, user_id: int) -> bool:
@@ -159,69 +270,151 @@ def delete_notification(notification_id: int, user_id: int) -> bool:
         raise ValueError("Notifikasi tidak ditemukan")
     
     db.session.delete(notification)
+    if not notification.is_read:
+        adjust_unread_counts({user_id: -1})
     db.session.commit()
     
     current_app.logger.info(f"Notification {notification_id} deleted")
     return True
 
 
-def delete_old_notifications(days: int = 30) -> int:
+@async_task
+def delete_old_notifications(
+    days: int = 30,
+    batch_size: int = None,
+    sleep: float = None,
+    dry_run: bool = False
+) -> int:
     """Delete notifications older than specified days.
 
+    Rows are deleted in primary key batches, each committed with the
+    matching unread counter decrements.
+
     Args:
         days: Number of days to keep
+        batch_size: Notification IDs per batch, RETENTION_BATCH_SIZE by default
+        sleep: Seconds between batches, RETENTION_BATCH_SLEEP by default
+        dry_run: Only count the notifications that would be deleted
 
     Returns:
         int: Number of notifications deleted
     """
     cutoff_date = datetime.utcnow() - timedelta(days=days)
-    count = Notification.query.filter(
-        Notification.created_at < cutoff_date
-    ).delete()
-    
-    db.session.commit()
+    table = Notification.__table__
+    touched = set()
+
+    def decrement_unread(connection, condition):
+        unread = connection.execute(
+            select(table.c.user_id, db.func.count()).where(
+                condition, table.c.is_read.is_(False)
+            ).group_by(table.c.user_id)
+        ).all()
+        adjust_unread_counts({user_id: -total for user_id, total in unread}, connection)
+        touched.update(user_id for user_id, _ in unread)
+
+    count = prune(table, table.c.created_at, cutoff_date, batch_size, sleep, dry_run, decrement_unread)
+    if dry_run:
+        return count
+
+    invalidate_user_counts(*touched)
     current_app.logger.info(f"Deleted {count} old notifications (older than {days} days)")
     return count
 
 
+NOTIFICATION_COLUMNS = ('user_id', 'type', 'title', 'message', 'link', 'is_read', 'created_at')
+
+
+def _copy_notifications(connection, rows: List[Dict[str, Any]]):
+    """Load ``rows`` with COPY FROM STDIN over the psycopg2 connection."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # Unquoted empty CSV fields load as NULL
+        writer.writerow(['' if row[column] is None else row[column] for column in NOTIFICATION_COLUMNS])
+    buffer.seek(0)
+
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY notifications ({', '.join(NOTIFICATION_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
 def bulk_create_notifications(
-    user_ids: List[int],
+    user_ids: Iterable[int],
     type: str,
     title: str,
     message: str = None,
-    link: str = None
-) -> List[Notification]:
-    """Create notifications for multiple users.
+    link: str = None,
+    chunk_size: int = None
+) -> Dict[str, Any]:
+    """Create the same notification for many users without ORM objects.
+
+    User IDs are consumed lazily in chunks, so a generator or a
+    ``yield_per`` query works for any audience size. Each chunk is
+    inserted and committed on its own connection, with COPY on
+    PostgreSQL/psycopg2 and an executemany INSERT elsewhere. The user IDs
+    are not checked; pass IDs of existing users.
 
     Args:
-        user_ids: List of user IDs
+        user_ids: Target user IDs
         type: Notification type
         title: Notification title
         message: Optional notification message
         link: Optional link URL
+        chunk_size: Users per chunk, NOTIFICATION_CHUNK_SIZE by default
 
     Returns:
-        List[Notification]: Created notifications
+        Dict: 'inserted', 'chunks', 'seconds' and 'per_second'
     """
-    notifications = []
-    
-    for user_id in user_ids:
-        try:
-            notification = Notification(
-                user_id=user_id,
-                type=type,
-                title=title,
-                message=message,
-                link=link
-            )
-            db.session.add(notification)
-            notifications.append(notification)
-        except Exception as e:
-            current_app.logger.error(f"Error creating notification for user {user_id}: {e}")
-    
-    db.session.commit()
-    current_app.logger.info(f"Created {len(notifications)} bulk notifications")
-    return notifications
+    if chunk_size is None:
+        chunk_size = current_app.config.get('NOTIFICATION_CHUNK_SIZE', 1000)
+
+    table = Notification.__table__
+    use_copy = db.engine.dialect.name == 'postgresql' and db.engine.driver == 'psycopg2'
+    created_at = datetime.utcnow()
+    ids = iter(user_ids)
+    inserted = chunks = 0
+    started = time.perf_counter()
+
+    while True:
+        chunk = list(itertools.islice(ids, chunk_size))
+        if not chunk:
+            break
+
+        rows = [
+            {'user_id': user_id, 'type': type, 'title': title, 'message': message,
+             'link': link, 'is_read': False, 'created_at': created_at}
+            for user_id in chunk
+        ]
+        with db.engine.begin() as connection:
+            if use_copy:
+                _copy_notifications(connection, rows)
+            else:
+                connection.execute(table.insert(), rows)
+            adjust_unread_counts(Counter(chunk), connection)
+
+        # Bulk inserts skip the mapper events that invalidate cached counts
+        invalidate_user_counts(*chunk)
+        publish_notifications(rows)
+        inserted += len(rows)
+        chunks += 1
+
+    seconds = time.perf_counter() - started
+    per_second = inserted / seconds if seconds else 0.0
+    current_app.logger.info(
+        f"Created {inserted} bulk notifications in {chunks} chunk(s), "
+        f"{seconds:.2f}s ({per_second:.0f}/s)"
+    )
+    return {
+        'inserted': inserted,
+        'chunks': chunks,
+        'seconds': seconds,
+        'per_second': per_second
+    }
 
 
 def get_notification_stats(user_id: int = None) -> Dict[str, Any]:
@@ -270,6 +463,33 @@ def get_notification_stats(user_id: int = None) -> Dict[str, Any]:
     }
 
 
+def recount_unread_notifications() -> int:
+    """Recompute every user's denormalized unread notification counter.
+
+    Repairs drift caused by writes that bypass the service (cascading
+    deletes, manual SQL).
+
+    Returns:
+        int: Number of users whose counter was corrected
+    """
+    unread_total = db.session.query(
+        db.func.count(Notification.id)
+    ).filter(
+        Notification.user_id == Pengguna.id,
+        Notification.is_read.is_(False)
+    ).correlate(Pengguna).scalar_subquery()
+
+    affected = Pengguna.query.filter(
+        Pengguna.unread_notification_count != unread_total
+    ).update({
+        Pengguna.unread_notification_count: unread_total
+    }, synchronize_session=False)
+
+    db.session.commit()
+    current_app.logger.info(f"Recounted unread notifications, corrected {affected} user(s)")
+    return affected
+
+
 # Predefined notification types and their templates
 NOTIFICATION_TYPES = {
     'comment': {
@@ -0,0 +1,71 @@
+# app/services/notification_streams.py
+"""Caps on open notification streams.
+
+A Server-Sent Events stream holds a worker thread for as long as it is
+open, up to NOTIFICATION_STREAM_TIMEOUT seconds, so uncapped streams
+would take every thread from ordinary requests. Each process admits at
+most NOTIFICATION_STREAMS_PER_WORKER streams, and at most
+NOTIFICATION_STREAMS_PER_USER of them for one user. A browser whose
+stream is refused polls the unread count instead.
+"""
+import threading
+from collections import Counter
+
+from flask import current_app
+
+
+class StreamSlots:
+    """Open streams of this process, per user."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open = Counter()
+
+    def acquire(self, user_id: int, per_worker: int, per_user: int) -> bool:
+        """Take a slot for a stream of ``user_id``.
+
+        Returns:
+            bool: False if either cap is reached
+        """
+        with self._lock:
+            if sum(self._open.values()) >= per_worker or self._open[user_id] >= per_user:
+                return False
+            self._open[user_id] += 1
+            return True
+
+    def release(self, user_id: int):
+        """Give back a slot taken with acquire()."""
+        with self._lock:
+            self._open[user_id] -= 1
+            if self._open[user_id] <= 0:
+                del self._open[user_id]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(self._open.values())
+
+
+def init_notification_streams(app) -> StreamSlots:
+    """Create the stream slots of ``app``."""
+    slots = StreamSlots()
+    app.extensions["notification_streams"] = slots
+    return slots
+
+
+def get_notification_streams() -> StreamSlots:
+    """Get the stream slots of the current app."""
+    return current_app.extensions["notification_streams"]
+
+
+def acquire_stream(user_id: int) -> bool:
+    """Take a stream slot for ``user_id`` within the configured caps."""
+    return get_notification_streams().acquire(
+        user_id,
+        current_app.config.get("NOTIFICATION_STREAMS_PER_WORKER", 8),
+        current_app.config.get("NOTIFICATION_STREAMS_PER_USER", 2),
+    )
+
+
+def release_stream(user_id: int):
+    """Give back the stream slot of ``user_id``."""
+    get_notification_streams().release(user_id)
@@ -1,7 +1,11 @@
 from typing import List, Optional, Dict, Any
 from flask import current_app
-from app.database.models import Project, Kategori, ProjectCollaborator, Pengguna
+from app.database.models import Project, Kategori, Kebutuhan, ProjectCollaborator, Pengguna
 from app.database.base import db
+from app.services.query_options import project_list_options
+from app.services.search_index import apply_search
+from app.services.stats_service import get_rollup_totals, breakdown, record_bulk_status_change
+from app.utils.pagination import keyset_paginate, paginate
 from datetime import datetime
 
 
@@ -134,36 +138,113 @@ def delete_project(project_id: int) -> bool:
     return True
 
 
-def get_user_projects(user_id: int, page: int = 1, per_page: int = 10):
+def get_project_aggregates(project_ids: List[int]) -> Dict[int, Dict[str, int]]:
+    """Compute kebutuhan count, completion and support totals for many projects.
+
+    Uses a single grouped query over kebutuhan instead of three queries
+    per project.
+
+    Args:
+        project_ids: Project IDs to aggregate
+
+    Returns:
+        Dict: Aggregates keyed by project ID; projects without kebutuhan get zeros
+    """
+    aggregates = {
+        project_id: {"kebutuhan_count": 0, "completed_count": 0, "total_support": 0, "completion_percentage": 0}
+        for project_id in project_ids
+    }
+    if not aggregates:
+        return aggregates
+
+    rows = (
+        db.session.query(
+            Kebutuhan.project_id,
+            db.func.count(Kebutuhan.id),
+            db.func.sum(db.case((Kebutuhan.status == "Selesai", 1), else_=0)),
+            db.func.sum(Kebutuhan.support_count),
+        )
+        .filter(Kebutuhan.project_id.in_(list(aggregates)))
+        .group_by(Kebutuhan.project_id)
+        .all()
+    )
+
+    for project_id, total, completed, support in rows:
+        completed = completed or 0
+        aggregates[project_id] = {
+            "kebutuhan_count": total,
+            "completed_count": completed,
+            "total_support": support or 0,
+            "completion_percentage": int((completed / total) * 100) if total else 0,
+        }
+
+    return aggregates
+
+
+def load_project_aggregates(projects: List[Project]) -> List[Project]:
+    """Attach batch-computed aggregates to project instances.
+
+    Afterwards ``kebutuhan_count``, ``completion_percentage`` and
+    ``total_support`` are served from memory until the instance expires.
+
+    Args:
+        projects: Projects to populate
+
+    Returns:
+        List[Project]: The same projects
+    """
+    aggregates = get_project_aggregates([project.id for project in projects])
+    for project in projects:
+        project._aggregates = aggregates[project.id]
+    return projects
+
+
+def get_user_projects(
+    user_id: int, page: int = 1, per_page: int = 10,
+    cursor: str = None, keyset: bool = False, with_total: bool = False
+):
     """Get paginated projects for a user.
 
     Args:
         user_id: Owner user ID
         page: Page number
         per_page: Items per page
+        cursor: Cursor from the previous page, with ``keyset``
+        keyset: Paginate on (timestamp, id) instead of page numbers
+        with_total: Count every match, with ``keyset``
 
     Returns:
-        Pagination: Paginated projects
+        Pagination or CursorPage: Paginated projects
     """
-    return (
-        Project.query.filter_by(pengguna_id=user_id)
-        .order_by(Project.timestamp.desc())
-        .paginate(page=page, per_page=per_page, error_out=False)
-    )
+    query = Project.query.options(*project_list_options()).filter_by(pengguna_id=user_id)
+    if keyset:
+        projects = keyset_paginate(query, Project.timestamp, Project.id, cursor, per_page, with_total)
+    else:
+        projects = query.order_by(Project.timestamp.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    load_project_aggregates(projects.items)
+    return projects
 
 
-def get_recent_projects(page: int = 1, per_page: int = 10, status: str = None):
+def get_recent_projects(
+    page: int = 1, per_page: int = 10, status: str = None,
+    cursor: str = None, keyset: bool = False, with_total: bool = False,
+    total_estimated: bool = False
+):
     """Get recently created projects.
 
     Args:
         page: Page number
         per_page: Items per page
         status: Optional status filter
+        cursor: Cursor from the previous page, with ``keyset``
+        keyset: Paginate on (timestamp, id) instead of page numbers
+        with_total: Count every match, with ``keyset``
+        total_estimated: Let a large total be estimated
 
     Returns:
-        Pagination: Paginated recent projects
+        Pagination or CursorPage: Paginated recent projects
     """
-    query = Project.query
+    query = Project.query.options(*project_list_options())
 
     if status:
         query = query.filter_by(status=status)
@@ -171,7 +252,14 @@ def get_recent_projects(page: int = 1, per_page: int = 10, status: str = None):
         # Default to active projects only
         query = query.filter_by(status="Aktif")
 
-    return query.order_by(Project.timestamp.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    if keyset:
+        projects = keyset_paginate(
+            query, Project.timestamp, Project.id, cursor, per_page, with_total, total_estimated
+        )
+    else:
+        projects = paginate(query.order_by(Project.timestamp.desc()), page, per_page, total_estimated)
+    load_project_aggregates(projects.items)
+    return projects
 
 
 def get_all_projects(
@@ -192,7 +280,7 @@ def get_all_projects(
     if per_page is None:
         per_page = current_app.config.get("ITEMS_PER_PAGE", 12)
 
-    query = Project.query
+    query = Project.query.options(*project_list_options())
 
     if status:
         query = query.filter_by(status=status)
@@ -201,7 +289,9 @@ def get_all_projects(
     if search:
         query = query.filter(db.or_(Project.judul.contains(search), Project.deskripsi.contains(search)))
 
-    return query.order_by(Project.timestamp.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    projects = query.order_by(Project.timestamp.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    load_project_aggregates(projects.items)
+    return projects
 
 
 def get_project_stats(project_id: int = None) -> Dict[str, Any]:
@@ -234,24 +324,22 @@ def get_project_stats(project_id: int = None) -> Dict[str, Any]:
             "updated_at": project.updated_at,
         }
 
-    # Global stats
-    total = Project.query.count()
-    by_status = db.session.query(Project.status, db.func.count(Project.id)).group_by(Project.status).all()
-
-    by_category = (
-        db.session.query(Kategori.nama, db.func.count(Project.id))
-        .join(Project, Kategori.id == Project.kategori_id)
-        .group_by(Kategori.nama)
-        .all()
-    )
+    # Global stats, from the daily_stats rollup
+    totals = get_rollup_totals("projects")
+    by_status = breakdown(totals, "status")
+    category_names = dict(db.session.query(Kategori.id, Kategori.nama).all())
+    by_category = {
+        category_names.get(int(category_id), category_id): count
+        for category_id, count in breakdown(totals, "category").items()
+    }
 
     return {
-        "total": total,
-        "active": Project.query.filter_by(status="Aktif").count(),
-        "completed": Project.query.filter_by(status="Selesai").count(),
-        "closed": Project.query.filter_by(status="Ditutup").count(),
-        "by_status": dict(by_status),
-        "by_category": dict(by_category),
+        "total": totals.get("", 0),
+        "active": by_status.get("Aktif", 0),
+        "completed": by_status.get("Selesai", 0),
+        "closed": by_status.get("Ditutup", 0),
+        "by_status": by_status,
+        "by_category": by_category,
     }
 
 
@@ -276,16 +364,19 @@ def bulk_update_projects(project_ids: List[int], action: str) -> Dict[str, Any]:
 
     try:
         if action == "activate":
+            record_bulk_status_change(Project, project_ids, "Aktif")
             affected = Project.query.filter(Project.id.in_(project_ids)).update(
                 {"status": "Aktif"}, synchronize_session=False
             )
 
         elif action == "complete":
+            record_bulk_status_change(Project, project_ids, "Selesai")
             affected = Project.query.filter(Project.id.in_(project_ids)).update(
                 {"status": "Selesai"}, synchronize_session=False
             )
 
         elif action == "close":
+            record_bulk_status_change(Project, project_ids, "Ditutup")
             affected = Project.query.filter(Project.id.in_(project_ids)).update(
                 {"status": "Ditutup"}, synchronize_session=False
             )
@@ -392,7 +483,7 @@ def get_project_collaborators(project_id: int) -> List[ProjectCollaborator]:
 
 
 def search_projects(query: str, category_id: int = None, status: str = None, page: int = 1, per_page: int = None):
-    """Search projects.
+    """Search projects, most relevant first.
 
     Args:
         query: Search query
@@ -407,9 +498,7 @@ def search_projects(query: str, category_id: int = None, status: str = None, pag
     if per_page is None:
         per_page = current_app.config.get("ITEMS_PER_PAGE", 12)
 
-    search_query = Project.query.filter(
-        db.or_(Project.judul.ilike(f"%{query}%"), Project.deskripsi.ilike(f"%{query}%"))
-    )
+    search_query = apply_search(Project.query, Project, query)
 
     if category_id:
         search_query = search_query.filter_by(kategori_id=category_id)
@@ -0,0 +1,45 @@
+from typing import List
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.interfaces import LoaderOption
+from app.database.models import Project, Kebutuhan, Dukungan
+
+# Loader options for list views. Each function returns the eager loads a
+# view needs so rendering a page does not issue one query per row for the
+# owner, category or project of every item.
+#
+# All relations loaded here are many-to-one, so joinedload adds a LEFT
+# OUTER JOIN without multiplying rows and is safe to combine with
+# LIMIT/OFFSET pagination.
+
+
+def project_list_options() -> List[LoaderOption]:
+    """Options for project cards (owner and category)."""
+    return [
+        joinedload(Project.pemilik),
+        joinedload(Project.kategori_project),
+    ]
+
+
+def kebutuhan_list_options() -> List[LoaderOption]:
+    """Options for kebutuhan rows (project, submitter and category)."""
+    return [
+        joinedload(Kebutuhan.project),
+        joinedload(Kebutuhan.pengaju),
+        joinedload(Kebutuhan.kategori_kebutuhan),
+    ]
+
+
+def user_support_options() -> List[LoaderOption]:
+    """Options for a user's support history (supported kebutuhan with project and category)."""
+    kebutuhan = joinedload(Dukungan.kebutuhan_didukung)
+    return [
+        kebutuhan.joinedload(Kebutuhan.project),
+        kebutuhan.joinedload(Kebutuhan.kategori_kebutuhan),
+    ]
+
+
+def supporter_list_options() -> List[LoaderOption]:
+    """Options for the supporters of a kebutuhan."""
+    return [
+        joinedload(Dukungan.pendukung),
+    ]
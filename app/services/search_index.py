@@ -0,0 +1,530 @@
+# app/services/search_index.py
+"""Full-text search backends.
+
+search_service narrows its queries through the backend selected by the
+SEARCH_BACKEND setting:
+
+* ``postgresql`` - weighted ``tsvector`` GIN indexes declared in models
+* ``sqlite`` - FTS5 virtual tables stored next to the source tables
+* ``memory`` - pure-Python inverted index for any other database
+
+Every backend ranks matches with the field weights from
+``models.SEARCH_FIELDS`` and runs without an external service.
+"""
+import math
+import re
+import sqlite3
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, List, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import bindparam, event, inspect, text
+from sqlalchemy.orm import Session, object_session
+
+from app.database.base import db
+from app.database.models import SEARCH_FIELDS, search_vector
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Numeric weights for the SQLite and memory backends
+WEIGHTS = {"A": 4.0, "B": 1.0}
+
+
+def tokenize(value) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(value.lower()) if value else []
+
+
+class SearchBackend:
+    """Base class for search backends."""
+
+    name = None
+    # Transactional backends write the index inside the ORM transaction at
+    # flush time; the others apply changes once the transaction commits.
+    transactional = True
+
+    def __init__(self, app):
+        self.app = app
+
+    def setup(self):
+        """Create index structures and fill them if they are empty."""
+
+    def apply(self, query, model, terms: List[str]):
+        """Restrict ``query`` to rows matching all ``terms``, best match first."""
+        raise NotImplementedError
+
+    def index(self, connection, model, ids: Iterable[int]):
+        """Add or refresh the given rows."""
+
+    def remove(self, connection, model, ids: Iterable[int]):
+        """Drop the given rows from the index."""
+
+    def rebuild(self, model=None) -> int:
+        """Rebuild the index from the source tables.
+
+        Returns:
+            int: Number of documents indexed
+        """
+        return 0
+
+
+class PostgresSearchBackend(SearchBackend):
+    """``tsvector`` matching backed by the GIN expression indexes in models.
+
+    PostgreSQL maintains those indexes itself, so index/remove are no-ops.
+    """
+
+    name = "postgresql"
+
+    def apply(self, query, model, terms):
+        vector = search_vector(*SEARCH_FIELDS[model])
+        tsquery = db.func.to_tsquery(
+            db.literal_column("'simple'"),
+            " & ".join(f"{term}:*" for term in terms)
+        )
+        return query.filter(vector.op("@@")(tsquery)).order_by(
+            db.func.ts_rank_cd(vector, tsquery).desc()
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 virtual tables keyed by the source row ID, ranked with bm25()."""
+
+    name = "sqlite"
+
+    @staticmethod
+    def _table(model):
+        return f"{model.__tablename__}_fts"
+
+    @staticmethod
+    def _columns(model):
+        return ", ".join(column.key for column, _ in SEARCH_FIELDS[model])
+
+    def setup(self):
+        stale = []
+        with db.engine.begin() as connection:
+            for model in SEARCH_FIELDS:
+                table = self._table(model)
+                connection.execute(text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+                    f"USING fts5({self._columns(model)}, tokenize='unicode61 remove_diacritics 2')"
+                ))
+                indexed = connection.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+                total = connection.execute(
+                    db.select(db.func.count()).select_from(model.__table__)
+                ).scalar()
+                if indexed != total:
+                    stale.append(model)
+
+        for model in stale:
+            self.rebuild(model)
+
+    def apply(self, query, model, terms):
+        table = self._table(model)
+        weights = ", ".join(str(WEIGHTS[weight]) for _, weight in SEARCH_FIELDS[model])
+        hits = text(
+            f"SELECT rowid AS id, bm25({table}, {weights}) AS rank "
+            f"FROM {table} WHERE {table} MATCH :match"
+        ).bindparams(
+            match=" ".join(f'"{term}"*' for term in terms)
+        ).columns(id=db.Integer, rank=db.Float).subquery(f"{table}_hits")
+
+        # Correlate through WHERE rather than join() so that later
+        # filter_by() calls still target the model. bm25() is negative;
+        # lower means more relevant.
+        return query.filter(hits.c.id == model.id).order_by(hits.c.rank)
+
+    def index(self, connection, model, ids):
+        ids = list(ids)
+        self.remove(connection, model, ids)
+        columns = self._columns(model)
+        connection.execute(
+            text(
+                f"INSERT INTO {self._table(model)} (rowid, {columns}) "
+                f"SELECT id, {columns} FROM {model.__tablename__} WHERE id IN :ids"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"ids": ids}
+        )
+
+    def remove(self, connection, model, ids):
+        connection.execute(
+            text(f"DELETE FROM {self._table(model)} WHERE rowid IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": list(ids)}
+        )
+
+    def rebuild(self, model=None):
+        total = 0
+        with db.engine.begin() as connection:
+            for target in ([model] if model else SEARCH_FIELDS):
+                table = self._table(target)
+                columns = self._columns(target)
+                connection.execute(text(f"DELETE FROM {table}"))
+                total += connection.execute(text(
+                    f"INSERT INTO {table} (rowid, {columns}) "
+                    f"SELECT id, {columns} FROM {target.__tablename__}"
+                )).rowcount
+        return total
+
+
+class InvertedIndex:
+    """Term postings with BM25 ranking and prefix expansion of query terms."""
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.postings = defaultdict(dict)  # term -> {doc_id: weighted frequency}
+            self.lengths = {}                  # doc_id -> weighted length
+            self.doc_terms = {}                # doc_id -> terms, for removal
+            self.total_length = 0.0
+            self._terms = None                 # sorted terms, built on demand
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def add(self, doc_id: int, fields: Iterable[Tuple[str, float]]):
+        """Index a document given as ``(text, weight)`` pairs."""
+        frequencies = defaultdict(float)
+        for value, weight in fields:
+            for token in tokenize(value):
+                frequencies[token] += weight
+
+        with self._lock:
+            self.discard(doc_id)
+            if not frequencies:
+                return
+            for term, frequency in frequencies.items():
+                self.postings[term][doc_id] = frequency
+            self.lengths[doc_id] = sum(frequencies.values())
+            self.total_length += self.lengths[doc_id]
+            self.doc_terms[doc_id] = set(frequencies)
+            self._terms = None
+
+    def discard(self, doc_id: int):
+        """Remove a document if it is indexed."""
+        with self._lock:
+            terms = self.doc_terms.pop(doc_id, None)
+            if terms is None:
+                return
+            for term in terms:
+                postings = self.postings[term]
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+            self.total_length -= self.lengths.pop(doc_id)
+            self._terms = None
+
+    def _expand(self, prefix: str) -> List[str]:
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        start = bisect_left(self._terms, prefix)
+        matches = []
+        for term in self._terms[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def search(self, terms: List[str], limit: int) -> List[Tuple[int, float]]:
+        """Return ``(doc_id, score)`` for documents matching every term prefix."""
+        with self._lock:
+            if not self.lengths:
+                return []
+
+            count = len(self.lengths)
+            average = self.total_length / count
+            scores = None
+
+            for prefix in terms:
+                term_scores = defaultdict(float)
+                for term in self._expand(prefix):
+                    postings = self.postings[term]
+                    idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for doc_id, frequency in postings.items():
+                        length = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / average)
+                        term_scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + length)
+
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        doc_id: score + term_scores[doc_id]
+                        for doc_id, score in scores.items() if doc_id in term_scores
+                    }
+                if not scores:
+                    return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+        return ranked[:limit]
+
+
+class MemorySearchBackend(SearchBackend):
+    """Per-process inverted index, for databases without full-text support.
+
+    Each worker process holds its own copy, so this is meant for
+    development and tests rather than multi-worker deployments.
+    """
+
+    name = "memory"
+    transactional = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.indexes = {model: InvertedIndex() for model in SEARCH_FIELDS}
+        self.max_results = app.config.get("SEARCH_MAX_RESULTS", 1000)
+
+    def setup(self):
+        self.rebuild()
+
+    def apply(self, query, model, terms):
+        ranked = self.indexes[model].search(terms, self.max_results)
+        if not ranked:
+            return query.filter(db.false())
+
+        ids = [doc_id for doc_id, _ in ranked]
+        return query.filter(model.id.in_(ids)).order_by(
+            db.case({doc_id: position for position, doc_id in enumerate(ids)}, value=model.id)
+        )
+
+    def _load(self, connection, model, ids=None) -> int:
+        fields = SEARCH_FIELDS[model]
+        weights = [WEIGHTS[weight] for _, weight in fields]
+        statement = db.select(model.id, *(column for column, _ in fields))
+        if ids is not None:
+            statement = statement.where(model.id.in_(ids))
+
+        loaded = 0
+        for row in connection.execute(statement):
+            self.indexes[model].add(row[0], zip(row[1:], weights))
+            loaded += 1
+        return loaded
+
+    def index(self, connection, model, ids):
+        ids = list(ids)
+        self.remove(connection, model, ids)
+        self._load(connection, model, ids)
+
+    def remove(self, connection, model, ids):
+        for doc_id in ids:
+            self.indexes[model].discard(doc_id)
+
+    def rebuild(self, model=None):
+        total = 0
+        with db.engine.connect() as connection:
+            for target in ([model] if model else SEARCH_FIELDS):
+                self.indexes[target].clear()
+                total += self._load(connection, target)
+        return total
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (PostgresSearchBackend, SQLiteSearchBackend, MemorySearchBackend)
+}
+
+
+def _sqlite_has_fts5() -> bool:
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE probe USING fts5(value)")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def init_search(app):
+    """Select the search backend for ``app`` and prepare its index.
+
+    Must run inside an application context, after the tables exist.
+    """
+    name = app.config.get("SEARCH_BACKEND", "auto")
+    if name == "auto":
+        dialect = db.engine.dialect.name
+        if dialect == "postgresql":
+            name = "postgresql"
+        elif dialect == "sqlite" and _sqlite_has_fts5():
+            name = "sqlite"
+        else:
+            name = "memory"
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown SEARCH_BACKEND: {name}")
+
+    backend = BACKENDS[name](app)
+    app.extensions["search_backend"] = backend
+    backend.setup()
+    app.logger.info(f"Search backend: {name}")
+    return backend
+
+
+def get_search_backend() -> SearchBackend:
+    """Get the search backend of the current app."""
+    return current_app.extensions["search_backend"]
+
+
+def apply_search(query, model, value: str):
+    """Filter ``query`` to full-text matches for ``value``, most relevant first."""
+    terms = tokenize(value)
+    if not terms:
+        return query.filter(db.false())
+    return get_search_backend().apply(query, model, terms)
+
+
+# Keeping the index in sync with ORM writes
+#
+# Mapper events only record the IDs of changed documents on the session.
+# SearchIndexer then applies them per model in batches: at the end of each
+# flush for transactional backends, after commit for the others.
+
+def _current_backend():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("search_backend")
+
+
+def _chunks(ids, size):
+    ids = sorted(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+class SearchIndexer:
+    """Batches of document IDs waiting to be written to the search index."""
+
+    def __init__(self):
+        self.index = defaultdict(set)   # model -> IDs to add or refresh
+        self.remove = defaultdict(set)  # model -> IDs to drop
+
+    def __bool__(self):
+        return bool(self.index or self.remove)
+
+    def add(self, model, doc_id):
+        self.remove[model].discard(doc_id)
+        self.index[model].add(doc_id)
+
+    def discard(self, model, doc_id):
+        self.index[model].discard(doc_id)
+        self.remove[model].add(doc_id)
+
+    def merge(self, other):
+        for model, ids in other.index.items():
+            for doc_id in ids:
+                self.add(model, doc_id)
+        for model, ids in other.remove.items():
+            for doc_id in ids:
+                self.discard(model, doc_id)
+
+    def apply(self, backend, connection):
+        """Write the queued changes through ``connection`` and reset the queue."""
+        size = current_app.config.get("SEARCH_INDEX_BATCH_SIZE", 500)
+        for model, ids in self.remove.items():
+            for chunk in _chunks(ids, size):
+                backend.remove(connection, model, chunk)
+        for model, ids in self.index.items():
+            for chunk in _chunks(ids, size):
+                backend.index(connection, model, chunk)
+        self.index.clear()
+        self.remove.clear()
+
+
+def _session_indexer(target):
+    session = object_session(target)
+    if session is None or _current_backend() is None:
+        return None
+    return session.info.setdefault("search_indexer", SearchIndexer())
+
+
+def _search_fields_changed(target) -> bool:
+    attrs = inspect(target).attrs
+    return any(attrs[column.key].history.has_changes() for column, _ in SEARCH_FIELDS[type(target)])
+
+
+def _enqueue_insert(mapper, connection, target):
+    indexer = _session_indexer(target)
+    if indexer is not None:
+        indexer.add(type(target), target.id)
+
+
+def _enqueue_update(mapper, connection, target):
+    if not _search_fields_changed(target):
+        return
+    indexer = _session_indexer(target)
+    if indexer is not None:
+        indexer.add(type(target), target.id)
+
+
+def _enqueue_delete(mapper, connection, target):
+    indexer = _session_indexer(target)
+    if indexer is not None:
+        indexer.discard(type(target), target.id)
+
+
+for _model in SEARCH_FIELDS:
+    event.listen(_model, "after_insert", _enqueue_insert)
+    event.listen(_model, "after_update", _enqueue_update)
+    event.listen(_model, "after_delete", _enqueue_delete)
+
+
+@event.listens_for(Session, "after_flush")
+def _flush_search_indexer(session, flush_context):
+    indexer = session.info.pop("search_indexer", None)
+    backend = _current_backend()
+    if backend is None or not indexer:
+        return
+
+    if backend.transactional:
+        # Write the index in the same transaction as the rows themselves
+        indexer.apply(backend, session.connection())
+    else:
+        session.info.setdefault("search_pending", SearchIndexer()).merge(indexer)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_search_pending(session):
+    indexer = session.info.pop("search_pending", None)
+    backend = _current_backend()
+    if backend is None or not indexer:
+        return
+    with db.engine.connect() as connection:
+        indexer.apply(backend, connection)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_search_pending(session):
+    session.info.pop("search_indexer", None)
+    session.info.pop("search_pending", None)
+
+
+def reindex(since: datetime = None) -> int:
+    """Backfill the search index.
+
+    Args:
+        since: Only reindex rows changed at or after this time. Models
+            without ``updated_at`` are selected by ``created_at``.
+
+    Returns:
+        int: Number of documents indexed
+    """
+    backend = get_search_backend()
+    if since is None:
+        return backend.rebuild()
+
+    indexer = SearchIndexer()
+    for model in SEARCH_FIELDS:
+        changed = getattr(model, "updated_at", None) or model.created_at
+        for doc_id in db.session.execute(db.select(model.id).where(changed >= since)).scalars():
+            indexer.add(model, doc_id)
+
+    total = sum(len(ids) for ids in indexer.index.values())
+    with db.engine.begin() as connection:
+        indexer.apply(backend, connection)
+    return total
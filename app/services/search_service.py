@@ -4,22 +4,20 @@ from flask import current_app
 from sqlalchemy import or_, and_, func
 from app.database.models import Project, Kebutuhan, Pengguna, Kategori
 from app.database.base import db
+from app.services.search_index import apply_search
+from app.services.suggestion_index import get_suggestion_index
+from app.utils.pagination import paginate
 
 
-def search_projects(query: str, category_id: int = None, page: int = 1, per_page: int = None):
-    """Search projects by query and optional category."""
+def search_projects(query: str, category_id: int = None, page: int = 1, per_page: int = None, total_estimated: bool = False):
+    """Search projects by query and optional category, most relevant first."""
     if per_page is None:
         per_page = current_app.config.get('ITEMS_PER_PAGE', 12)
     
     search = Project.query
     
     if query:
-        search = search.filter(
-            or_(
-                Project.judul.ilike(f'%{query}%'),
-                Project.deskripsi.ilike(f'%{query}%')
-            )
-        )
+        search = apply_search(search, Project, query)
     
     if category_id and category_id > 0:
         search = search.filter_by(kategori_id=category_id)
@@ -27,25 +25,18 @@ def search_projects(query: str, category_id: int = None, page: int = 1, per_page
     # Only show active projects in search
     search = search.filter_by(status='Aktif')
     
-    return search.order_by(Project.timestamp.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    return paginate(search.order_by(Project.timestamp.desc()), page, per_page, total_estimated)
 
 
-def search_kebutuhan(query: str, category_id: int = None, page: int = 1, per_page: int = None):
-    """Search kebutuhan by query and optional category."""
+def search_kebutuhan(query: str, category_id: int = None, page: int = 1, per_page: int = None, total_estimated: bool = False):
+    """Search kebutuhan by query and optional category, most relevant first."""
     if per_page is None:
         per_page = current_app.config.get('ITEMS_PER_PAGE', 12)
     
     search = Kebutuhan.query
     
     if query:
-        search = search.filter(
-            or_(
-                Kebutuhan.judul.ilike(f'%{query}%'),
-                Kebutuhan.deskripsi.ilike(f'%{query}%')
-            )
-        )
+        search = apply_search(search, Kebutuhan, query)
     
     if category_id and category_id > 0:
         search = search.filter_by(kategori_id=category_id)
@@ -53,32 +44,28 @@ def search_kebutuhan(query: str, category_id: int = None, page: int = 1, per_pag
     # Exclude rejected kebutuhan
     search = search.filter(Kebutuhan.status != 'Ditolak')
     
-    return search.order_by(Kebutuhan.timestamp.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    return paginate(search.order_by(Kebutuhan.timestamp.desc()), page, per_page, total_estimated)
 
 
-def search_users(query: str, page: int = 1, per_page: int = None):
-    """Search users by username or name."""
+def search_users(query: str, page: int = 1, per_page: int = None, total_estimated: bool = False):
+    """Search users by username or name, most relevant first."""
     if per_page is None:
         per_page = current_app.config.get('ITEMS_PER_PAGE', 12)
     
-    search = Pengguna.query.filter(
-        or_(
-            Pengguna.username.ilike(f'%{query}%'),
-            Pengguna.nama.ilike(f'%{query}%')
-        )
-    )
+    search = Pengguna.query
+    
+    if query:
+        search = apply_search(search, Pengguna, query)
     
     # Only show active users
     search = search.filter_by(is_active=True)
     
-    return search.order_by(Pengguna.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    return paginate(search.order_by(Pengguna.created_at.desc()), page, per_page, total_estimated)
 
 
-def search_all(query: str, category_id: int = None, page: int = 1, per_page: int = None) -> Dict[str, Any]:
+def search_all(
+    query: str, category_id: int = None, page: int = 1, per_page: int = None, total_estimated: bool = False
+) -> Dict[str, Any]:
     """Search across all entities."""
     if per_page is None:
         per_page = current_app.config.get('ITEMS_PER_PAGE', 12)
@@ -87,9 +74,9 @@ def search_all(query: str, category_id: int = None, page: int = 1, per_page: int
     limit_per_type = 5
     
     results = {
-        'projects': search_projects(query, category_id, 1, limit_per_type),
-        'kebutuhan': search_kebutuhan(query, category_id, 1, limit_per_type),
-        'users': search_users(query, 1, limit_per_type) if not category_id else None,
+        'projects': search_projects(query, category_id, 1, limit_per_type, total_estimated),
+        'kebutuhan': search_kebutuhan(query, category_id, 1, limit_per_type, total_estimated),
+        'users': search_users(query, 1, limit_per_type, total_estimated) if not category_id else None,
         'total': 0
     }
     
@@ -104,52 +91,14 @@ def search_all(query: str, category_id: int = None, page: int = 1, per_page: int
 
 
 def get_search_suggestions(query: str, limit: int = 10) -> List[Dict[str, str]]:
-    """Get search suggestions for autocomplete."""
-    suggestions = []
-    
-    # Search projects
-    projects = Project.query.filter(
-        Project.judul.ilike(f'%{query}%'),
-        Project.status == 'Aktif'
-    ).limit(limit // 3).all()
-    
-    for project in projects:
-        suggestions.append({
-            'type': 'project',
-            'text': project.judul,
-            'url': f'/project/{project.id}'
-        })
-    
-    # Search kebutuhan
-    kebutuhan = Kebutuhan.query.filter(
-        Kebutuhan.judul.ilike(f'%{query}%'),
-        Kebutuhan.status != 'Ditolak'
-    ).limit(limit // 3).all()
-    
-    for k in kebutuhan:
-        suggestions.append({
-            'type': 'kebutuhan',
-            'text': k.judul,
-            'url': f'/kebutuhan/project/{k.project_id}/kebutuhan/{k.id}'
-        })
-    
-    # Search users
-    users = Pengguna.query.filter(
-        or_(
-            Pengguna.username.ilike(f'%{query}%'),
-            Pengguna.nama.ilike(f'%{query}%')
-        ),
-        Pengguna.is_active == True
-    ).limit(limit // 3).all()
-    
-    for user in users:
-        suggestions.append({
-            'type': 'user',
-            'text': f'{user.nama} (@{user.username})',
-            'url': f'/user/{user.username}'
-        })
-    
-    return suggestions[:limit]
+    """Get search suggestions for autocomplete, most popular first.
+
+    Served from the in-memory prefix index without a database query.
+    """
+    return [
+        {'type': entry['type'], 'text': entry['text'], 'url': entry['url']}
+        for entry in get_suggestion_index().suggest(query, limit)
+    ]
 
 
 # app/services/notification_service.py - New File
@@ -0,0 +1,390 @@
+# app/services/stats_service.py
+from typing import List, Dict, Any
+from collections import Counter
+from datetime import date, datetime, timedelta
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, object_session
+from app.database.models import Project, Kebutuhan, Pengguna, Dukungan, DailyStat
+from app.database.base import db
+from app.utils.write_behind import WriteBehindBuffer
+
+BUCKETS = ('day', 'week', 'month')
+
+# Rollup metric -> (model, creation timestamp attribute, breakdown dimensions)
+ROLLUPS = {
+    'projects': (Project, 'timestamp', {'status': 'status', 'category': 'kategori_id'}),
+    'kebutuhan': (Kebutuhan, 'timestamp', {'status': 'status', 'priority': 'prioritas'}),
+    'users': (Pengguna, 'created_at', {}),
+    'supports': (Dukungan, 'timestamp', {}),
+}
+METRICS = {model: metric for metric, (model, _, _) in ROLLUPS.items()}
+
+
+def bucket_start(value: date, bucket: str) -> date:
+    """Get the first day of the bucket containing ``value``.
+
+    Weeks start on Monday, matching PostgreSQL ``date_trunc('week')``.
+    """
+    if bucket == 'week':
+        return value - timedelta(days=value.weekday())
+    if bucket == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def bucket_range(start: date, end: date, bucket: str) -> List[date]:
+    """Get the start of every bucket from ``start`` through ``end``."""
+    starts = []
+    current = bucket_start(start, bucket)
+    while current <= end:
+        starts.append(current)
+        if bucket == 'month':
+            current = (current + timedelta(days=32)).replace(day=1)
+        else:
+            current += timedelta(days=7 if bucket == 'week' else 1)
+    return starts
+
+
+def _bucket_expression(column, bucket: str):
+    if db.engine.dialect.name == 'sqlite':
+        if bucket == 'week':
+            # Step back to the Monday on or before the date
+            return db.func.date(column, '-6 days', 'weekday 1')
+        if bucket == 'month':
+            return db.func.strftime('%Y-%m-01', column)
+        return db.func.date(column)
+    return db.func.date_trunc(bucket, column)
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _rollup_keys(metric: str, day: date, values: Dict[str, Any]):
+    yield day, metric, ''
+    for name, value in values.items():
+        if value is not None:
+            yield day, metric, f'{name}:{value}'
+
+
+def _apply_deltas(connection, deltas: Counter):
+    """Add ``deltas`` keyed by (date, metric, dimension) to daily_stats."""
+    rows = [
+        {'date': day, 'metric': metric, 'dimension': dimension, 'value': value}
+        for (day, metric, dimension), value in deltas.items() if value
+    ]
+    if not rows:
+        return
+
+    table = DailyStat.__table__
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = (postgresql if dialect == 'postgresql' else sqlite).insert(table)
+        connection.execute(insert.on_conflict_do_update(
+            index_elements=['date', 'metric', 'dimension'],
+            set_={'value': table.c.value + insert.excluded.value}
+        ), rows)
+        return
+
+    for row in rows:
+        updated = connection.execute(table.update().where(
+            table.c.date == row['date'],
+            table.c.metric == row['metric'],
+            table.c.dimension == row['dimension']
+        ).values(value=table.c.value + row['value'])).rowcount
+        if not updated:
+            connection.execute(table.insert().values(**row))
+
+
+class DailyStatsBuffer(WriteBehindBuffer):
+    """Buffer of committed rollup deltas keyed by (date, metric, dimension).
+
+    Every write of the day adds to the same few daily_stats rows; batching
+    the deltas turns one contended upsert per transaction into one per
+    STATS_FLUSH_INTERVAL.
+    """
+
+    name = "daily-stats"
+
+    def _merge(self, pending, key, delta):
+        pending[key] = pending.get(key, 0) + delta
+
+    def record(self, deltas: Counter):
+        """Buffer committed ``deltas``."""
+        for key, delta in deltas.items():
+            if delta:
+                self._queue(key, delta)
+
+    def pending(self) -> Counter:
+        """Get the deltas not written to the database yet."""
+        with self._lock:
+            pending = Counter(self._flushing)
+            pending.update(self._pending)
+        return pending
+
+    def _write(self, connection, batch):
+        _apply_deltas(connection, batch)
+
+
+def init_stats(app) -> DailyStatsBuffer:
+    """Create the daily_stats write buffer for ``app``."""
+    buffer = DailyStatsBuffer(
+        app,
+        app.config.get("STATS_FLUSH_INTERVAL", 5),
+        app.config.get("STATS_MAX_PENDING", 10000),
+    )
+    app.extensions["daily_stats"] = buffer
+    return buffer
+
+
+def _current_buffer():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("daily_stats")
+
+
+def _pending_deltas() -> Counter:
+    buffer = _current_buffer()
+    return buffer.pending() if buffer is not None else Counter()
+
+
+def flush_stats() -> int:
+    """Write the current app's buffered rollup deltas now."""
+    buffer = _current_buffer()
+    return buffer.flush() if buffer is not None else 0
+
+
+def rollup_daily_stats(since: date = None) -> int:
+    """Recompute daily_stats from the source tables.
+
+    This process's buffered deltas are written first. Deltas still
+    buffered by other processes are added on top, so run it when writes
+    are quiet.
+
+    Args:
+        since: Only recompute days from this date on
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    flush_stats()
+    deltas = Counter()
+    for metric, (model, timestamp, dimensions) in ROLLUPS.items():
+        column = getattr(model, timestamp)
+        day = _bucket_expression(column, 'day').label('day')
+        groupings = [(None, None)] + [(name, getattr(model, key)) for name, key in dimensions.items()]
+
+        for name, dimension in groupings:
+            query = db.session.query(day, *([dimension] if name else []), db.func.count())
+            if since:
+                query = query.filter(column >= datetime.combine(since, datetime.min.time()))
+            query = query.filter(column.isnot(None)).group_by(day, *([dimension] if name else []))
+
+            for row in query:
+                if name is None:
+                    deltas[(_as_date(row[0]), metric, '')] += row[-1]
+                elif row[1] is not None:
+                    deltas[(_as_date(row[0]), metric, f'{name}:{row[1]}')] += row[-1]
+
+    stale = DailyStat.query
+    if since:
+        stale = stale.filter(DailyStat.date >= since)
+    stale.delete(synchronize_session=False)
+    _apply_deltas(db.session.connection(), deltas)
+    db.session.commit()
+
+    current_app.logger.info(f"Rolled up {len(deltas)} daily stat row(s)")
+    return len(deltas)
+
+
+def record_bulk_status_change(model, ids: List[int], status: str):
+    """Move rollup status counts for a bulk ``status`` update of ``ids``.
+
+    Call before issuing the bulk UPDATE, which bypasses the mapper events
+    that otherwise keep daily_stats current. The deltas are buffered once
+    the session commits.
+    """
+    metric = METRICS[model]
+    column = getattr(model, ROLLUPS[metric][1])
+    day = _bucket_expression(column, 'day')
+
+    deltas = Counter()
+    rows = db.session.query(day, model.status, db.func.count()).filter(
+        model.id.in_(ids),
+        model.status != status,
+        column.isnot(None)
+    ).group_by(day, model.status)
+    for value, old_status, count in rows:
+        deltas[(_as_date(value), metric, f'status:{old_status}')] -= count
+        deltas[(_as_date(value), metric, f'status:{status}')] += count
+    db.session.info.setdefault('stat_deltas', Counter()).update(deltas)
+
+
+def get_rollup_totals(metric: str) -> Dict[str, int]:
+    """Get all-time totals of ``metric`` per dimension from daily_stats.
+
+    The empty dimension holds the overall total. Deltas this process has
+    not written yet are included.
+    """
+    rows = db.session.query(
+        DailyStat.dimension, db.func.sum(DailyStat.value)
+    ).filter_by(metric=metric).group_by(DailyStat.dimension).all()
+
+    totals = Counter({dimension: int(total or 0) for dimension, total in rows})
+    for (_, pending_metric, dimension), delta in _pending_deltas().items():
+        if pending_metric == metric:
+            totals[dimension] += delta
+    return {dimension: total for dimension, total in totals.items() if total}
+
+
+def breakdown(totals: Dict[str, int], name: str) -> Dict[str, int]:
+    """Pick the ``name`` dimension out of get_rollup_totals() results."""
+    prefix = f'{name}:'
+    return {
+        dimension[len(prefix):]: total
+        for dimension, total in totals.items() if dimension.startswith(prefix)
+    }
+
+
+def get_trend_stats(days: int = 7, bucket: str = 'day', series=None) -> List[Dict[str, Any]]:
+    """Get zero-filled creation counts for the last ``days`` days.
+
+    Reads the daily_stats rollup in one grouped query regardless of the
+    range.
+
+    Args:
+        days: Number of days up to and including today
+        bucket: day, week or month
+        series: Metrics from ROLLUPS to include (all by default)
+
+    Returns:
+        list: One dict per bucket with 'date' and a count per series
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Bucket must be one of: {', '.join(BUCKETS)}")
+
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=days - 1)
+    names = series or list(ROLLUPS)
+
+    period = _bucket_expression(DailyStat.date, bucket).label('period')
+    rows = db.session.query(
+        period, DailyStat.metric, db.func.sum(DailyStat.value)
+    ).filter(
+        DailyStat.metric.in_(names),
+        DailyStat.dimension == '',
+        DailyStat.date >= bucket_start(start, bucket),
+        DailyStat.date <= end
+    ).group_by(period, DailyStat.metric).all()
+
+    counts = Counter({(_as_date(value), metric): int(total or 0) for value, metric, total in rows})
+    for (day, metric, dimension), delta in _pending_deltas().items():
+        if dimension == '' and metric in names and day <= end:
+            counts[(bucket_start(day, bucket), metric)] += delta
+
+    return [
+        {
+            'date': day.strftime('%Y-%m-%d'),
+            **{name: counts.get((day, name), 0) for name in names}
+        }
+        for day in bucket_range(start, end, bucket)
+    ]
+
+
+# Keeping daily_stats current with ORM writes
+#
+# Mapper events collect per-day deltas on the session; once it commits they
+# go to the write buffer, and a rollback discards them with the rows.
+
+def _day(target, timestamp: str, connection, inserting=False) -> date:
+    value = inspect(target).dict.get(timestamp)
+    if not isinstance(value, datetime):
+        if inserting:
+            # Server-side default, not loaded yet
+            return datetime.utcnow().date()
+        column = getattr(type(target), timestamp)
+        value = connection.execute(
+            db.select(column).where(type(target).id == target.id)
+        ).scalar()
+    return _as_date(value) if value is not None else datetime.utcnow().date()
+
+
+def _session_deltas(target) -> Counter:
+    session = object_session(target)
+    return session.info.setdefault('stat_deltas', Counter()) if session else Counter()
+
+
+def _count_insert(mapper, connection, target):
+    metric = METRICS[type(target)]
+    _, timestamp, dimensions = ROLLUPS[metric]
+    values = {name: getattr(target, key) for name, key in dimensions.items()}
+    deltas = _session_deltas(target)
+    for key in _rollup_keys(metric, _day(target, timestamp, connection, inserting=True), values):
+        deltas[key] += 1
+
+
+def _count_delete(mapper, connection, target):
+    metric = METRICS[type(target)]
+    _, timestamp, dimensions = ROLLUPS[metric]
+    values = {name: getattr(target, key) for name, key in dimensions.items()}
+    deltas = _session_deltas(target)
+    for key in _rollup_keys(metric, _day(target, timestamp, connection), values):
+        deltas[key] -= 1
+
+
+def _count_update(mapper, connection, target):
+    metric = METRICS[type(target)]
+    _, timestamp, dimensions = ROLLUPS[metric]
+    attrs = inspect(target).attrs
+    changed = {name: key for name, key in dimensions.items() if attrs[key].history.has_changes()}
+    if not changed:
+        return
+
+    day = _day(target, timestamp, connection)
+    deltas = _session_deltas(target)
+    for name, key in changed.items():
+        history = attrs[key].history
+        if history.deleted:
+            old = history.deleted[0]
+        else:
+            # The previous value was never loaded; the row is not updated yet
+            old = connection.execute(
+                db.select(getattr(type(target), key)).where(type(target).id == target.id)
+            ).scalar()
+        new = getattr(target, key)
+        if old == new:
+            continue
+        if old is not None:
+            deltas[(day, metric, f'{name}:{old}')] -= 1
+        if new is not None:
+            deltas[(day, metric, f'{name}:{new}')] += 1
+
+
+for _model in METRICS:
+    event.listen(_model, 'after_insert', _count_insert)
+    event.listen(_model, 'before_update', _count_update)
+    event.listen(_model, 'before_delete', _count_delete)
+
+
+@event.listens_for(Session, 'after_commit')
+def _buffer_stat_deltas(session):
+    deltas = session.info.pop('stat_deltas', None)
+    if not deltas:
+        return
+    buffer = _current_buffer()
+    if buffer is not None:
+        buffer.record(deltas)
+    else:
+        with db.engine.begin() as connection:
+            _apply_deltas(connection, deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_stat_deltas(session):
+    session.info.pop('stat_deltas', None)
@@ -0,0 +1,591 @@
+# app/services/suggestion_index.py
+"""Prefix index behind the search autocomplete.
+
+Titles, usernames and names are kept in a snapshot of prefixes that is
+searched with bisect, so suggestions never touch the database. Every
+prefix of each token of a text lists its entries by a popularity weight
+built from view and support counts, highest first.
+
+The snapshot is a flat binary file written atomically to
+SUGGEST_SNAPSHOT_PATH and memory-mapped by every worker process, which
+remaps it once another process replaces it. Changes committed since are
+appended to a delta file next to it, which every process overlays on the
+snapshot; the ``compact_suggestions`` job merges it into a new snapshot
+once it holds SUGGEST_DELTA_LIMIT entries. Without a path the snapshot
+and delta live in process memory.
+
+Commits only queue the ids of changed rows; a write-behind buffer reloads
+them and appends to the delta every SUGGEST_FLUSH_INTERVAL seconds, off
+the request that committed.
+
+The snapshot is built from the database on first use, or by ``flask
+search-reindex``, which also refreshes the popularity weights.
+
+Layout (little endian)::
+
+    header     magic, prefix count, entry count
+    offsets    (prefix count + 1) then (entry count + 1) uint32 offsets
+    prefixes   "prefix\\tentry entry ..." records, sorted by prefix
+    entries    JSON objects with type, id, text, url and weight
+"""
+import heapq
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.database.base import db
+from app.database.models import Kebutuhan, Pengguna, Project
+from app.services.search_index import tokenize
+from app.utils.decorators import async_task
+from app.utils.write_behind import WriteBehindBuffer
+
+try:
+    import fcntl
+except ImportError:  # Windows: single writer assumed
+    fcntl = None
+
+MAGIC = b"KSG2"
+HEADER = struct.Struct("<4sII")
+OFFSET = struct.Struct("<I")
+
+# Views count once, each support counts as this many views
+SUPPORT_WEIGHT = 5
+
+# Columns whose changes affect a suggestion; popularity is refreshed on rebuild
+TRACKED_FIELDS = {
+    Project: ("judul", "status"),
+    Kebutuhan: ("judul", "status", "project_id"),
+    Pengguna: ("username", "nama", "is_active"),
+}
+
+
+def _entry_key(entry):
+    return entry["type"], entry["id"]
+
+
+def _rank(entry):
+    """Order of suggestions: highest weight first, then by type and id."""
+    return -entry["weight"], entry["type"], entry["id"]
+
+
+def _matches(entry, terms) -> bool:
+    """Whether every term prefixes a token of the entry's text."""
+    tokens = tokenize(entry["text"])
+    return all(any(token.startswith(term) for token in tokens) for term in terms)
+
+
+def pack_snapshot(entries, max_candidates: int = 1000) -> bytes:
+    """Serialize suggestion entries into the snapshot layout.
+
+    Each prefix keeps its ``max_candidates`` highest weighted entries.
+    """
+    entries = sorted(entries, key=_entry_key)
+    ranked = defaultdict(list)
+    for position, entry in enumerate(entries):
+        prefixes = {
+            token[:length] for token in tokenize(entry["text"]) for length in range(1, len(token) + 1)
+        }
+        for prefix in prefixes:
+            ranked[prefix].append((-entry["weight"], position))
+
+    prefix_records = [
+        f"{prefix}\t{' '.join(str(position) for _, position in heapq.nsmallest(max_candidates, ranked[prefix]))}"
+        .encode()
+        for prefix in sorted(ranked)
+    ]
+    entry_records = [json.dumps(entry, separators=(",", ":")).encode() for entry in entries]
+
+    offsets = []
+    position = HEADER.size + OFFSET.size * (len(prefix_records) + len(entry_records) + 2)
+    for records in (prefix_records, entry_records):
+        for record in records:
+            offsets.append(position)
+            position += len(record)
+        offsets.append(position)
+
+    return b"".join([
+        HEADER.pack(MAGIC, len(prefix_records), len(entry_records)),
+        b"".join(OFFSET.pack(offset) for offset in offsets),
+        *prefix_records,
+        *entry_records,
+    ])
+
+
+class _Records:
+    """Read-only sequence view over one record section of a snapshot."""
+
+    def __init__(self, buffer, table, count):
+        self.buffer = buffer
+        self.table = table
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def raw(self, index):
+        start, end = struct.unpack_from("<II", self.buffer, self.table + OFFSET.size * index)
+        return bytes(self.buffer[start:end])
+
+
+class _Prefixes(_Records):
+    def __getitem__(self, index):
+        return self.raw(index).split(b"\t", 1)[0].decode()
+
+    def positions(self, index):
+        return [int(position) for position in self.raw(index).split(b"\t", 1)[1].split()]
+
+
+class Snapshot:
+    """Lookups over a packed snapshot held in ``bytes`` or an ``mmap``."""
+
+    def __init__(self, buffer):
+        magic, prefix_count, entry_count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a suggestion snapshot")
+        self.buffer = buffer
+        self.prefixes = _Prefixes(buffer, HEADER.size, prefix_count)
+        self.entries = _Records(buffer, HEADER.size + OFFSET.size * (prefix_count + 1), entry_count)
+
+    def entry(self, position):
+        return json.loads(self.entries.raw(position))
+
+    def all_entries(self):
+        return [self.entry(position) for position in range(len(self.entries))]
+
+    def matches(self, terms):
+        """Yield entries whose text has a token starting with each term.
+
+        The last term is looked up in the sorted prefixes, whose entries
+        come highest weight first; any earlier terms must also prefix a
+        token of the same text.
+        """
+        prefix, others = terms[-1], terms[:-1]
+        index = bisect_left(self.prefixes, prefix)
+        if index == len(self.prefixes) or self.prefixes[index] != prefix:
+            return
+        for position in self.prefixes.positions(index):
+            entry = self.entry(position)
+            if not others or _matches(entry, others):
+                yield entry
+
+
+class SuggestionIndex:
+    """Snapshot owner: builds, updates and (re)maps the shared files."""
+
+    def __init__(self, path=None, max_candidates=1000, delta_limit=500, loader=None):
+        self.path = path
+        self.delta_path = path + ".delta" if path else None
+        self.max_candidates = max_candidates
+        self.delta_limit = delta_limit
+        # Called without arguments for every entry when there is no snapshot yet
+        self.loader = loader
+        self._lock = threading.RLock()
+        self._snapshot = None
+        self._mapped = None
+        self._stamp = None
+        # (type, id) -> entry changed since the snapshot, or None if removed
+        self._overlay = {}
+        self._delta_inode = None
+        self._delta_offset = 0
+        self._compaction_queued = False
+
+    @staticmethod
+    def _stat(path):
+        try:
+            return os.stat(path)
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self):
+        """Pick up a replaced snapshot and changes appended to the delta."""
+        if self.path is None:
+            return
+        stat = self._stat(self.path)
+        stamp = stat and (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        delta = self._stat(self.delta_path)
+        delta_stamp = (delta.st_ino, delta.st_size) if delta else (None, 0)
+        if stamp == self._stamp and delta_stamp == (self._delta_inode, self._delta_offset):
+            return
+        with self._lock:
+            if stamp != self._stamp:
+                self._remap(stamp)
+            self._read_delta(delta)
+
+    def _remap(self, stamp):
+        # The previous map is left to garbage collection, since a concurrent
+        # lookup may still be reading it
+        self._mapped = None
+        self._snapshot = None
+        if stamp is not None:
+            try:
+                with open(self.path, "rb") as handle:
+                    mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                self._snapshot = Snapshot(mapped)
+            except ValueError:
+                # Empty or written by an older layout; rebuilt like a missing one
+                pass
+            else:
+                self._mapped = mapped
+        self._stamp = stamp
+
+    def _read_delta(self, delta):
+        if delta is None or delta.st_ino != self._delta_inode or delta.st_size < self._delta_offset:
+            # Merged into the snapshot and replaced
+            self._overlay = {}
+            self._delta_inode = delta and delta.st_ino
+            self._delta_offset = 0
+            self._compaction_queued = False
+        if delta is None or delta.st_size == self._delta_offset:
+            return
+        with open(self.delta_path, "rb") as handle:
+            handle.seek(self._delta_offset)
+            data = handle.read(delta.st_size - self._delta_offset)
+        # A change still being appended is read on the next refresh
+        data = data[:data.rfind(b"\n") + 1]
+        self._apply(json.loads(line) for line in data.splitlines())
+        self._delta_offset += len(data)
+
+    def _apply(self, changes):
+        # Copied, so lookups can keep reading the previous overlay
+        overlay = dict(self._overlay)
+        for change in changes:
+            for key in change["removals"]:
+                overlay[tuple(key)] = None
+            for entry in change["upserts"]:
+                overlay[_entry_key(entry)] = entry
+        self._overlay = overlay
+
+    def _write(self, data: bytes):
+        if self.path is None:
+            self._snapshot = Snapshot(data)
+            self._overlay = {}
+            self._compaction_queued = False
+            return
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        for target, content in ((self.path, data), (self.delta_path, b"")):
+            handle, temp_path = tempfile.mkstemp(dir=directory, prefix=".suggest-")
+            with os.fdopen(handle, "wb") as temp:
+                temp.write(content)
+            os.replace(temp_path, target)
+
+    def _exclusive(self):
+        """Serialize snapshot writers across processes."""
+        if self.path is None or fcntl is None:
+            return _NullLock(self._lock)
+        return _FileLock(self.path + ".lock")
+
+    def _pack(self, entries) -> bytes:
+        return pack_snapshot(entries, self.max_candidates)
+
+    def build(self, entries) -> int:
+        """Replace the snapshot with ``entries`` and drop the delta."""
+        entries = list(entries)
+        with self._exclusive():
+            self._write(self._pack(entries))
+        return len(entries)
+
+    def _ensure_built(self):
+        if self.loader is None or self._snapshot is not None:
+            return
+        with self._exclusive():
+            # Another process may have built it while we waited
+            self._refresh()
+            if self._snapshot is None:
+                self._write(self._pack(self.loader()))
+                self._refresh()
+
+    def update(self, upserts, removals):
+        """Record changed entries and removed ``(type, id)`` pairs.
+
+        Only the change is written; the snapshot itself is left to
+        :meth:`compact`.
+        """
+        change = {"upserts": list(upserts), "removals": [list(key) for key in removals]}
+        if self.path is None:
+            with self._lock:
+                self._apply([change])
+            return
+        line = json.dumps(change, separators=(",", ":")).encode()
+        with self._exclusive():
+            with open(self.delta_path, "ab") as handle:
+                handle.write(line + b"\n")
+        self._refresh()
+
+    def compaction_due(self) -> bool:
+        """Whether the delta has outgrown SUGGEST_DELTA_LIMIT.
+
+        True once per delta and process, so the merge is queued once.
+        """
+        with self._lock:
+            if self._compaction_queued or len(self._overlay) < self.delta_limit:
+                return False
+            self._compaction_queued = True
+            return True
+
+    def compact(self) -> int:
+        """Merge the delta into a new snapshot.
+
+        Returns:
+            int: Number of suggestion entries
+        """
+        with self._exclusive():
+            self._refresh()
+            with self._lock:
+                snapshot, overlay = self._snapshot, dict(self._overlay)
+            entries = {_entry_key(entry): entry for entry in (snapshot.all_entries() if snapshot else [])}
+            for key, entry in overlay.items():
+                if entry is None:
+                    entries.pop(key, None)
+                else:
+                    entries[key] = entry
+            self._write(self._pack(entries.values()))
+        return len(entries)
+
+    def suggest(self, query: str, limit: int = 10):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        self._refresh()
+        self._ensure_built()
+        with self._lock:
+            snapshot, overlay = self._snapshot, self._overlay
+
+        results = []
+        if snapshot is not None:
+            for entry in snapshot.matches(terms):
+                if _entry_key(entry) not in overlay:
+                    results.append(entry)
+                    if len(results) == limit:
+                        break
+        results.extend(entry for entry in overlay.values() if entry is not None and _matches(entry, terms))
+        return sorted(results, key=_rank)[:limit]
+
+
+class _NullLock:
+    def __init__(self, lock):
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+
+    def __exit__(self, *exc):
+        self.lock.release()
+
+
+class _FileLock:
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        self.handle = open(self.path, "a")
+        fcntl.flock(self.handle, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.handle, fcntl.LOCK_UN)
+        self.handle.close()
+
+
+# Loading entries from the database
+
+def _project_entries(connection, ids=None):
+    support = (
+        db.select(Kebutuhan.project_id, db.func.sum(Kebutuhan.support_count).label("support"))
+        .group_by(Kebutuhan.project_id)
+        .subquery()
+    )
+    statement = (
+        db.select(Project.id, Project.judul, Project.view_count, support.c.support)
+        .outerjoin(support, support.c.project_id == Project.id)
+        .where(Project.status == "Aktif")
+    )
+    if ids is not None:
+        statement = statement.where(Project.id.in_(ids))
+    for row in connection.execute(statement):
+        yield {
+            "type": "project",
+            "id": row.id,
+            "text": row.judul,
+            "url": f"/project/{row.id}",
+            "weight": (row.view_count or 0) + SUPPORT_WEIGHT * (row.support or 0),
+        }
+
+
+def _kebutuhan_entries(connection, ids=None):
+    statement = db.select(
+        Kebutuhan.id, Kebutuhan.project_id, Kebutuhan.judul, Kebutuhan.view_count, Kebutuhan.support_count
+    ).where(Kebutuhan.status != "Ditolak")
+    if ids is not None:
+        statement = statement.where(Kebutuhan.id.in_(ids))
+    for row in connection.execute(statement):
+        yield {
+            "type": "kebutuhan",
+            "id": row.id,
+            "text": row.judul,
+            "url": f"/kebutuhan/project/{row.project_id}/kebutuhan/{row.id}",
+            "weight": (row.view_count or 0) + SUPPORT_WEIGHT * (row.support_count or 0),
+        }
+
+
+def _user_entries(connection, ids=None):
+    # A user's popularity is the support their kebutuhan received
+    support = (
+        db.select(Kebutuhan.pengguna_id, db.func.sum(Kebutuhan.support_count).label("support"))
+        .group_by(Kebutuhan.pengguna_id)
+        .subquery()
+    )
+    statement = (
+        db.select(Pengguna.id, Pengguna.username, Pengguna.nama, support.c.support)
+        .outerjoin(support, support.c.pengguna_id == Pengguna.id)
+        .where(Pengguna.is_active.is_(True))
+    )
+    if ids is not None:
+        statement = statement.where(Pengguna.id.in_(ids))
+    for row in connection.execute(statement):
+        yield {
+            "type": "user",
+            "id": row.id,
+            "text": f"{row.nama} (@{row.username})",
+            "url": f"/user/{row.username}",
+            "weight": SUPPORT_WEIGHT * (row.support or 0),
+        }
+
+
+LOADERS = {
+    Project: ("project", _project_entries),
+    Kebutuhan: ("kebutuhan", _kebutuhan_entries),
+    Pengguna: ("user", _user_entries),
+}
+
+
+def load_suggestions():
+    """Load every suggestion entry from the database."""
+    with db.engine.connect() as connection:
+        return [entry for _, load in LOADERS.values() for entry in load(connection)]
+
+
+class SuggestionChanges(WriteBehindBuffer):
+    """Buffer of committed (model, id) changes not yet in the index."""
+
+    name = "suggestion-changes"
+
+    def record(self, changes):
+        """Queue the ids in ``changes``, a dict of model class to ids."""
+        for model, ids in changes.items():
+            for doc_id in ids:
+                self._queue((model, doc_id), None)
+
+    def _write(self, connection, batch):
+        ids = defaultdict(set)
+        for model, doc_id in batch:
+            ids[model].add(doc_id)
+
+        upserts, removals = [], set()
+        for model, model_ids in ids.items():
+            kind, load = LOADERS[model]
+            # Rows that no longer qualify (deleted, rejected, inactive) drop out
+            loaded = list(load(connection, model_ids))
+            upserts.extend(loaded)
+            removals |= {(kind, doc_id) for doc_id in model_ids} - {_entry_key(entry) for entry in loaded}
+        get_suggestion_index().update(upserts, removals)
+
+    def _written(self, batch):
+        if get_suggestion_index().compaction_due():
+            compact_suggestions()
+
+
+def init_suggestions(app):
+    """Set up the suggestion index for ``app``.
+
+    Nothing is read from the database here; the snapshot is built on the
+    first suggestion if no process has written it yet.
+    """
+    index = SuggestionIndex(
+        app.config.get("SUGGEST_SNAPSHOT_PATH"),
+        app.config.get("SUGGEST_MAX_CANDIDATES", 1000),
+        app.config.get("SUGGEST_DELTA_LIMIT", 500),
+        loader=load_suggestions,
+    )
+    app.extensions["suggestion_index"] = index
+    app.extensions["suggestion_changes"] = SuggestionChanges(app, app.config.get("SUGGEST_FLUSH_INTERVAL", 1))
+    return index
+
+
+def get_suggestion_index() -> SuggestionIndex:
+    """Get the suggestion index of the current app."""
+    return current_app.extensions["suggestion_index"]
+
+
+def rebuild_suggestions() -> int:
+    """Rebuild the snapshot, refreshing popularity weights.
+
+    Returns:
+        int: Number of suggestion entries
+    """
+    return get_suggestion_index().build(load_suggestions())
+
+
+def flush_suggestions() -> int:
+    """Apply the current app's buffered changes to the index now."""
+    return current_app.extensions["suggestion_changes"].flush()
+
+
+@async_task
+def compact_suggestions() -> int:
+    """Merge the pending suggestion changes into a new snapshot.
+
+    Returns:
+        int: Number of suggestion entries
+    """
+    return get_suggestion_index().compact()
+
+
+# Keeping the snapshot in sync with ORM writes
+
+def _current_index():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("suggestion_index")
+
+
+def _enqueue(target):
+    session = object_session(target)
+    if session is not None and _current_index() is not None:
+        session.info.setdefault("suggestion_changes", defaultdict(set))[type(target)].add(target.id)
+
+
+def _enqueue_insert(mapper, connection, target):
+    _enqueue(target)
+
+
+def _enqueue_update(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if any(attrs[field].history.has_changes() for field in TRACKED_FIELDS[type(target)]):
+        _enqueue(target)
+
+
+for _model in TRACKED_FIELDS:
+    event.listen(_model, "after_insert", _enqueue_insert)
+    event.listen(_model, "after_update", _enqueue_update)
+    event.listen(_model, "after_delete", _enqueue_insert)
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_suggestion_changes(session):
+    changes = session.info.pop("suggestion_changes", None)
+    if changes and _current_index() is not None:
+        current_app.extensions["suggestion_changes"].record(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_suggestion_changes(session):
+    session.info.pop("suggestion_changes", None)
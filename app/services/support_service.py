@@ -2,6 +2,11 @@ from typing import List, Dict, Any, Optional
 from flask import current_app
 from app.database.models import Dukungan, Kebutuhan, Pengguna
 from app.database.base import db
+from app.services.query_options import (
+    kebutuhan_list_options, supporter_list_options, user_support_options
+)
+from app.services.stats_service import get_rollup_totals
+from app.utils.pagination import keyset_paginate
 
 
 def create_support(kebutuhan_id: int, supporter_id: int) -> Dukungan:
@@ -34,6 +39,11 @@ def create_support(kebutuhan_id: int, supporter_id: int) -> Dukungan:
     dukungan = Dukungan(pengguna_id=supporter_id, kebutuhan_id=kebutuhan_id)
 
     db.session.add(dukungan)
+    # Keep the denormalized counter in the same transaction as the insert
+    Kebutuhan.query.filter_by(id=kebutuhan_id).update(
+        {Kebutuhan.support_count: Kebutuhan.support_count + 1},
+        synchronize_session=False
+    )
     db.session.commit()
 
     current_app.logger.info(f"User {supporter_id} supported kebutuhan {kebutuhan_id}")
@@ -62,6 +72,10 @@ def remove_support(user_id: int, kebutuhan_id: int) -> bool:
         raise ValueError("Support not found")
     
     db.session.delete(support)
+    Kebutuhan.query.filter_by(id=kebutuhan_id).update(
+        {Kebutuhan.support_count: Kebutuhan.support_count - 1},
+        synchronize_session=False
+    )
     db.session.commit()
     
     current_app.logger.info(f"User {user_id} removed support from kebutuhan {kebutuhan_id}")
@@ -81,7 +95,8 @@ def get_support_by_id(support_id: int) -> Optional[Dukungan]:
 
 
 def get_user_supports(
-    user_id: int, page: int = 1, per_page: int = 10
+    user_id: int, page: int = 1, per_page: int = 10,
+    cursor: str = None, keyset: bool = False, with_total: bool = False
 ):
     """Get paginated supports by a user.
 
@@ -89,21 +104,28 @@ def get_user_supports(
         user_id: Supporter user ID
         page: Page number
         per_page: Items per page
+        cursor: Cursor from the previous page, with ``keyset``
+        keyset: Paginate on (timestamp, id) instead of page numbers
+        with_total: Count every match, with ``keyset``
 
     Returns:
-        Pagination: Paginated support records
+        Pagination or CursorPage: Paginated support records
     """
-    return (
-        Dukungan.query.filter_by(pengguna_id=user_id)
-        .order_by(Dukungan.timestamp.desc())
-        .paginate(page=page, per_page=per_page, error_out=False)
+    query = Dukungan.query.options(*user_support_options()).filter_by(pengguna_id=user_id)
+    if keyset:
+        return keyset_paginate(query, Dukungan.timestamp, Dukungan.id, cursor, per_page, with_total)
+    return query.order_by(Dukungan.timestamp.desc()).paginate(
+        page=page, per_page=per_page, error_out=False
     )
 
 
 def get_kebutuhan_supporters(
     kebutuhan_id: int, 
     page: int = 1, 
-    per_page: int = 20
+    per_page: int = 20,
+    cursor: str = None,
+    keyset: bool = False,
+    with_total: bool = False
 ):
     """Get paginated supporters for a kebutuhan.
 
@@ -111,14 +133,18 @@ def get_kebutuhan_supporters(
         kebutuhan_id: Kebutuhan ID
         page: Page number
         per_page: Items per page
+        cursor: Cursor from the previous page, with ``keyset``
+        keyset: Paginate on (timestamp, id) instead of page numbers
+        with_total: Count every match, with ``keyset``
 
     Returns:
-        Pagination: Paginated support records
+        Pagination or CursorPage: Paginated support records
     """
-    return (
-        Dukungan.query.filter_by(kebutuhan_id=kebutuhan_id)
-        .order_by(Dukungan.timestamp.desc())
-        .paginate(page=page, per_page=per_page, error_out=False)
+    query = Dukungan.query.options(*supporter_list_options()).filter_by(kebutuhan_id=kebutuhan_id)
+    if keyset:
+        return keyset_paginate(query, Dukungan.timestamp, Dukungan.id, cursor, per_page, with_total)
+    return query.order_by(Dukungan.timestamp.desc()).paginate(
+        page=page, per_page=per_page, error_out=False
     )
 
 
@@ -196,22 +222,20 @@ def get_support_statistics() -> Dict[str, Any]:
     Returns:
         Dict: Global statistics
     """
-    total_supports = Dukungan.query.count()
+    total_supports = get_rollup_totals('supports').get('', 0)
     unique_supporters = db.session.query(
         db.func.count(db.func.distinct(Dukungan.pengguna_id))
     ).scalar()
     
-    # Most supported kebutuhan
+    # Most supported kebutuhan, from the stored counters
     most_supported = db.session.query(
         Kebutuhan.id,
         Kebutuhan.judul,
-        db.func.count(Dukungan.id).label('support_count')
-    ).join(
-        Dukungan, Kebutuhan.id == Dukungan.kebutuhan_id
-    ).group_by(
-        Kebutuhan.id, Kebutuhan.judul
+        Kebutuhan.support_count
+    ).filter(
+        Kebutuhan.support_count > 0
     ).order_by(
-        db.func.count(Dukungan.id).desc()
+        Kebutuhan.support_count.desc()
     ).limit(10).all()
     
     # Most active supporters
@@ -275,8 +299,12 @@ def get_trending_kebutuhan(days: int = 7, limit: int = 10) -> List[Kebutuhan]:
     ).limit(limit).all()
     
     kebutuhan_ids = [item[0] for item in trending]
+    if not kebutuhan_ids:
+        return []
     
-    return Kebutuhan.query.filter(
+    return Kebutuhan.query.options(
+        *kebutuhan_list_options()
+    ).filter(
         Kebutuhan.id.in_(kebutuhan_ids)
     ).order_by(
         db.case(
@@ -1,8 +1,13 @@
 # app/services/user_service.py
 from typing import Dict, Any, Optional, List
 from flask import current_app
-from app.database.models import Pengguna, Project, Kebutuhan, Dukungan, Komentar
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from app.database.models import Pengguna, Project, Kebutuhan, Dukungan, Komentar, Notification
 from app.database.base import db
+from app.services.last_seen import get_last_seen_tracker, touch_user
+from app.utils.cache import invalidate_tags
+from app.utils.decorators import cache_result
 from datetime import datetime
 
 
@@ -126,7 +131,7 @@ def update_user(
         user.set_password(new_password)
     
     # Update last seen
-    user.last_seen = datetime.utcnow()
+    touch_user(user)
     
     db.session.commit()
     
@@ -273,6 +278,48 @@ def get_user_stats(user_id: int) -> Dict[str, Any]:
     }
 
 
+def user_counts_tag(user_id: int) -> str:
+    """Cache tag of the counts returned by get_user_counts()."""
+    return f"user:{user_id}:counts"
+
+
+@cache_result(tags=lambda user_id: [user_counts_tag(user_id)])
+def get_user_counts(user_id: int) -> Dict[str, int]:
+    """Get the counts shown on every page for a logged-in user.
+
+    Cached per user and invalidated when the user's notifications,
+    projects, kebutuhan or supports change.
+
+    Args:
+        user_id: User ID
+
+    Returns:
+        Dict: unread_notifications, user_projects_count,
+            user_kebutuhan_count and user_supports_count
+    """
+    def count(model, *criteria):
+        return db.select(db.func.count(model.id)).where(*criteria).scalar_subquery()
+
+    row = db.session.execute(db.select(
+        db.select(Pengguna.unread_notification_count).where(Pengguna.id == user_id).scalar_subquery(),
+        count(Project, Project.pengguna_id == user_id),
+        count(Kebutuhan, Kebutuhan.pengguna_id == user_id),
+        count(Dukungan, Dukungan.pengguna_id == user_id),
+    )).one()
+
+    return {
+        'unread_notifications': row[0] or 0,
+        'user_projects_count': row[1],
+        'user_kebutuhan_count': row[2],
+        'user_supports_count': row[3]
+    }
+
+
+def invalidate_user_counts(*user_ids: int):
+    """Drop cached get_user_counts() results for the given users."""
+    invalidate_tags(*(user_counts_tag(user_id) for user_id in user_ids))
+
+
 def search_users(
     query: str,
     role: str = None,
@@ -434,16 +481,19 @@ def get_user_rankings(metric: str = 'projects', limit: int = 10) -> List[Dict[st
     ]
 
 
-def update_user_last_seen(user_id: int):
+def update_user_last_seen(user_id: int) -> bool:
     """Update user's last seen timestamp.
 
+    The write is skipped while the previous one is recent and otherwise
+    queued for the next bulk flush.
+
     Args:
         user_id: User ID
+
+    Returns:
+        bool: True if a write was queued
     """
-    user = get_user_by_id(user_id)
-    if user:
-        user.last_seen = datetime.utcnow()
-        db.session.commit()
+    return get_last_seen_tracker().touch(user_id) is not None
 
 
 def validate_user_data(username: str, email: str, nama: str) -> Dict[str, List[str]]:
@@ -483,4 +533,51 @@ def validate_user_data(username: str, email: str, nama: str) -> Dict[str, List[s
     elif len(nama) > 120:
         errors.setdefault('nama', []).append('Nama maksimal 120 karakter')
     
-    return errors
\ No newline at end of file
+    return errors
+
+# Invalidating cached user counts on ORM writes
+
+# Model -> column holding the user whose counts it affects
+USER_COUNT_OWNERS = {
+    Notification: 'user_id',
+    Project: 'pengguna_id',
+    Kebutuhan: 'pengguna_id',
+    Dukungan: 'pengguna_id',
+}
+
+
+def _queue_user_counts(target, *previous_user_ids):
+    session = object_session(target)
+    if session is None:
+        return
+    user_ids = {getattr(target, USER_COUNT_OWNERS[type(target)]), *previous_user_ids}
+    user_ids.discard(None)
+    session.info.setdefault('user_counts_changed', set()).update(user_ids)
+
+
+def _count_owner_changed(mapper, connection, target):
+    _queue_user_counts(target)
+
+
+def _notification_updated(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if attrs.is_read.history.has_changes() or attrs.user_id.history.has_changes():
+        _queue_user_counts(target, *attrs.user_id.history.deleted)
+
+
+for _model in USER_COUNT_OWNERS:
+    event.listen(_model, 'after_insert', _count_owner_changed)
+    event.listen(_model, 'after_delete', _count_owner_changed)
+event.listen(Notification, 'after_update', _notification_updated)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_user_counts(session):
+    user_ids = session.info.pop('user_counts_changed', None)
+    if user_ids:
+        invalidate_user_counts(*user_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_user_counts(session):
+    session.info.pop('user_counts_changed', None)
@@ -0,0 +1,102 @@
+# app/services/view_counter.py
+"""Write-behind page view counts.
+
+Views are added to a per-process buffer instead of updating and committing
+the row on every GET. A background thread writes the buffered deltas every
+VIEW_FLUSH_INTERVAL seconds, one executemany ``UPDATE ... SET view_count =
+view_count + n`` per model. Instances loaded while views are buffered get
+the buffered views added to ``view_count``, so this process keeps seeing
+live counts.
+
+With VIEW_FLUSH_INTERVAL set to None no thread is started; buffered views
+are written by flush_views() and at interpreter exit.
+"""
+from flask import current_app, has_app_context
+from sqlalchemy import bindparam, event
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.database.base import db
+from app.database.models import Project, Kebutuhan
+from app.utils.write_behind import WriteBehindBuffer
+
+COUNTED_MODELS = (Project, Kebutuhan)
+
+
+class ViewCounter(WriteBehindBuffer):
+    """Buffer of view deltas keyed by (model, id)."""
+
+    name = "view-counter"
+
+    def _merge(self, pending, key, views):
+        pending[key] = pending.get(key, 0) + views
+
+    def _size(self, batch):
+        return sum(batch.values())
+
+    def record(self, model, row_id: int, views: int = 1):
+        """Buffer ``views`` more views of row ``row_id`` of ``model``."""
+        self._queue((model, row_id), views)
+
+    def pending(self, model, row_id: int) -> int:
+        """Get the views of a row not written to the database yet."""
+        key = (model, row_id)
+        return self._pending.get(key, 0) + self._flushing.get(key, 0)
+
+    def _write(self, connection, batch):
+        rows = {}
+        for (model, row_id), views in batch.items():
+            rows.setdefault(model, []).append({"row_id": row_id, "views": views})
+
+        for model, params in rows.items():
+            table = model.__table__
+            connection.execute(
+                table.update()
+                .where(table.c.id == bindparam("row_id"))
+                .values(view_count=db.func.coalesce(table.c.view_count, 0) + bindparam("views")),
+                params
+            )
+
+
+def init_views(app) -> ViewCounter:
+    """Create the view counter for ``app``."""
+    counter = ViewCounter(
+        app,
+        app.config.get("VIEW_FLUSH_INTERVAL", 5),
+        app.config.get("VIEW_MAX_PENDING", 10000),
+    )
+    app.extensions["view_counter"] = counter
+    return counter
+
+
+def get_view_counter() -> ViewCounter:
+    """Get the view counter of the current app."""
+    return current_app.extensions["view_counter"]
+
+
+def record_view(target):
+    """Count a view of ``target`` without writing to the database now."""
+    get_view_counter().record(type(target), target.id)
+    # Show the new count on this instance without marking it dirty
+    set_committed_value(target, "view_count", (target.view_count or 0) + 1)
+
+
+def flush_views() -> int:
+    """Write the current app's buffered views now."""
+    return get_view_counter().flush()
+
+
+# Merging buffered views into loaded rows
+
+def _add_pending(target, context, attrs=None):
+    if attrs is not None and "view_count" not in attrs:
+        return
+    if not has_app_context() or "view_counter" not in current_app.extensions:
+        return
+    views = get_view_counter().pending(type(target), target.id)
+    if views:
+        set_committed_value(target, "view_count", (target.view_count or 0) + views)
+
+
+for _model in COUNTED_MODELS:
+    event.listen(_model, "load", _add_pending)
+    event.listen(_model, "refresh", _add_pending)
@@ -19,6 +19,12 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Validasi form sisi klien
     setupFormValidation();
+
+    // Notifikasi langsung dari server
+    setupNotificationStream();
+
+    // Muat halaman berikutnya saat daftar digulir sampai bawah
+    setupInfiniteScroll();
 });
 
 // Animasi untuk angka-angka statistik
@@ -117,4 +123,135 @@ function previewImage(input, previewId) {
         
         reader.readAsDataURL(input.files[0]);
     }
-}
\ No newline at end of file
+}
+
+// Terima notifikasi baru lewat Server-Sent Events. Hanya satu tab yang
+// membuka stream (pemegang Web Lock); tab lain menerima event-nya lewat
+// BroadcastChannel. Bila server menolak stream, jumlah belum dibaca
+// diambil berkala (polling).
+function setupNotificationStream() {
+    const bell = document.getElementById('notificationBell');
+    const badge = document.getElementById('notificationBadge');
+
+    if (!bell || !badge) {
+        return;
+    }
+
+    const channel = window.BroadcastChannel ? new BroadcastChannel('komunitech-notifications') : null;
+
+    function show(message) {
+        badge.textContent = message.count;
+        badge.classList.toggle('d-none', message.count <= 0);
+        if (message.title) {
+            bell.setAttribute('title', message.title);
+        }
+    }
+
+    // BroadcastChannel tidak mengirim balik ke tab pengirim
+    function deliver(message) {
+        show(message);
+        if (channel) {
+            channel.postMessage(message);
+        }
+    }
+
+    function poll() {
+        const interval = (parseInt(bell.getAttribute('data-poll-interval')) || 60) * 1000;
+
+        function check() {
+            fetch(bell.getAttribute('data-count-url'), { headers: { 'Accept': 'application/json' } })
+                .then(function(response) { return response.ok ? response.json() : null; })
+                .then(function(data) {
+                    if (data) {
+                        deliver({ count: data.count });
+                    }
+                })
+                .catch(function() {});
+        }
+
+        check();
+        setInterval(check, interval);
+    }
+
+    function listen() {
+        if (!window.EventSource) {
+            poll();
+            return;
+        }
+
+        // EventSource menyambung ulang sendiri bila koneksi terputus
+        const source = new EventSource(bell.getAttribute('data-stream-url'));
+
+        source.addEventListener('unread', function(event) {
+            deliver({ count: JSON.parse(event.data).count });
+        });
+
+        source.addEventListener('notification', function(event) {
+            const notification = JSON.parse(event.data);
+            deliver({ count: (parseInt(badge.textContent) || 0) + 1, title: notification.title });
+        });
+
+        // Ditolak server (batas stream penuh): tidak menyambung ulang
+        source.addEventListener('error', function() {
+            if (source.readyState === EventSource.CLOSED) {
+                poll();
+            }
+        });
+    }
+
+    if (channel && navigator.locks) {
+        channel.addEventListener('message', function(event) {
+            show(event.data);
+        });
+        // Kunci dipegang selama tab terbuka dan dilepas saat tab ditutup,
+        // lalu tab berikutnya mengambil alih stream
+        navigator.locks.request('komunitech-notification-stream', function() {
+            listen();
+            return new Promise(function() {});
+        });
+    } else {
+        listen();
+    }
+}
+
+// Gulir tanpa batas: ambil halaman berikutnya lewat tautan rel="next"
+// (berbasis cursor) lalu tambahkan isinya ke daftar
+function setupInfiniteScroll() {
+    const container = document.querySelector('[data-infinite-scroll]');
+    const nav = document.querySelector('[data-infinite-nav]');
+
+    if (!container || !nav || !window.IntersectionObserver) {
+        return;
+    }
+
+    let loading = false;
+
+    const observer = new IntersectionObserver(function(entries) {
+        const next = nav.querySelector('a[rel="next"]');
+        if (!entries[0].isIntersecting || loading || !next) {
+            return;
+        }
+
+        loading = true;
+        fetch(next.href, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            .then(function(response) { return response.text(); })
+            .then(function(html) {
+                const page = new DOMParser().parseFromString(html, 'text/html');
+                const items = page.querySelector('[data-infinite-scroll]');
+                const pageNav = page.querySelector('[data-infinite-nav]');
+
+                if (items) {
+                    Array.from(items.children).forEach(function(item) {
+                        container.appendChild(item);
+                    });
+                }
+                nav.innerHTML = pageNav ? pageNav.innerHTML : '';
+                if (!nav.querySelector('a[rel="next"]')) {
+                    observer.disconnect();
+                }
+            })
+            .finally(function() { loading = false; });
+    }, { rootMargin: '200px' });
+
+    observer.observe(nav);
+}
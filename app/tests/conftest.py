@@ -2,13 +2,16 @@
 import os
 import tempfile
 import pytest
+from contextlib import contextmanager
 from datetime import datetime
+from sqlalchemy import event
 from flask import Flask
 from flask_login import login_user, logout_user
 
 from app import create_app
 from app.config import TestConfig
 from app.database.base import db as _db
+from app.services.category_service import reset_category_catalog
 from app.database.models import (
     Pengguna, Kategori, Project, Kebutuhan, 
     Komentar, Dukungan, Notification
@@ -68,6 +71,16 @@ def db(_db_setup, app):
         transaction.rollback()
         connection.close()
         session.remove()
+        
+        # Cached values may refer to rows that were rolled back
+        app.extensions['cache'].clear()
+        reset_category_catalog()
+        app.extensions['view_counter'].discard()
+        app.extensions['daily_stats'].discard()
+        app.extensions['last_seen'].discard()
+        app.extensions['notification_dispatcher'].discard()
+        app.extensions['audit_sink'].discard()
+        app.extensions['suggestion_changes'].discard()
 
 
 @pytest.fixture
@@ -290,6 +303,37 @@ def auth_headers(user):
     return {'Authorization': f'Bearer test-token-{user.id}'}
 
 
+@pytest.fixture
+def assert_max_queries(db):
+    """Fail when the wrapped block runs more SQL statements than allowed.
+
+    Usage::
+
+        with assert_max_queries(3):
+            client.get('/project/')
+    """
+    @contextmanager
+    def _assert_max_queries(limit):
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = _db.engine
+        event.listen(engine, 'before_cursor_execute', _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', _record)
+
+        assert len(statements) <= limit, (
+            f'Expected at most {limit} queries, got {len(statements)}:\n'
+            + '\n'.join(statements)
+        )
+
+    return _assert_max_queries
+
+
 class AuthActions:
     """Helper class for authentication actions in tests."""
     
@@ -1,7 +1,7 @@
 # tests/integration/test_project_routes.py
 import pytest
 from flask import url_for
-from app.database.models import Project
+from app.database.models import Project, Pengguna
 import io
 
 
@@ -199,4 +199,26 @@ class TestProjectRoutes:
         client.application.db.session.commit()
         
         response = client.get(f'/project/{project.id}')
-        assert b'Selesai' in response.data
\ No newline at end of file
+        assert b'Selesai' in response.data
+    
+    def test_project_list_query_count(self, client, db, categories, assert_max_queries):
+        """Test project list does not query per project."""
+        for i in range(5):
+            owner = Pengguna(username=f'owner{i}', email=f'owner{i}@example.com', nama=f'Owner {i}')
+            owner.set_password('Owner123!')
+            db.session.add(owner)
+            db.session.flush()
+            db.session.add(Project(
+                judul=f'Project {i}',
+                deskripsi='Test project',
+                pengguna_id=owner.id,
+                kategori_id=categories[i % len(categories)].id
+            ))
+        db.session.commit()
+        db.session.expire_all()
+        
+        with assert_max_queries(4):
+            response = client.get('/project/')
+        
+        assert response.status_code == 200
+        assert b'Owner 4' in response.data
@@ -0,0 +1,51 @@
+# tests/integration/test_support_routes.py
+from app.database.models import Pengguna, Dukungan
+
+
+class TestSupportRoutes:
+    """Test support-related routes."""
+    
+    def test_supporters_list_query_count(self, client, db, kebutuhan, assert_max_queries):
+        """Test supporters endpoint does not query per supporter."""
+        for i in range(5):
+            supporter = Pengguna(username=f'fan{i}', email=f'fan{i}@example.com', nama=f'Fan {i}')
+            supporter.set_password('Fan12345!')
+            db.session.add(supporter)
+            db.session.flush()
+            db.session.add(Dukungan(pengguna_id=supporter.id, kebutuhan_id=kebutuhan.id))
+        db.session.commit()
+        db.session.expire_all()
+        
+        with assert_max_queries(3):
+            response = client.get(f'/support/kebutuhan/{kebutuhan.id}/supporters')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['pagination']['total'] == 5
+        assert {item['username'] for item in data['data']} == {f'fan{i}' for i in range(5)}
+
+    def test_supporters_list_cursor(self, client, db, kebutuhan):
+        """Test supporters are paged with cursors and only counted once."""
+        for i in range(5):
+            supporter = Pengguna(username=f'fan{i}', email=f'fan{i}@example.com', nama=f'Fan {i}')
+            supporter.set_password('Fan12345!')
+            db.session.add(supporter)
+            db.session.flush()
+            db.session.add(Dukungan(pengguna_id=supporter.id, kebutuhan_id=kebutuhan.id))
+        db.session.commit()
+        url = f'/support/kebutuhan/{kebutuhan.id}/supporters'
+
+        first = client.get(url, query_string={'per_page': 3}).get_json()
+        second = client.get(url, query_string={'per_page': 3, 'cursor': first['pagination']['next_cursor']}).get_json()
+
+        assert first['pagination']['total'] == 5
+        assert 'total' not in second['pagination']
+        assert not second['pagination']['has_next']
+        usernames = [item['username'] for item in first['data'] + second['data']]
+        assert sorted(usernames) == [f'fan{i}' for i in range(5)]
+
+    def test_supporters_list_bad_cursor(self, client, kebutuhan):
+        """Test a malformed cursor is rejected."""
+        response = client.get(f'/support/kebutuhan/{kebutuhan.id}/supporters?cursor=rusak')
+
+        assert response.status_code == 400
@@ -0,0 +1,75 @@
+# tests/integration/test_user_routes.py
+import json
+from app.services.notification_service import create_notification
+
+
+def read_event(stream):
+    """Parse the next Server-Sent Event from a streamed response."""
+    chunk = next(stream).decode()
+    fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n') if not line.startswith('retry'))
+    return fields.get('event'), json.loads(fields['data']) if 'data' in fields else chunk
+
+
+class TestNotificationStream:
+    """Test the Server-Sent Events notification stream."""
+
+    def test_stream_requires_login(self, client):
+        response = client.get('/user/notifications/stream')
+
+        assert response.status_code == 302
+
+    def test_stream_pushes_new_notifications(self, auth_client, db, user):
+        create_notification(user.id, 'comment', 'Sebelum')
+
+        response = auth_client.get('/user/notifications/stream')
+        stream = iter(response.response)
+
+        assert response.mimetype == 'text/event-stream'
+        assert response.headers['X-Accel-Buffering'] == 'no'
+        assert read_event(stream) == ('unread', {'count': 1})
+
+        notification = create_notification(user.id, 'support', 'Dukungan baru', link='/kebutuhan/1')
+        event, data = read_event(stream)
+
+        assert event == 'notification'
+        assert data['id'] == notification.id
+        assert data['title'] == 'Dukungan baru'
+        assert data['link'] == '/kebutuhan/1'
+        response.close()
+
+    def test_stream_keeps_alive_and_ends(self, auth_client, db, user):
+        auth_client.application.config.update(NOTIFICATION_STREAM_KEEPALIVE=0.01, NOTIFICATION_STREAM_TIMEOUT=0.05)
+
+        response = auth_client.get('/user/notifications/stream')
+        chunks = [chunk.decode() for chunk in response.response]
+
+        assert chunks[0].startswith('retry: 5000\n')
+        assert ': keep-alive\n\n' in chunks[1:]
+        response.close()
+
+    def test_stream_refused_over_user_cap(self, auth_client, db, user):
+        auth_client.application.config.update(NOTIFICATION_STREAMS_PER_USER=1)
+
+        first = auth_client.get('/user/notifications/stream')
+        refused = auth_client.get('/user/notifications/stream')
+
+        assert first.status_code == 200
+        assert refused.status_code == 503
+        assert refused.headers['Retry-After'] == '60'
+
+        first.close()
+        again = auth_client.get('/user/notifications/stream')
+        assert again.status_code == 200
+        again.close()
+
+    def test_stream_refused_over_worker_cap(self, auth_client, db, user):
+        auth_client.application.config.update(NOTIFICATION_STREAMS_PER_WORKER=0)
+
+        assert auth_client.get('/user/notifications/stream').status_code == 503
+
+    def test_count_for_polling(self, auth_client, db, user):
+        create_notification(user.id, 'comment', 'Belum dibaca')
+
+        response = auth_client.get('/user/notifications/count')
+
+        assert response.get_json() == {'count': 1}
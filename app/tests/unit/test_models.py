@@ -5,6 +5,8 @@ from app.database.models import (
     Pengguna, Kategori, Project, Kebutuhan, 
     Komentar, Dukungan, Notification
 )
+from app.services.support_service import create_support
+from app.services.comment_service import create_comment
 
 
 class TestPenggunaModel:
@@ -172,13 +174,7 @@ class TestProjectModel:
             db.session.add(user)
             db.session.commit()
             
-            support = Dukungan(
-                pengguna_id=user.id,
-                kebutuhan_id=kebutuhan.id
-            )
-            db.session.add(support)
-        
-        db.session.commit()
+            create_support(kebutuhan.id, user.id)
         
         # Should have 3 supports total
         assert project.total_support == 3
@@ -263,9 +259,7 @@ class TestKebutuhanModel:
         db.session.add(user)
         db.session.commit()
         
-        support = Dukungan(pengguna_id=user.id, kebutuhan_id=kebutuhan.id)
-        db.session.add(support)
-        db.session.commit()
+        create_support(kebutuhan.id, user.id)
         
         assert kebutuhan.jumlah_dukungan == 1
     
@@ -275,14 +269,12 @@ class TestKebutuhanModel:
         
         # Add comments
         for i in range(3):
-            comment = Komentar(
+            create_comment(
                 isi=f'Comment {i}',
-                pengguna_id=user.id,
-                kebutuhan_id=kebutuhan.id
+                kebutuhan_id=kebutuhan.id,
+                penulis_id=user.id
             )
-            db.session.add(comment)
         
-        db.session.commit()
         assert kebutuhan.jumlah_komentar == 3
     
     def test_update_status(self, db, kebutuhan, user):
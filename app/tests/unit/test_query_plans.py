@@ -0,0 +1,140 @@
+# tests/unit/test_query_plans.py
+import re
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.database.models import Pengguna, Project, Kebutuhan, Komentar, Dukungan, Notification
+from app.services.comment_service import get_kebutuhan_comments
+from app.services.kebutuhan_service import get_all_kebutuhan, get_project_kebutuhan
+from app.services.notification_service import get_user_notifications
+from app.services.project_service import get_recent_projects
+from app.services.support_service import get_kebutuhan_supporters
+
+STATUSES = ['Diajukan', 'Diproses', 'Selesai', 'Ditolak']
+
+
+@pytest.fixture
+def seeded(db, user, categories):
+    """A few hundred rows in each table the hot queries read."""
+    start = datetime(2024, 1, 1)
+    kategori_id = categories[0].id
+
+    db.session.execute(Pengguna.__table__.insert(), [
+        {'username': f'seed{i}', 'email': f'seed{i}@example.com', 'nama': f'Seed {i}'}
+        for i in range(20)
+    ])
+    user_ids = [user.id] + [u.id for u in Pengguna.query.filter(Pengguna.username.like('seed%'))]
+
+    db.session.execute(Project.__table__.insert(), [
+        {'judul': f'Project {i}', 'deskripsi': 'Seed', 'pengguna_id': user.id, 'kategori_id': kategori_id,
+         'status': 'Aktif' if i % 4 else 'Selesai', 'timestamp': start + timedelta(hours=i)}
+        for i in range(200)
+    ])
+    project_ids = [p.id for p in Project.query.with_entities(Project.id)]
+
+    db.session.execute(Kebutuhan.__table__.insert(), [
+        {'judul': f'Kebutuhan {i}', 'deskripsi': 'Seed', 'pengguna_id': user.id, 'kategori_id': kategori_id,
+         'project_id': project_ids[i % len(project_ids)], 'status': STATUSES[i % 4], 'prioritas': 'Sedang',
+         'timestamp': start + timedelta(hours=i)}
+        for i in range(400)
+    ])
+    kebutuhan_ids = [k.id for k in Kebutuhan.query.with_entities(Kebutuhan.id)]
+
+    db.session.execute(Dukungan.__table__.insert(), [
+        {'pengguna_id': user_id, 'kebutuhan_id': kebutuhan_id, 'timestamp': start + timedelta(minutes=i)}
+        for i, (user_id, kebutuhan_id) in enumerate(
+            (user_id, kebutuhan_id) for kebutuhan_id in kebutuhan_ids[:40] for user_id in user_ids
+        )
+    ])
+    db.session.execute(Komentar.__table__.insert(), [
+        {'isi': f'Komentar {i}', 'pengguna_id': user.id, 'kebutuhan_id': kebutuhan_ids[i % 40],
+         'timestamp': start + timedelta(minutes=i)}
+        for i in range(400)
+    ])
+    db.session.execute(Notification.__table__.insert(), [
+        {'user_id': user_ids[i % len(user_ids)], 'type': 'comment', 'title': f'Notifikasi {i}',
+         'is_read': i % 3 == 0, 'created_at': start + timedelta(minutes=i)}
+        for i in range(600)
+    ])
+    db.session.commit()
+    with db.engine.begin() as connection:
+        connection.exec_driver_sql('ANALYZE')
+    return {'user_id': user.id, 'project_id': project_ids[0], 'kebutuhan_id': kebutuhan_ids[0]}
+
+
+def keyset_pages(list_function, *args, **kwargs):
+    """Call ``list_function`` for a first keyset page and the one after it."""
+    first = list_function(*args, keyset=True, with_total=True, per_page=5, **kwargs)
+    list_function(*args, keyset=True, cursor=first.next_cursor, per_page=5, **kwargs)
+
+
+# The service calls behind the busiest pages, run as the app runs them
+HOT_CALLS = {
+    'recent_projects': lambda ids: get_recent_projects(per_page=10),
+    'recent_projects_keyset': lambda ids: keyset_pages(get_recent_projects),
+    'project_kebutuhan': lambda ids: get_project_kebutuhan(ids['project_id'], status='Diajukan'),
+    'kebutuhan_by_status': lambda ids: keyset_pages(get_all_kebutuhan, status='Diproses'),
+    'supporters': lambda ids: get_kebutuhan_supporters(ids['kebutuhan_id']),
+    'supporters_keyset': lambda ids: keyset_pages(get_kebutuhan_supporters, ids['kebutuhan_id']),
+    'comment_thread': lambda ids: get_kebutuhan_comments(ids['kebutuhan_id']),
+    'unread_notifications': lambda ids: get_user_notifications(ids['user_id'], unread_only=True),
+    'notifications_keyset': lambda ids: keyset_pages(get_user_notifications, ids['user_id']),
+}
+
+
+@contextmanager
+def captured_selects(engine):
+    """Collect the ``(statement, parameters)`` of every SELECT run on ``engine``."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def query_plan(db, statement, parameters):
+    """The plan lines of ``statement``."""
+    with db.engine.begin() as connection:
+        if db.engine.dialect.name == 'postgresql':
+            # Tiny tables are cheaper to scan; ask whether an index could be used at all
+            connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+            return [row[0] for row in connection.exec_driver_sql(f'EXPLAIN {statement}', parameters)]
+        return [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+
+
+def full_scans(db, plan):
+    """Tables the plan reads from start to end."""
+    if db.engine.dialect.name == 'postgresql':
+        return [m.group(1) for line in plan for m in [re.search(r'Seq Scan on (\w+)', line)] if m]
+    # "SCAN t" walks the table, "SCAN t USING INDEX i" the whole index; "SEARCH" seeks
+    return [m.group(1) for line in plan for m in [re.match(r'SCAN (\w+)', line)] if m]
+
+
+def sorts_page(db, statement, plan):
+    """Whether a LIMITed statement sorts its rows instead of reading them in index order."""
+    # PostgreSQL may pick a top-N sort over an index range on tiny tables
+    if db.engine.dialect.name == 'postgresql' or ' LIMIT ' not in statement:
+        return False
+    return any(line.startswith('USE TEMP B-TREE FOR ORDER BY') for line in plan)
+
+
+class TestQueryPlans:
+    """Test the hot list queries are served by an index."""
+
+    @pytest.mark.parametrize('name', sorted(HOT_CALLS))
+    def test_hot_query_uses_index(self, db, seeded, name):
+        with captured_selects(db.engine) as statements:
+            HOT_CALLS[name](seeded)
+
+        assert statements
+        for statement, parameters in statements:
+            plan = query_plan(db, statement, parameters)
+            assert full_scans(db, plan) == [], statement
+            assert not sorts_page(db, statement, plan), statement
@@ -0,0 +1,66 @@
+# tests/unit/test_services/test_audit_service.py
+import pytest
+from datetime import date
+from app.database.models import AuditAction, AuditLog
+from app.database.partitions import add_months, partition_name
+from app.services.audit_actions import backfill_action_ids
+from app.services.audit_service import get_audit_logs, get_audit_stats, log_admin_action
+from app.services.audit_sink import flush_audit_logs
+
+
+@pytest.fixture
+def audit_logs(db, user, admin_user):
+    """Audit logs written through the sink."""
+    log_admin_action(admin_user.id, 'ban_user', 'user', user.id)
+    log_admin_action(admin_user.id, 'unban_user', 'user', user.id)
+    log_admin_action(admin_user.id, 'ban_user', 'user', admin_user.id)
+    log_admin_action(user.id, 'edit_project', 'project', 1)
+    flush_audit_logs()
+
+
+class TestAuditActions:
+    """Test the action name lookup."""
+
+    def test_actions_stored_once(self, audit_logs):
+        assert sorted(action.name for action in AuditAction.query) == ['ban_user', 'edit_project', 'unban_user']
+        ban = AuditAction.query.filter_by(name='ban_user').one()
+        assert AuditLog.query.filter_by(action_id=ban.id).count() == 2
+
+    def test_orm_insert_resolves_action(self, db, user):
+        db.session.add(AuditLog(user_id=user.id, action='login'))
+        db.session.commit()
+
+        log = AuditLog.query.one()
+        assert log.action_id == AuditAction.query.filter_by(name='login').one().id
+
+    def test_action_filter(self, audit_logs):
+        assert {log.action for log in get_audit_logs(action='ban_user').items} == {'ban_user', 'unban_user'}
+        assert get_audit_logs(action='edit').total == 1
+        assert get_audit_logs(action='missing').total == 0
+
+    def test_backfill_links_old_logs(self, audit_logs):
+        AuditLog.query.update({'action_id': None})
+        AuditLog.query.session.commit()
+
+        assert backfill_action_ids() == 4
+        assert get_audit_logs(action='ban_user').total == 3
+
+    def test_stats(self, audit_logs, admin_user):
+        stats = get_audit_stats()
+
+        assert stats['total_logs'] == 4
+        assert stats['top_actions'] == {'ban_user': 2, 'unban_user': 1, 'edit_project': 1}
+        assert stats['by_entity_type'] == {'user': 3, 'project': 1}
+        assert stats['top_users'][admin_user.nama] == 3
+
+
+class TestPartitionNames:
+    """Test the monthly partition calendar."""
+
+    def test_add_months(self):
+        assert add_months(date(2024, 11, 1), 1) == date(2024, 12, 1)
+        assert add_months(date(2024, 12, 1), 1) == date(2025, 1, 1)
+        assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+
+    def test_partition_name(self):
+        assert partition_name(date(2024, 3, 1)) == 'audit_logs_p202403'
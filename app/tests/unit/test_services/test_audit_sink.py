@@ -0,0 +1,96 @@
+# tests/unit/test_services/test_audit_sink.py
+import json
+import os
+import pytest
+from datetime import datetime
+from app.database.models import AuditLog
+from app.services.audit_service import log_admin_action
+from app.services.audit_sink import AuditSink, flush_audit_logs, get_audit_sink
+
+
+def entry(user_id, action):
+    return {'user_id': user_id, 'action': action, 'timestamp': datetime(2024, 1, 1, 12, 0)}
+
+
+@pytest.fixture
+def sink(app, tmp_path):
+    """A sink spooling to a temporary directory."""
+    sink = AuditSink(app, spool_dir=str(tmp_path))
+    yield sink
+    sink.discard()
+
+
+class TestAuditSink:
+    """Test buffered audit log writes."""
+
+    def test_log_buffered_until_flush(self, db, user, admin_user):
+        log_admin_action(admin_user.id, 'ban_user', 'user', user.id, 'aktif', 'banned')
+        log_admin_action(admin_user.id, 'unban_user', 'user', user.id)
+
+        assert AuditLog.query.count() == 0
+        assert len(get_audit_sink()) == 2
+
+        assert flush_audit_logs() == 2
+        logs = AuditLog.query.order_by(AuditLog.id).all()
+        assert [log.action for log in logs] == ['ban_user', 'unban_user']
+        assert logs[0].new_value == 'banned'
+        assert logs[0].timestamp is not None
+
+    def test_log_leaves_session_alone(self, db, user, admin_user):
+        admin_id, user_id = admin_user.id, user.id
+        user.bio = 'Belum disimpan'
+
+        log_admin_action(admin_id, 'edit_user', 'user', user_id)
+        flush_audit_logs()
+
+        assert user in db.session.dirty
+        db.session.rollback()
+        assert user.bio != 'Belum disimpan'
+
+    def test_missing_users_dropped(self, db, user):
+        sink = get_audit_sink()
+        sink.record(entry(user.id, 'ada'))
+        sink.record(entry(user.id + 1000, 'hilang'))
+
+        sink.flush()
+
+        assert [log.action for log in AuditLog.query] == ['ada']
+
+    def test_spool_holds_unwritten_entries(self, db, user, sink):
+        sink.record(entry(user.id, 'pertama'))
+        sink.record(entry(user.id, 'kedua'))
+        with open(sink.spool_path) as spool:
+            assert len(spool.readlines()) == 2
+
+        sink.flush()
+
+        assert os.path.getsize(sink.spool_path) == 0
+        assert AuditLog.query.count() == 2
+
+    def test_dead_process_spool_recovered(self, app, db, user, sink, tmp_path):
+        sink.record(entry(user.id, 'sebelum crash'))
+        # The worker dies before flushing
+        os.rename(sink.spool_path, str(tmp_path / 'audit-spool-999999999.jsonl'))
+
+        survivor = AuditSink(app, spool_dir=str(tmp_path))
+        assert survivor.recover() == 1
+        assert survivor.flush() == 1
+
+        log = AuditLog.query.one()
+        assert log.action == 'sebelum crash'
+        assert log.timestamp == datetime(2024, 1, 1, 12, 0)
+        assert survivor.recover() == 0
+
+    def test_reused_pid_spool_recovered(self, app, db, user, sink, tmp_path):
+        # A worker of an earlier container ran under this process's PID
+        dead = tmp_path / f'audit-spool-{os.getpid()}-0123456789ab.jsonl'
+        spooled = dict(entry(user.id, 'sebelum restart'), timestamp='2024-01-01T12:00:00')
+        dead.write_text(json.dumps({'key': 0, 'entry': spooled}) + '\n')
+
+        sink.record(entry(user.id, 'sesudah restart'))
+        assert sink.spool_path != str(dead)
+        assert sink.recover() == 1
+        assert sink.flush() == 2
+
+        assert sorted(log.action for log in AuditLog.query) == ['sebelum restart', 'sesudah restart']
+        assert not dead.exists()
@@ -0,0 +1,55 @@
+# tests/unit/test_services/test_category_service.py
+from app.services.category_service import (
+    CATALOG_VERSION_KEY, create_category, delete_category, get_category_catalog,
+    get_category_stats, update_category
+)
+from app.utils.cache import get_cache
+from app.database.models import Kategori
+
+
+class TestCategoryService:
+    """Test category service functions."""
+
+    def test_catalog_follows_changes(self, db, categories):
+        """Test the cached catalog reloads after category changes."""
+        assert [c.nama for c in get_category_catalog()] == sorted(c.nama for c in categories)
+
+        category = create_category('Ekonomi', 'Kebutuhan terkait ekonomi')
+        assert 'Ekonomi' in [c.nama for c in get_category_catalog()]
+
+        update_category(category.id, nama='Ekonomi Kreatif')
+        assert 'Ekonomi Kreatif' in [c.nama for c in get_category_catalog()]
+
+        delete_category(category.id)
+        assert len(get_category_catalog()) == len(categories)
+
+    def test_catalog_cached(self, db, categories, assert_max_queries):
+        """Test a loaded catalog is served without queries."""
+        get_category_catalog()
+
+        with assert_max_queries(0):
+            get_category_catalog()
+
+    def test_catalog_reloads_on_new_version(self, db, categories):
+        """Test a version bumped by another worker triggers a reload."""
+        get_category_catalog()
+        # Simulate another process editing categories behind this one's back
+        db.session.add(Kategori(nama='Sosial', deskripsi='Kebutuhan terkait sosial'))
+        db.session.commit()
+        assert 'Sosial' not in [c.nama for c in get_category_catalog()]
+
+        get_cache().set(CATALOG_VERSION_KEY, 'other-worker', timeout=0)
+
+        assert 'Sosial' in [c.nama for c in get_category_catalog()]
+
+    def test_get_category_stats(self, db, project, kebutuhan, categories, assert_max_queries):
+        """Test usage counts come from grouped queries."""
+        get_category_catalog()
+
+        with assert_max_queries(2):
+            stats = get_category_stats()
+
+        assert stats['total_categories'] == len(categories)
+        assert stats['most_used']['id'] == categories[0].id
+        assert stats['most_used']['total_usage'] == 2
+        assert len(stats['unused_categories']) == len(categories) - 1
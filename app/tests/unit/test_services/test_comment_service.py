@@ -0,0 +1,99 @@
+# tests/unit/test_services/test_comment_service.py
+import pytest
+from app.services.comment_service import (
+    create_comment, delete_comment, get_kebutuhan_comments,
+    get_comment_depth, rebuild_comment_depths
+)
+from app.database.models import Komentar
+
+
+class TestCommentService:
+    """Test comment service functions."""
+
+    def test_create_comment_increments_counter(self, db, kebutuhan, user):
+        """Test creating a comment bumps the stored counter."""
+        comment = create_comment(
+            isi='Komentar pertama',
+            kebutuhan_id=kebutuhan.id,
+            penulis_id=user.id
+        )
+
+        assert comment.id is not None
+        assert kebutuhan.comment_count == 1
+        assert kebutuhan.jumlah_komentar == 1
+
+    def test_create_comment_invalid_kebutuhan(self, db, user):
+        """Test commenting on a missing kebutuhan."""
+        with pytest.raises(ValueError, match="Kebutuhan tidak ditemukan"):
+            create_comment(isi='Halo', kebutuhan_id=99999, penulis_id=user.id)
+
+    def test_hard_delete_decrements_counter(self, db, kebutuhan, user):
+        """Test deleting a comment without replies lowers the counter."""
+        comment = create_comment(isi='Hapus saya', kebutuhan_id=kebutuhan.id, penulis_id=user.id)
+
+        delete_comment(comment.id, user.id)
+
+        assert Komentar.query.get(comment.id) is None
+        assert kebutuhan.comment_count == 0
+
+    def test_soft_delete_keeps_counter(self, db, kebutuhan, user):
+        """Test soft-deleting a comment with replies keeps the counter."""
+        parent = create_comment(isi='Induk', kebutuhan_id=kebutuhan.id, penulis_id=user.id)
+        create_comment(isi='Balasan', kebutuhan_id=kebutuhan.id, penulis_id=user.id, parent_id=parent.id)
+
+        delete_comment(parent.id, user.id)
+
+        assert Komentar.query.get(parent.id).isi == "[Komentar ini telah dihapus]"
+        assert kebutuhan.comment_count == 2
+
+    def test_reply_stores_depth(self, db, kebutuhan, user):
+        """Test replies record their nesting level."""
+        root = create_comment(isi='Induk', kebutuhan_id=kebutuhan.id, penulis_id=user.id)
+        reply = create_comment(isi='Balasan', kebutuhan_id=kebutuhan.id, penulis_id=user.id, parent_id=root.id)
+
+        assert root.depth == 0
+        assert reply.depth == 1
+        assert get_comment_depth(reply.id) == 1
+
+    def test_reply_max_depth(self, app, db, kebutuhan, user):
+        """Test replies beyond MAX_COMMENT_DEPTH are rejected."""
+        parent = create_comment(isi='Level 0', kebutuhan_id=kebutuhan.id, penulis_id=user.id)
+        for level in range(app.config['MAX_COMMENT_DEPTH']):
+            parent = create_comment(
+                isi=f'Level {level + 1}', kebutuhan_id=kebutuhan.id,
+                penulis_id=user.id, parent_id=parent.id
+            )
+
+        with pytest.raises(ValueError, match="Maksimal kedalaman reply"):
+            create_comment(isi='Terlalu dalam', kebutuhan_id=kebutuhan.id, penulis_id=user.id, parent_id=parent.id)
+
+    def test_get_kebutuhan_comments_threaded(self, db, kebutuhan, user, assert_max_queries):
+        """Test the thread is assembled from a single query."""
+        kebutuhan_id = kebutuhan.id
+        first = create_comment(isi='Pertama', kebutuhan_id=kebutuhan_id, penulis_id=user.id)
+        second = create_comment(isi='Kedua', kebutuhan_id=kebutuhan_id, penulis_id=user.id)
+        reply = create_comment(isi='Balasan', kebutuhan_id=kebutuhan_id, penulis_id=user.id, parent_id=first.id)
+        create_comment(isi='Balasan lagi', kebutuhan_id=kebutuhan_id, penulis_id=user.id, parent_id=reply.id)
+        db.session.expire_all()
+
+        with assert_max_queries(1):
+            threads = get_kebutuhan_comments(kebutuhan_id)
+            assert [t['comment'].isi for t in threads] == ['Pertama', 'Kedua']
+            assert threads[0]['replies'][0]['comment'].isi == 'Balasan'
+            assert threads[0]['replies'][0]['replies'][0]['comment'].isi == 'Balasan lagi'
+            assert threads[1]['comment'].id == second.id
+            assert threads[1]['replies'] == []
+            assert threads[0]['comment'].penulis.nama == user.nama
+
+    def test_rebuild_comment_depths(self, db, kebutuhan, user):
+        """Test depth rebuild repairs rows written without a depth."""
+        root = Komentar(isi='Induk', kebutuhan_id=kebutuhan.id, pengguna_id=user.id)
+        db.session.add(root)
+        db.session.flush()
+        reply = Komentar(isi='Balasan', kebutuhan_id=kebutuhan.id, pengguna_id=user.id, parent_id=root.id)
+        db.session.add(reply)
+        db.session.commit()
+
+        assert rebuild_comment_depths() == 1
+        assert get_comment_depth(reply.id) == 1
+        assert rebuild_comment_depths() == 0
@@ -0,0 +1,205 @@
+# tests/unit/test_services/test_notification_service.py
+import pytest
+from datetime import datetime, timedelta
+from app.services.notification_service import (
+    bulk_create_notifications, create_notification, delete_notification, delete_old_notifications,
+    get_unread_count,
+    mark_all_notifications_read, mark_notification_read, queue_notification,
+    recount_unread_notifications, subscribe_notifications
+)
+from app.services.notification_dispatcher import (
+    flush_notifications, get_notification_dispatcher, insert_notifications
+)
+from app.services.user_service import get_user_counts
+from app.database.models import Notification, Pengguna
+
+
+class TestNotificationDispatch:
+    """Test queued notification fan-out."""
+
+    def test_queue_does_not_write(self, db, user):
+        """Test queued notifications are not inserted until flushed."""
+        queue_notification(user.id, 'support', 'Dukungan baru')
+
+        assert Notification.query.count() == 0
+        assert len(get_notification_dispatcher()) == 1
+
+    def test_flush_inserts_batch(self, db, user, admin_user):
+        """Test one flush inserts every queued notification in order."""
+        queue_notification(user.id, 'comment', 'Pertama', link='/a')
+        queue_notification(admin_user.id, 'support', 'Kedua')
+        queue_notification(user.id, 'milestone', 'Ketiga', message='Pesan')
+
+        assert flush_notifications() == 3
+
+        titles = [n.title for n in Notification.query.order_by(Notification.id)]
+        assert titles == ['Pertama', 'Kedua', 'Ketiga']
+        assert Notification.query.filter_by(user_id=user.id, is_read=False).count() == 2
+        assert len(get_notification_dispatcher()) == 0
+
+    def test_flush_drops_missing_users(self, db, user):
+        """Test notifications for users that do not exist are skipped."""
+        queue_notification(user.id, 'comment', 'Ada')
+        queue_notification(user.id + 1000, 'comment', 'Hilang')
+
+        flush_notifications()
+
+        assert [n.title for n in Notification.query] == ['Ada']
+
+    def test_flush_invalidates_user_counts(self, db, user):
+        """Test cached unread counts see notifications written in bulk."""
+        assert get_user_counts(user.id)['unread_notifications'] == 0
+
+        queue_notification(user.id, 'comment', 'Baru')
+        flush_notifications()
+
+        assert get_user_counts(user.id)['unread_notifications'] == 1
+
+    def test_failed_insert_stays_pending(self, app, db, user, monkeypatch):
+        """Test a batch whose insert job fails under the sync backend is kept."""
+        def fail(rows):
+            raise RuntimeError('Database down')
+
+        monkeypatch.setattr(insert_notifications, 'func', fail)
+        queue_notification(user.id, 'comment', 'Tertunda')
+
+        with pytest.raises(RuntimeError):
+            flush_notifications()
+
+        assert Notification.query.count() == 0
+        assert len(get_notification_dispatcher()) == 1
+
+        monkeypatch.undo()
+        assert flush_notifications() == 1
+        assert [n.title for n in Notification.query] == ['Tertunda']
+
+
+class TestBulkNotifications:
+    """Test the chunked bulk notification path."""
+
+    def test_bulk_create_in_chunks(self, db, user, admin_user):
+        """Test every user gets one notification, chunk by chunk."""
+        user_ids = (user_id for user_id in [user.id, admin_user.id, user.id])
+
+        result = bulk_create_notifications(user_ids, 'announcement', 'Pengumuman', link='/news', chunk_size=2)
+
+        assert result['inserted'] == 3
+        assert result['chunks'] == 2
+        assert result['per_second'] > 0
+        assert Notification.query.filter_by(user_id=user.id, title='Pengumuman').count() == 2
+        assert Notification.query.filter_by(user_id=admin_user.id, is_read=False).count() == 1
+
+    def test_bulk_create_without_users(self, db):
+        """Test an empty audience inserts nothing."""
+        result = bulk_create_notifications([], 'announcement', 'Pengumuman')
+
+        assert result['inserted'] == 0
+        assert result['chunks'] == 0
+        assert Notification.query.count() == 0
+
+    def test_bulk_create_invalidates_user_counts(self, db, user):
+        """Test cached unread counts see bulk inserted notifications."""
+        assert get_user_counts(user.id)['unread_notifications'] == 0
+
+        bulk_create_notifications([user.id], 'announcement', 'Pengumuman')
+
+        assert get_user_counts(user.id)['unread_notifications'] == 1
+
+
+class TestUnreadCounter:
+    """Test the per-user unread notification counter."""
+
+    def test_counter_follows_service_writes(self, db, user):
+        """Test create, read, delete and read-all keep the counter exact."""
+        first = create_notification(user.id, 'comment', 'Satu')
+        second = create_notification(user.id, 'comment', 'Dua')
+        create_notification(user.id, 'comment', 'Tiga')
+        assert get_unread_count(user.id) == 3
+
+        mark_notification_read(first.id, user.id)
+        mark_notification_read(first.id, user.id)
+        assert get_unread_count(user.id) == 2
+
+        delete_notification(second.id, user.id)
+        delete_notification(first.id, user.id)
+        assert get_unread_count(user.id) == 1
+
+        mark_all_notifications_read(user.id)
+        assert get_unread_count(user.id) == 0
+
+    def test_mark_read_decrements_once(self, db, user):
+        """Test a notification read meanwhile by another request is not counted twice."""
+        notification = create_notification(user.id, 'comment', 'Satu')
+        assert not notification.is_read
+        # Another request marks it read after this one loaded it
+        with db.engine.begin() as connection:
+            connection.execute(Notification.__table__.update().values(is_read=True))
+            connection.execute(Pengguna.__table__.update().values(unread_notification_count=0))
+
+        assert mark_notification_read(notification.id, user.id)
+        assert get_unread_count(user.id) == 0
+
+    def test_counter_follows_bulk_writes(self, db, user, admin_user):
+        """Test the queued and chunked bulk paths count unread rows."""
+        queue_notification(user.id, 'comment', 'Antre')
+        flush_notifications()
+        bulk_create_notifications([user.id, admin_user.id, user.id], 'announcement', 'Pengumuman')
+
+        assert get_unread_count(user.id) == 3
+        assert get_unread_count(admin_user.id) == 1
+        assert get_user_counts(user.id)['unread_notifications'] == 3
+
+    def test_recount_repairs_drift(self, db, user):
+        """Test recounting fixes rows written behind the service's back."""
+        db.session.add(Notification(user_id=user.id, type='comment', title='Langsung'))
+        db.session.commit()
+        assert get_unread_count(user.id) == 0
+
+        assert recount_unread_notifications() == 1
+        assert get_unread_count(user.id) == 1
+
+
+class TestNotificationPublish:
+    """Test notifications are pushed to open streams."""
+
+    def test_create_publishes(self, db, user, admin_user):
+        subscription = subscribe_notifications(user.id)
+
+        notification = create_notification(user.id, 'comment', 'Baru', link='/a')
+        create_notification(admin_user.id, 'comment', 'Lain')
+
+        event = subscription.get(timeout=0)
+        assert event['id'] == notification.id
+        assert event['title'] == 'Baru'
+        assert subscription.get(timeout=0) is None
+        subscription.close()
+
+    def test_bulk_paths_publish(self, db, user):
+        subscription = subscribe_notifications(user.id)
+
+        queue_notification(user.id, 'comment', 'Antre')
+        flush_notifications()
+        bulk_create_notifications([user.id], 'announcement', 'Pengumuman')
+
+        assert subscription.get(timeout=0)['title'] == 'Antre'
+        assert subscription.get(timeout=0)['title'] == 'Pengumuman'
+        subscription.close()
+
+
+class TestNotificationRetention:
+    """Test batched deletion of old notifications."""
+
+    def test_delete_old_keeps_counter(self, db, user):
+        old = datetime.utcnow() - timedelta(days=60)
+        for i in range(5):
+            create_notification(user.id, 'comment', f'Lama {i}')
+        create_notification(user.id, 'comment', 'Baru')
+        Notification.query.filter(Notification.title.like('Lama%')).update({'created_at': old})
+        mark_notification_read(Notification.query.filter_by(title='Lama 0').one().id, user.id)
+
+        assert delete_old_notifications.run(30, dry_run=True) == 5
+        assert delete_old_notifications.run(30, batch_size=2, sleep=0) == 5
+
+        assert [n.title for n in Notification.query] == ['Baru']
+        assert get_unread_count(user.id) == 1
+        assert get_user_counts(user.id)['unread_notifications'] == 1
@@ -3,9 +3,9 @@ import pytest
 from app.services.project_service import (
     create_project, get_project_by_id, update_project,
     get_user_projects, get_recent_projects, get_project_stats,
-    add_collaborator
+    add_collaborator, get_project_aggregates, load_project_aggregates
 )
-from app.database.models import Project, ProjectCollaborator
+from app.database.models import Project, ProjectCollaborator, Kebutuhan
 
 
 class TestProjectService:
@@ -111,6 +111,41 @@ class TestProjectService:
         assert paginated.total == 2  # Only active projects
         assert all(p.status == 'Aktif' for p in paginated.items)
     
+    def test_get_project_aggregates(self, db, user, project, categories):
+        """Test batch aggregates match the per-project properties."""
+        for status, supports in [('Selesai', 3), ('Diajukan', 1), ('Diproses', 0), ('Selesai', 2)]:
+            db.session.add(Kebutuhan(
+                judul='Test',
+                deskripsi='Test',
+                project_id=project.id,
+                pengguna_id=user.id,
+                kategori_id=categories[0].id,
+                status=status,
+                support_count=supports
+            ))
+        empty = Project(judul='Empty', deskripsi='Test', pengguna_id=user.id, kategori_id=categories[0].id)
+        db.session.add(empty)
+        db.session.commit()
+
+        aggregates = get_project_aggregates([project.id, empty.id])
+
+        assert aggregates[project.id]['kebutuhan_count'] == project.kebutuhan.count() == 4
+        assert aggregates[project.id]['completion_percentage'] == project.completion_percentage == 50
+        assert aggregates[project.id]['total_support'] == project.total_support == 6
+        assert aggregates[empty.id] == {
+            'kebutuhan_count': 0, 'completed_count': 0, 'total_support': 0, 'completion_percentage': 0
+        }
+
+    def test_load_project_aggregates_reset_on_commit(self, db, user, project, kebutuhan):
+        """Test attached aggregates are dropped once the instance expires."""
+        load_project_aggregates([project])
+        assert project.kebutuhan_count == 1
+
+        kebutuhan.status = 'Selesai'
+        db.session.commit()
+
+        assert project.completion_percentage == 100
+
     def test_get_project_stats_single(self, db, project, kebutuhan):
         """Test getting stats for a single project."""
         stats = get_project_stats(project.id)
@@ -0,0 +1,268 @@
+# tests/unit/test_services/test_search_service.py
+import pytest
+from datetime import datetime
+from app.services.search_service import (
+    search_projects, search_kebutuhan, search_users, get_search_suggestions
+)
+from app.services.search_index import (
+    InvertedIndex, MemorySearchBackend, SearchIndexer, get_search_backend, reindex, tokenize
+)
+from app.services.suggestion_index import (
+    SuggestionIndex, flush_suggestions, get_suggestion_index, rebuild_suggestions
+)
+from app.database.models import Project
+
+
+@pytest.fixture(params=['default', 'memory'])
+def search_backend(request, app, db):
+    """Run a test against the configured backend and the memory fallback."""
+    original = app.extensions['search_backend']
+    if request.param == 'memory':
+        backend = MemorySearchBackend(app)
+        backend.setup()
+        app.extensions['search_backend'] = backend
+    yield app.extensions['search_backend']
+    app.extensions['search_backend'] = original
+
+
+def make_project(db, user, categories, judul, deskripsi='Deskripsi'):
+    project = Project(judul=judul, deskripsi=deskripsi, pengguna_id=user.id, kategori_id=categories[0].id)
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+
+class TestSearchService:
+    """Test full-text search functions."""
+
+    def test_tokenize(self):
+        """Test text is split into lowercase word tokens."""
+        assert tokenize('Aplikasi Kasir-UMKM, v2!') == ['aplikasi', 'kasir', 'umkm', 'v2']
+        assert tokenize(None) == []
+
+    def test_search_projects_ranked(self, db, user, categories, search_backend):
+        """Test title matches rank above description matches."""
+        make_project(db, user, categories, 'Portal warga', 'Sistem informasi desa')
+        titled = make_project(db, user, categories, 'Sistem antrian', 'Antrian puskesmas')
+        make_project(db, user, categories, 'Kebun', 'Pertanian')
+
+        results = search_projects('sistem')
+
+        assert results.total == 2
+        assert results.items[0].id == titled.id
+
+    def test_search_prefix_and_all_terms(self, db, user, categories, search_backend):
+        """Test terms match by prefix and every term must match."""
+        target = make_project(db, user, categories, 'Aplikasi kasir UMKM')
+        make_project(db, user, categories, 'Aplikasi perpustakaan')
+
+        assert [p.id for p in search_projects('apl kas').items] == [target.id]
+        assert search_projects('kasir perpustakaan').total == 0
+        assert search_projects('!!!').total == 0
+
+    def test_search_tracks_updates_and_deletes(self, db, user, categories, search_backend):
+        """Test index follows committed changes."""
+        project = make_project(db, user, categories, 'Website sekolah')
+
+        project.judul = 'Website pesantren'
+        db.session.commit()
+        assert search_projects('sekolah').total == 0
+        assert search_projects('pesantren').total == 1
+
+        db.session.delete(project)
+        db.session.commit()
+        assert search_projects('pesantren').total == 0
+
+    def test_search_kebutuhan_and_users(self, db, user, kebutuhan, search_backend):
+        """Test kebutuhan and user search."""
+        assert search_kebutuhan(kebutuhan.judul.split()[0]).total == 1
+        assert search_users(user.username).items == [user]
+        assert search_users('tidakada').total == 0
+
+    def test_search_reindex(self, db, user, categories, search_backend):
+        """Test reindex restores a stale index, optionally by change time."""
+        project = make_project(db, user, categories, 'Bank sampah')
+        search_backend.remove(db.session.connection(), Project, [project.id])
+        db.session.commit()
+        assert search_projects('sampah').total == 0
+
+        assert reindex(datetime(2100, 1, 1)) == 0
+        assert reindex(datetime(2000, 1, 1)) >= 1
+        assert search_projects('sampah').total == 1
+
+    def test_search_reindex_command(self, runner, db, user, categories):
+        """Test the search-reindex CLI command."""
+        make_project(db, user, categories, 'Bank sampah')
+
+        result = runner.invoke(args=['search-reindex', '--since', '2000-01-01'])
+
+        assert result.exit_code == 0
+        assert 'Indexed' in result.output
+
+    def test_default_backend_for_sqlite(self, app):
+        """Test SQLite databases get the FTS5 backend."""
+        assert get_search_backend().name == 'sqlite'
+
+
+class TestSearchSuggestions:
+    """Test autocomplete served from the prefix index."""
+
+    def test_suggestions_follow_commits(self, db, user, categories):
+        """Test new, renamed and closed projects update suggestions."""
+        project = make_project(db, user, categories, 'Aplikasi kasir')
+        flush_suggestions()
+        assert [s['url'] for s in get_search_suggestions('kas')] == [f'/project/{project.id}']
+
+        project.judul = 'Aplikasi gudang'
+        db.session.commit()
+        flush_suggestions()
+        assert get_search_suggestions('kas') == []
+        assert get_search_suggestions('apl gud')[0]['text'] == 'Aplikasi gudang'
+
+        project.status = 'Ditutup'
+        db.session.commit()
+        flush_suggestions()
+        assert get_search_suggestions('gudang') == []
+
+    def test_commits_only_queue_changes(self, db, user, categories):
+        """Test a commit leaves the index alone until the buffer is flushed."""
+        get_search_suggestions('kas')  # Build the snapshot first
+        make_project(db, user, categories, 'Aplikasi kasir')
+        assert get_search_suggestions('kas') == []
+
+        assert flush_suggestions()
+        assert get_search_suggestions('kas')[0]['text'] == 'Aplikasi kasir'
+
+    def test_commits_queue_compaction(self, db, user, categories, monkeypatch):
+        """Test the delta is merged once it reaches the limit."""
+        index = get_suggestion_index()
+        merged = []
+        monkeypatch.setattr(index, 'delta_limit', 1)
+        monkeypatch.setattr(index, 'compact', lambda: merged.append(1))
+
+        make_project(db, user, categories, 'Aplikasi kasir')
+        make_project(db, user, categories, 'Aplikasi gudang')
+        flush_suggestions()
+
+        assert merged == [1]
+
+    def test_suggestions_ranked_by_popularity(self, db, user, categories):
+        """Test views and support order suggestions."""
+        quiet = make_project(db, user, categories, 'Data desa')
+        popular = make_project(db, user, categories, 'Data kesehatan')
+        popular.view_count = 50
+        db.session.commit()
+        rebuild_suggestions()
+
+        assert [s['text'] for s in get_search_suggestions('data')] == [popular.judul, quiet.judul]
+
+    def test_suggestions_include_users(self, db, user):
+        """Test users are suggested by username and name."""
+        flush_suggestions()
+        suggestions = get_search_suggestions(user.username[:4])
+
+        assert suggestions[0]['type'] == 'user'
+        assert suggestions[0]['url'] == f'/user/{user.username}'
+
+    def test_snapshot_shared_through_file(self, tmp_path):
+        """Test a second index maps the snapshot written by the first."""
+        path = str(tmp_path / 'suggestions.idx')
+        writer, reader = SuggestionIndex(path), SuggestionIndex(path)
+        entry = {'type': 'project', 'id': 1, 'text': 'Bank sampah', 'url': '/project/1', 'weight': 0}
+
+        writer.build([entry])
+        assert reader.suggest('samp') == [entry]
+
+        writer.update([], {('project', 1)})
+        assert reader.suggest('samp') == []
+
+    def test_popular_entries_beyond_candidate_limit(self):
+        """Test each prefix keeps its highest weighted entries."""
+        index = SuggestionIndex(max_candidates=2)
+        quiet = [
+            {'type': 'project', 'id': i, 'text': f'Data {i}', 'url': f'/project/{i}', 'weight': 0}
+            for i in range(1, 6)
+        ]
+        popular = {'type': 'project', 'id': 9, 'text': 'Datum populer', 'url': '/project/9', 'weight': 10}
+        index.build(quiet + [popular])
+
+        assert index.suggest('dat', 1) == [popular]
+        assert [entry['id'] for entry in index.suggest('dat')] == [9, 1]
+
+    def test_changes_appended_until_compacted(self, tmp_path):
+        """Test updates leave the snapshot alone until the delta is merged."""
+        path = tmp_path / 'suggestions.idx'
+        index = SuggestionIndex(str(path), delta_limit=2)
+        first = {'type': 'project', 'id': 1, 'text': 'Bank sampah', 'url': '/project/1', 'weight': 0}
+        second = {'type': 'project', 'id': 2, 'text': 'Sampah plastik', 'url': '/project/2', 'weight': 3}
+        index.build([first])
+        snapshot = path.read_bytes()
+
+        index.update([second], [])
+        assert index.suggest('samp') == [second, first]
+        assert not index.compaction_due()
+
+        index.update([], {('project', 1)})
+        assert path.read_bytes() == snapshot
+        assert index.compaction_due() and not index.compaction_due()
+
+        assert index.compact() == 1
+        assert (tmp_path / 'suggestions.idx.delta').read_bytes() == b''
+        assert SuggestionIndex(str(path)).suggest('samp') == [second]
+
+    def test_snapshot_built_on_first_use(self, tmp_path):
+        """Test the loader runs once, when no snapshot exists."""
+        path = tmp_path / 'suggestions.idx'
+        entry = {'type': 'project', 'id': 1, 'text': 'Bank sampah', 'url': '/project/1', 'weight': 0}
+        calls = []
+        index = SuggestionIndex(str(path), loader=lambda: calls.append(1) or [entry])
+        assert not path.exists()
+
+        assert index.suggest('bank') == [entry]
+        assert SuggestionIndex(str(path), loader=lambda: calls.append(1) or []).suggest('bank') == [entry]
+        assert calls == [1]
+
+
+class TestSearchIndexer:
+    """Test batching of pending index changes."""
+
+    def test_latest_change_wins(self):
+        indexer = SearchIndexer()
+        indexer.add(Project, 1)
+        indexer.discard(Project, 1)
+        indexer.add(Project, 2)
+
+        assert indexer.index[Project] == {2}
+        assert indexer.remove[Project] == {1}
+
+    def test_merge(self):
+        pending = SearchIndexer()
+        pending.add(Project, 1)
+        flushed = SearchIndexer()
+        flushed.discard(Project, 1)
+
+        pending.merge(flushed)
+
+        assert not pending.index[Project]
+        assert pending.remove[Project] == {1}
+
+
+class TestInvertedIndex:
+    """Test the pure-Python index used by the memory backend."""
+
+    def test_search_ranks_by_weight(self):
+        index = InvertedIndex()
+        index.add(1, [('kasir', 1.0), ('aplikasi toko', 4.0)])
+        index.add(2, [('aplikasi kasir', 4.0), ('toko', 1.0)])
+
+        ranked = index.search(['kasir'], limit=10)
+
+        assert [doc_id for doc_id, _ in ranked] == [2, 1]
+
+    def test_discard(self):
+        index = InvertedIndex()
+        index.add(1, [('aplikasi kasir', 1.0)])
+        index.discard(1)
+
+        assert len(index) == 0
+        assert index.search(['kasir'], limit=10) == []
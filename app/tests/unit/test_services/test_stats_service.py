@@ -0,0 +1,114 @@
+# tests/unit/test_services/test_stats_service.py
+import pytest
+from datetime import date, datetime
+from app.services.stats_service import (
+    bucket_range, bucket_start, breakdown, get_rollup_totals,
+    flush_stats, get_trend_stats, rollup_daily_stats
+)
+from app.services.project_service import get_project_stats
+from app.services.kebutuhan_service import bulk_update_kebutuhan, get_kebutuhan_stats
+from app.database.models import Project, DailyStat
+
+
+class TestStatsService:
+    """Test time-bucketed trend statistics."""
+
+    def test_bucket_start(self):
+        """Test weeks start on Monday and months on the first."""
+        wednesday = date(2024, 5, 15)
+
+        assert bucket_start(wednesday, 'day') == wednesday
+        assert bucket_start(wednesday, 'week') == date(2024, 5, 13)
+        assert bucket_start(wednesday, 'month') == date(2024, 5, 1)
+
+    def test_bucket_range(self):
+        """Test every bucket in the range is listed."""
+        assert bucket_range(date(2024, 1, 30), date(2024, 3, 2), 'month') == [
+            date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)
+        ]
+        assert len(bucket_range(date(2024, 1, 1), date(2024, 1, 7), 'day')) == 7
+
+    def test_get_trend_stats_invalid_bucket(self, db):
+        with pytest.raises(ValueError):
+            get_trend_stats(7, 'year')
+
+    def test_get_trend_stats_zero_fills(self, db, project):
+        """Test every day is present and today's project is counted."""
+        stats = get_trend_stats(7)
+
+        assert len(stats) == 7
+        assert stats[-1]['date'] == datetime.utcnow().strftime('%Y-%m-%d')
+        assert stats[-1]['projects'] == 1
+        assert sum(day['kebutuhan'] for day in stats) == 0
+        assert set(stats[0]) == {'date', 'projects', 'kebutuhan', 'users', 'supports'}
+
+
+class TestDailyStatsRollup:
+    """Test the daily_stats rollup stays in step with the source tables."""
+
+    def snapshot(self):
+        flush_stats()
+        return {
+            (row.date, row.metric, row.dimension): row.value
+            for row in DailyStat.query.all() if row.value
+        }
+
+    def test_rollup_follows_writes(self, db, project):
+        """Test inserts, status changes and deletes adjust the rollup."""
+        assert get_rollup_totals('projects')[''] == 1
+        assert breakdown(get_rollup_totals('projects'), 'status') == {'Aktif': 1}
+
+        project.status = 'Selesai'
+        db.session.commit()
+        assert breakdown(get_rollup_totals('projects'), 'status') == {'Selesai': 1}
+
+        db.session.delete(project)
+        db.session.commit()
+        assert get_rollup_totals('projects') == {}
+
+    def test_deltas_buffered_until_flushed(self, db, user, categories):
+        """Test committed writes reach daily_stats in one batch."""
+        for i in range(3):
+            db.session.add(Project(judul=f'Project {i}', deskripsi='Deskripsi', pengguna_id=user.id,
+                                   kategori_id=categories[0].id))
+            db.session.commit()
+
+        assert DailyStat.query.filter_by(metric='projects').count() == 0
+        assert get_rollup_totals('projects')[''] == 3
+
+        flush_stats()
+        assert DailyStat.query.filter_by(metric='projects', dimension='').one().value == 3
+        assert get_rollup_totals('projects')[''] == 3
+
+    def test_rollup_matches_rebuild(self, db, kebutuhan, user):
+        """Test incremental upkeep agrees with a full rollup-stats run."""
+        bulk_update_kebutuhan([kebutuhan.id], 'approve')
+        incremental = self.snapshot()
+
+        rollup_daily_stats()
+
+        assert self.snapshot() == incremental
+        assert get_kebutuhan_stats()['in_progress'] == 1
+
+    def test_rollup_since_keeps_older_days(self, db, user, categories):
+        old = Project(judul='Lama', deskripsi='Deskripsi', pengguna_id=user.id,
+                      kategori_id=categories[0].id, timestamp=datetime(2020, 1, 1))
+        db.session.add(old)
+        db.session.commit()
+
+        rollup_daily_stats(since=date(2024, 1, 1))
+
+        assert get_rollup_totals('projects')[''] == 1
+
+    def test_trend_stats_from_rollup(self, db, project):
+        """Test weekly buckets sum the daily rollup."""
+        stats = get_trend_stats(30, 'week', series=['projects'])
+
+        assert sum(week['projects'] for week in stats) == 1
+        assert set(stats[0]) == {'date', 'projects'}
+
+    def test_rollup_stats_command(self, runner, db, project):
+        result = runner.invoke(args=['rollup-stats'])
+
+        assert result.exit_code == 0
+        assert get_project_stats()['active'] == 1
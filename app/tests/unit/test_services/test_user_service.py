@@ -0,0 +1,89 @@
+# tests/unit/test_services/test_user_service.py
+from datetime import datetime, timedelta
+from app.services.user_service import get_user_counts, update_user_last_seen
+from app.services.last_seen import flush_last_seen, get_last_seen_tracker
+from app.services.notification_service import create_notification, mark_all_notifications_read
+from app.database.models import Pengguna, Project
+
+
+class TestUserService:
+    """Test user service functions."""
+
+    def test_get_user_counts(self, db, user, project):
+        """Test the per-page counts for a user."""
+        assert get_user_counts(user.id) == {
+            'unread_notifications': 0,
+            'user_projects_count': 1,
+            'user_kebutuhan_count': 0,
+            'user_supports_count': 0
+        }
+
+    def test_get_user_counts_cached(self, db, user, app):
+        """Test repeated calls are served from the cache."""
+        cache = app.extensions['cache']
+        get_user_counts(user.id)
+        hits = cache.stats['hits']
+
+        get_user_counts(user.id)
+
+        assert cache.stats['hits'] == hits + 1
+
+    def test_get_user_counts_invalidated(self, db, user, categories):
+        """Test counts follow committed changes to the user's rows."""
+        assert get_user_counts(user.id)['user_projects_count'] == 0
+
+        db.session.add(Project(judul='Baru', deskripsi='Deskripsi', pengguna_id=user.id,
+                               kategori_id=categories[0].id))
+        db.session.commit()
+        create_notification(user.id, 'info', 'Halo')
+
+        counts = get_user_counts(user.id)
+        assert counts['user_projects_count'] == 1
+        assert counts['unread_notifications'] == 1
+
+        mark_all_notifications_read(user.id)
+        assert get_user_counts(user.id)['unread_notifications'] == 0
+
+    def test_last_seen_coalesced(self, db, user):
+        """Test touches within the granularity window queue no writes."""
+        stale = datetime.utcnow() - timedelta(hours=1)
+        user.last_seen = stale
+        db.session.commit()
+
+        assert update_user_last_seen(user.id) is True
+        assert update_user_last_seen(user.id) is False
+        user.update_last_seen()
+
+        # Not written yet, but loaded users see the queued value
+        stored = db.session.execute(
+            db.select(Pengguna.last_seen).where(Pengguna.id == user.id)
+        ).scalar()
+        assert stored == stale
+        db.session.expire(user)
+        assert user.last_seen > stale
+
+    def test_last_seen_flushed_in_bulk(self, db, user, admin_user):
+        """Test queued timestamps are written in one flush."""
+        now = datetime.utcnow() + timedelta(hours=1)
+        tracker = get_last_seen_tracker()
+        tracker.touch(user.id, now=now)
+        tracker.touch(admin_user.id, now=now)
+
+        assert flush_last_seen() == 2
+        db.session.expire_all()
+
+        assert user.last_seen == now
+        assert admin_user.last_seen == now
+        assert len(tracker) == 0
+
+    def test_last_seen_never_moves_backwards(self, db, user):
+        """Test an older queued timestamp does not overwrite a newer one."""
+        newer = datetime.utcnow() + timedelta(hours=1)
+        user.last_seen = newer
+        db.session.commit()
+
+        get_last_seen_tracker().touch(user.id, now=newer - timedelta(days=1))
+        flush_last_seen()
+        db.session.expire(user)
+
+        assert user.last_seen == newer
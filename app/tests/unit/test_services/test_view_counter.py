@@ -0,0 +1,59 @@
+# tests/unit/test_services/test_view_counter.py
+from app.services.view_counter import flush_views, get_view_counter
+from app.database.models import Project, Kebutuhan
+
+
+def _stored_views(db, model, row_id):
+    return db.session.execute(
+        db.select(model.view_count).where(model.id == row_id)
+    ).scalar()
+
+
+class TestViewCounter:
+    """Test write-behind view counting."""
+
+    def test_views_are_buffered(self, db, project):
+        """Test increment_views does not write to the database."""
+        for _ in range(3):
+            project.increment_views()
+
+        assert project.view_count == 3
+        assert _stored_views(db, Project, project.id) == 0
+        assert get_view_counter().pending(Project, project.id) == 3
+
+    def test_flush_writes_deltas(self, db, project, kebutuhan):
+        """Test buffered views of several models are added in one flush."""
+        project.increment_views()
+        project.increment_views()
+        kebutuhan.increment_views()
+
+        assert flush_views() == 3
+        db.session.expire_all()
+
+        assert _stored_views(db, Project, project.id) == 2
+        assert _stored_views(db, Kebutuhan, kebutuhan.id) == 1
+        assert len(get_view_counter()) == 0
+        assert flush_views() == 0
+
+    def test_loaded_rows_include_pending_views(self, db, project):
+        """Test reads merge views that are not written yet."""
+        project.increment_views()
+        project_id = project.id
+        db.session.expunge_all()
+
+        loaded = Project.query.get(project_id)
+        assert loaded.view_count == 1
+
+        # Expired and reloaded instances keep the buffered views
+        db.session.expire(loaded)
+        assert loaded.view_count == 1
+
+    def test_buffered_views_not_flushed_with_session(self, db, project):
+        """Test committing other changes does not write the live count."""
+        project.increment_views()
+        project.judul = 'Renamed'
+        db.session.commit()
+
+        assert _stored_views(db, Project, project.id) == 0
+        flush_views()
+        assert _stored_views(db, Project, project.id) == 1
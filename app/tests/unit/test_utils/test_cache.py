@@ -0,0 +1,101 @@
+# tests/unit/test_utils/test_cache.py
+import time
+import pytest
+from app.utils.cache import MemoryCache, NullCache, SharedCache, create_cache, make_key
+
+
+@pytest.fixture(params=['memory', 'shared'])
+def cache(request, tmp_path):
+    """Run a test against the per-process and the shared backend."""
+    if request.param == 'memory':
+        return MemoryCache(default_timeout=60, max_size=100)
+    return SharedCache(str(tmp_path / 'cache.sqlite'), default_timeout=60)
+
+
+class TestCacheBackends:
+    """Test behaviour common to all storing backends."""
+
+    def test_set_get_delete(self, cache):
+        cache.set('key', {'a': 1})
+        assert cache.get('key') == {'a': 1}
+
+        cache.delete('key')
+        assert cache.get('key', 'default') == 'default'
+
+    def test_cached_none_is_a_hit(self, cache):
+        cache.set('key', None)
+
+        assert cache.lookup('key') == (True, None)
+        assert cache.stats['hits'] == 1
+
+    def test_expiry(self, cache):
+        cache.set('key', 'value', timeout=1)
+        time.sleep(1.1)
+
+        assert cache.get('key') is None
+        assert cache.stats['misses'] == 1
+
+    def test_tag_invalidation(self, cache):
+        cache.set('one', 1, tags=['projects'])
+        cache.set('two', 2, tags=['projects', 'users'])
+        cache.set('three', 3, tags=['users'])
+
+        cache.invalidate_tags('projects')
+
+        assert cache.get('one') is None
+        assert cache.get('two') is None
+        assert cache.get('three') == 3
+
+    def test_get_or_set(self, cache):
+        calls = []
+        factory = lambda: calls.append(1) or 'value'
+
+        assert cache.get_or_set('key', factory) == 'value'
+        assert cache.get_or_set('key', factory) == 'value'
+        assert len(calls) == 1
+
+    def test_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / 'cache.sqlite')
+        SharedCache(path).set('key', 'value', tags=['t'])
+
+        other = SharedCache(path)
+        assert other.get('key') == 'value'
+        other.invalidate_tags('t')
+        assert SharedCache(path).get('key') is None
+
+
+class TestMemoryCache:
+    def test_lru_eviction(self):
+        cache = MemoryCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.stats['evictions'] == 1
+
+
+class TestCacheHelpers:
+    def test_null_cache(self):
+        cache = NullCache()
+        cache.set('key', 'value')
+
+        assert cache.get('key') is None
+
+    def test_make_key_is_stable(self):
+        assert make_key('f', (1, 'a'), {'b': 2, 'a': 1}) == make_key('f', (1, 'a'), {'a': 1, 'b': 2})
+        assert make_key('f', (1,)) != make_key('f', ('1',))
+
+    def test_make_key_uses_orm_identity(self, db, user, admin_user):
+        assert make_key(user) == make_key(db.session.get(type(user), user.id))
+        assert make_key(user) != make_key(admin_user)
+
+    def test_create_cache(self, tmp_path):
+        assert isinstance(create_cache({'CACHE_TYPE': 'null'}), NullCache)
+        assert isinstance(create_cache({'CACHE_TYPE': 'simple'}), MemoryCache)
+        shared = create_cache({'CACHE_TYPE': 'shared', 'CACHE_PATH': str(tmp_path / 'c.sqlite')})
+        assert isinstance(shared, SharedCache)
+        with pytest.raises(ValueError):
+            create_cache({'CACHE_TYPE': 'unknown'})
@@ -0,0 +1,40 @@
+# tests/unit/test_utils/test_decorators.py
+from app.utils.decorators import cache_result
+from app.utils.cache import invalidate_tags
+
+
+class TestCacheResult:
+    """Test the cache_result decorator."""
+
+    def test_caches_per_arguments(self, app):
+        calls = []
+
+        @cache_result(timeout=60)
+        def square(value):
+            calls.append(value)
+            return value * value
+
+        assert square(3) == 9
+        assert square(3) == 9
+        assert square(4) == 16
+        assert calls == [3, 4]
+
+        square.invalidate(3)
+        square(3)
+        assert calls == [3, 4, 3]
+
+    def test_tags(self, app):
+        calls = []
+
+        @cache_result(timeout=60, tags=lambda user_id: [f'user:{user_id}'])
+        def profile(user_id):
+            calls.append(user_id)
+            return {'id': user_id}
+
+        profile(1)
+        profile(2)
+        invalidate_tags('user:1')
+        profile(1)
+        profile(2)
+
+        assert calls == [1, 2, 1]
@@ -0,0 +1,123 @@
+# tests/unit/test_utils/test_pagination.py
+import pytest
+from datetime import datetime, timedelta
+from app.database.models import Notification
+from app.utils.pagination import count_query, decode_cursor, encode_cursor, keyset_paginate, paginate
+
+
+@pytest.fixture
+def notifications(db, user):
+    """Seven notifications, two pairs sharing a timestamp, newest last."""
+    start = datetime(2024, 1, 1)
+    for i, minutes in enumerate([0, 1, 1, 2, 3, 3, 4]):
+        db.session.add(Notification(
+            user_id=user.id, type='comment', title=f'N{i}', created_at=start + timedelta(minutes=minutes)
+        ))
+    db.session.commit()
+    return Notification.query.filter_by(user_id=user.id)
+
+
+def keyset_page(query, cursor=None, per_page=3, with_total=False):
+    return keyset_paginate(query, Notification.created_at, Notification.id, cursor, per_page, with_total)
+
+
+class TestKeysetPagination:
+    """Test cursor pagination on (timestamp, id)."""
+
+    def test_walks_forward_without_gaps(self, notifications):
+        first = keyset_page(notifications, with_total=True)
+        second = keyset_page(notifications, first.next_cursor)
+        third = keyset_page(notifications, second.next_cursor)
+
+        assert [n.title for n in first.items] == ['N6', 'N5', 'N4']
+        assert [n.title for n in second.items] == ['N3', 'N2', 'N1']
+        assert [n.title for n in third.items] == ['N0']
+        assert first.total == 7 and second.total is None
+        assert not first.has_prev and second.has_prev
+        assert not third.has_next
+
+    def test_walks_back(self, notifications):
+        second = keyset_page(notifications, keyset_page(notifications).next_cursor)
+        third = keyset_page(notifications, second.next_cursor)
+
+        back = keyset_page(notifications, third.prev_cursor)
+        assert [n.title for n in back.items] == ['N3', 'N2', 'N1']
+        assert back.has_next and back.has_prev
+
+        first = keyset_page(notifications, back.prev_cursor)
+        assert [n.title for n in first.items] == ['N6', 'N5', 'N4']
+        assert first.has_next and not first.has_prev
+
+    def test_rows_inserted_meanwhile_do_not_shift_pages(self, db, user, notifications):
+        first = keyset_page(notifications)
+        db.session.add(Notification(user_id=user.id, type='comment', title='Baru', created_at=datetime(2025, 1, 1)))
+        db.session.commit()
+
+        assert [n.title for n in keyset_page(notifications, first.next_cursor).items] == ['N3', 'N2', 'N1']
+
+    def test_default_timestamps_compare_with_cursors(self, db, user, notifications):
+        db.session.add(Notification(user_id=user.id, type='comment', title='Sekarang'))
+        db.session.commit()
+
+        first = keyset_page(notifications, per_page=1)
+        second = keyset_page(notifications, first.next_cursor, per_page=1)
+
+        assert [n.title for n in first.items] == ['Sekarang']
+        assert [n.title for n in second.items] == ['N6']
+
+    def test_empty_query(self, db, user):
+        page = keyset_page(Notification.query.filter_by(user_id=user.id))
+
+        assert page.items == []
+        assert not page.has_next and not page.has_prev
+        assert page.to_dict() == {
+            'per_page': 3, 'has_next': False, 'has_prev': False, 'next_cursor': None, 'prev_cursor': None
+        }
+
+
+class TestCursorEncoding:
+    """Test the opaque cursor tokens."""
+
+    def test_round_trip(self):
+        position = datetime(2024, 5, 6, 7, 8, 9, 123456)
+
+        assert decode_cursor(encode_cursor(position, 42)) == (position, 42, False)
+        assert decode_cursor(encode_cursor(position, 42, backwards=True)) == (position, 42, True)
+
+    @pytest.mark.parametrize('cursor', ['', 'tidak-valid', 'WzEsMiwzXQ', 'eyJhIjoxfQ'])
+    def test_rejects_garbage(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestCountStrategy:
+    """Test exact and estimated totals."""
+
+    def test_small_totals_stay_exact(self, app, notifications, monkeypatch):
+        monkeypatch.setitem(app.config, 'PAGINATION_EXACT_COUNT_LIMIT', 100)
+
+        assert count_query(notifications, estimated=True) == (7, False)
+        assert count_query(notifications, estimated=True) == (7, False)
+
+    def test_large_totals_reuse_cached_count(self, app, db, user, notifications, monkeypatch):
+        monkeypatch.setitem(app.config, 'PAGINATION_EXACT_COUNT_LIMIT', 5)
+        assert count_query(notifications, estimated=True) == (7, False)
+
+        db.session.add(Notification(user_id=user.id, type='comment', title='Baru'))
+        db.session.commit()
+
+        assert count_query(notifications, estimated=True) == (7, True)
+        assert count_query(notifications) == (8, False)
+
+    def test_paginate_flags_estimate(self, app, notifications, monkeypatch):
+        monkeypatch.setitem(app.config, 'PAGINATION_EXACT_COUNT_LIMIT', 5)
+        query = notifications.order_by(Notification.id)
+
+        exact = paginate(query, 1, 3)
+        paginate(query, 1, 3, total_estimated=True)
+        estimated = paginate(query, 2, 3, total_estimated=True)
+
+        assert (exact.total, exact.total_estimated) == (7, False)
+        assert (estimated.total, estimated.total_estimated) == (7, True)
+        assert estimated.pages == 3
+        assert [n.title for n in estimated.items] == ['N3', 'N4', 'N5']
@@ -0,0 +1,40 @@
+# tests/unit/test_utils/test_pubsub.py
+import pytest
+from app.utils.pubsub import SUBSCRIBER_QUEUE_SIZE, MemoryBroker, create_broker
+
+
+class TestMemoryBroker:
+    """Test the per-process broker."""
+
+    def test_publish_reaches_channel_subscribers(self):
+        broker = MemoryBroker()
+        first = broker.subscribe('a')
+        second = broker.subscribe('a')
+        other = broker.subscribe('b')
+
+        assert broker.publish('a', {'n': 1}) == 2
+
+        assert first.get(timeout=0) == {'n': 1}
+        assert second.get(timeout=0) == {'n': 1}
+        assert other.get(timeout=0) is None
+
+    def test_closed_subscription_unsubscribed(self):
+        broker = MemoryBroker()
+        with broker.subscribe('a'):
+            assert broker.subscriber_count('a') == 1
+
+        assert broker.subscriber_count('a') == 0
+        assert broker.publish('a', {'n': 1}) == 0
+
+    def test_slow_subscriber_drops_messages(self):
+        broker = MemoryBroker()
+        subscription = broker.subscribe('a')
+
+        delivered = broker.publish_many(('a', {'n': n}) for n in range(SUBSCRIBER_QUEUE_SIZE + 5))
+
+        assert delivered == SUBSCRIBER_QUEUE_SIZE
+        assert subscription.get(timeout=0) == {'n': 0}
+
+    def test_unknown_type_rejected(self):
+        with pytest.raises(ValueError):
+            create_broker({'PUBSUB_TYPE': 'carrier-pigeon'})
@@ -0,0 +1,42 @@
+# tests/unit/test_utils/test_retention.py
+import pytest
+from datetime import datetime, timedelta
+from app.database.models import AuditLog
+from app.services.audit_service import clean_old_audit_logs
+
+
+@pytest.fixture
+def audit_logs(db, user):
+    """Ten old audit logs interleaved with five recent ones."""
+    old = datetime.utcnow() - timedelta(days=400)
+    now = datetime.utcnow()
+    for i in range(15):
+        db.session.add(AuditLog(user_id=user.id, action=f'action {i}', timestamp=now if i % 3 == 2 else old))
+    db.session.commit()
+
+
+class TestRetention:
+    """Test batched deletion of expired rows."""
+
+    def test_prune_in_batches(self, audit_logs):
+        assert clean_old_audit_logs.run(batch_size=4, sleep=0) == 10
+
+        remaining = AuditLog.query.order_by(AuditLog.id).all()
+        assert [log.action for log in remaining] == [f'action {i}' for i in range(2, 15, 3)]
+
+    def test_dry_run_counts_only(self, audit_logs):
+        assert clean_old_audit_logs.run(dry_run=True) == 10
+        assert AuditLog.query.count() == 15
+
+    def test_nothing_expired(self, db):
+        assert clean_old_audit_logs.run(sleep=0) == 0
+
+    def test_prune_command(self, runner, audit_logs):
+        result = runner.invoke(args=['prune', 'audit-logs', '--dry-run'])
+        assert result.exit_code == 0
+        assert 'Would delete 10 audit log(s).' in result.output
+
+        result = runner.invoke(args=['prune', 'audit-logs', '--batch-size', '3', '--sleep', '0'])
+        assert result.exit_code == 0
+        assert 'Deleted 10 audit log(s).' in result.output
+        assert AuditLog.query.count() == 5
@@ -0,0 +1,121 @@
+# tests/unit/test_utils/test_tasks.py
+import time
+import pytest
+from app.utils.decorators import async_task
+from app.utils.tasks import DONE, FAILED, QUEUED, SQLiteTaskQueue, get_job
+
+CALLS = []
+
+
+@async_task
+def add(a, b):
+    CALLS.append((a, b))
+    return a + b
+
+
+@async_task(max_retries=1)
+def always_fails():
+    CALLS.append('fail')
+    raise RuntimeError('boom')
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    CALLS.clear()
+
+
+@pytest.fixture
+def queue(app, tmp_path):
+    """A SQLite queue without worker threads, drained by the test."""
+    return SQLiteTaskQueue(app, str(tmp_path / 'tasks.sqlite'), max_retries=3, backoff=0, threads=0)
+
+
+class TestSyncTaskQueue:
+    """Test the inline backend used in testing."""
+
+    def test_call_runs_job(self, app):
+        with app.app_context():
+            job_id = add(1, 2)
+            job = get_job(job_id)
+
+        assert CALLS == [(1, 2)]
+        assert job['status'] == DONE
+        assert job['result'] == 3
+
+    def test_run_bypasses_queue(self, app):
+        with app.app_context():
+            assert add.run(2, 3) == 5
+        assert add.__name__ == 'add'
+
+    def test_failed_job_retried(self, app):
+        with app.app_context():
+            job = get_job(always_fails())
+
+        assert CALLS == ['fail', 'fail']
+        assert job['status'] == FAILED
+        assert 'RuntimeError: boom' in job['error']
+
+
+class TestSQLiteTaskQueue:
+    """Test the durable local backend."""
+
+    def test_job_waits_for_worker(self, queue):
+        job_id = queue.enqueue(add.name, (2, 2), {})
+
+        assert queue.get_job(job_id)['status'] == QUEUED
+        assert CALLS == []
+
+        assert queue.run_next('test') is True
+        job = queue.get_job(job_id)
+        assert job['status'] == DONE
+        assert job['result'] == 4
+        assert job['attempts'] == 1
+        assert queue.run_next('test') is False
+
+    def test_enqueue_leaves_job_to_workers(self, app, tmp_path):
+        """Test queueing, e.g. from a CLI command, starts no worker threads."""
+        queue = SQLiteTaskQueue(app, str(tmp_path / 'tasks.sqlite'), threads=1, poll_interval=0)
+        job_id = queue.enqueue(add.name, (5, 5), {})
+        time.sleep(0.1)
+
+        assert queue.get_job(job_id)['status'] == QUEUED
+        assert CALLS == []
+
+    def test_retry_with_backoff(self, app, tmp_path):
+        queue = SQLiteTaskQueue(app, str(tmp_path / 'tasks.sqlite'), backoff=60, threads=0)
+        job_id = queue.enqueue(always_fails.name, (), {}, max_retries=1)
+
+        queue.run_next('test')
+        job = queue.get_job(job_id)
+        assert job['status'] == QUEUED
+        assert job['run_at'] >= time.time() + 55
+        # Not due yet
+        assert queue.run_next('test') is False
+
+    def test_failed_after_retries(self, queue):
+        job_id = queue.enqueue(always_fails.name, (), {}, max_retries=1)
+
+        queue.work(burst=True)
+
+        job = queue.get_job(job_id)
+        assert job['status'] == FAILED
+        assert job['attempts'] == 2
+        assert CALLS == ['fail', 'fail']
+        assert queue.stats()[FAILED] == 1
+
+    def test_stale_running_job_requeued(self, app, tmp_path):
+        queue = SQLiteTaskQueue(app, str(tmp_path / 'tasks.sqlite'), threads=0, timeout=0)
+        job_id = queue.enqueue(add.name, (1, 1), {})
+        # A worker claims the job and dies
+        queue.claim('dead')
+
+        assert queue.run_next('test') is True
+        assert queue.get_job(job_id)['status'] == DONE
+
+    def test_jobs_shared_between_queues(self, app, queue):
+        job_id = queue.enqueue(add.name, (3, 4), {})
+        other = SQLiteTaskQueue(app, queue.path, threads=0)
+
+        other.work(burst=True)
+
+        assert queue.get_job(job_id)['result'] == 7
@@ -0,0 +1,325 @@
+# app/utils/cache.py
+"""Application cache selected by the CACHE_TYPE setting.
+
+* ``null`` - caches nothing
+* ``simple`` - per-process LRU with TTL, bounded by CACHE_MAX_SIZE
+* ``shared`` - SQLite file at CACHE_PATH, shared by all worker processes
+* ``redis`` - Redis at CACHE_REDIS_URL; falls back to ``shared`` when the
+  redis package is not installed
+
+Entries may carry tags. Each tag has a token stored in the cache itself,
+and invalidating the tag replaces the token, so every entry stored under
+the old token misses from then on. Values in the shared backends are
+pickled: cache plain data rather than ORM instances.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Iterable
+
+from flask import current_app, has_app_context
+from sqlalchemy import inspect
+
+try:
+    import redis
+except ImportError:  # Optional dependency
+    redis = None
+
+KEY_PREFIX = "komunitech"
+_MISSING = object()
+
+
+def _canonical(value) -> str:
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_canonical(item) for item in value) + "]"
+    if isinstance(value, (set, frozenset)):
+        return "{" + ",".join(sorted(_canonical(item) for item in value)) + "}"
+    if isinstance(value, dict):
+        return "{" + ",".join(
+            f"{_canonical(key)}:{_canonical(item)}"
+            for key, item in sorted(value.items(), key=lambda pair: _canonical(pair[0]))
+        ) + "}"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+
+    # ORM instances are identified by class and primary key, not by repr()
+    state = inspect(value, raiseerr=False)
+    if state is not None and getattr(state, "identity", None) is not None:
+        return f"{type(value).__name__}{_canonical(state.identity)}"
+    return f"{type(value).__module__}.{type(value).__qualname__}:{value!r}"
+
+
+def make_key(*parts) -> str:
+    """Build a stable cache key from arbitrary arguments."""
+    digest = hashlib.sha1(_canonical(parts).encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{digest}"
+
+
+def _tag_key(tag: str) -> str:
+    return f"{KEY_PREFIX}:tag:{tag}"
+
+
+class BaseCache:
+    """Cache front end; subclasses implement storage of raw entries."""
+
+    def __init__(self, default_timeout: int = 300):
+        self.default_timeout = default_timeout
+        self.stats = Counter()
+
+    # Storage primitives
+
+    def _load(self, key):
+        return None
+
+    def _load_many(self, keys):
+        return [self._load(key) for key in keys]
+
+    def _store(self, key, entry, timeout: int):
+        """Store ``entry``; a timeout of 0 means no expiry."""
+
+    def _remove(self, key):
+        pass
+
+    def clear(self):
+        """Remove every entry."""
+
+    # Public API
+
+    def _tag_tokens(self, tags) -> dict:
+        tags = sorted(set(tags))
+        tokens = {}
+        for tag, token in zip(tags, self._load_many([_tag_key(tag) for tag in tags])):
+            if token is None:
+                token = uuid.uuid4().hex
+                self._store(_tag_key(tag), token, 0)
+            tokens[tag] = token
+        return tokens
+
+    def lookup(self, key: str):
+        """Return ``(found, value)`` so cached ``None`` can be told apart."""
+        entry = self._load(key)
+        if entry is not None:
+            value, tokens = entry
+            if not tokens or self._load_many([_tag_key(tag) for tag in tokens]) == list(tokens.values()):
+                self.stats["hits"] += 1
+                return True, value
+            self._remove(key)
+        self.stats["misses"] += 1
+        return False, None
+
+    def get(self, key: str, default=None):
+        found, value = self.lookup(key)
+        return value if found else default
+
+    def set(self, key: str, value, timeout: int = None, tags: Iterable[str] = ()):
+        timeout = self.default_timeout if timeout is None else timeout
+        self._store(key, (value, self._tag_tokens(tags) if tags else {}), timeout)
+        self.stats["sets"] += 1
+
+    def delete(self, key: str):
+        self._remove(key)
+
+    def get_or_set(self, key: str, factory: Callable[[], Any], timeout: int = None, tags: Iterable[str] = ()):
+        found, value = self.lookup(key)
+        if not found:
+            value = factory()
+            self.set(key, value, timeout, tags)
+        return value
+
+    def invalidate_tags(self, *tags: str):
+        """Expire every entry stored under any of ``tags``."""
+        for tag in tags:
+            self._store(_tag_key(tag), uuid.uuid4().hex, 0)
+        self.stats["invalidations"] += len(tags)
+
+
+class NullCache(BaseCache):
+    """Stores nothing; every lookup misses."""
+
+
+class MemoryCache(BaseCache):
+    """Per-process LRU with per-entry expiry."""
+
+    def __init__(self, default_timeout: int = 300, max_size: int = 1024):
+        super().__init__(default_timeout)
+        self.max_size = max_size
+        self._entries = OrderedDict()  # key -> (expires or None, entry)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires is not None and expires <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key, entry, timeout):
+        expires = time.time() + timeout if timeout else None
+        with self._lock:
+            self._entries[key] = (expires, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def _remove(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedCache(BaseCache):
+    """SQLite file store shared by every process on the host.
+
+    Put CACHE_PATH on a tmpfs such as /dev/shm to keep it in memory.
+    """
+
+    PRUNE_EVERY = 100  # Sets between expiry/size sweeps
+
+    def __init__(self, path: str, default_timeout: int = 300, max_size: int = 10000):
+        super().__init__(default_timeout)
+        self.path = path
+        self.max_size = max_size
+        self._local = threading.local()
+        self._sets = 0
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_cache_expires ON cache (expires)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            self._local.connection = connection
+        return connection
+
+    def _load_many(self, keys):
+        if not keys:
+            return []
+        rows = dict(self._connection().execute(
+            f"SELECT key, value FROM cache WHERE key IN ({','.join('?' * len(keys))}) "
+            "AND (expires IS NULL OR expires > ?)",
+            (*keys, time.time())
+        ).fetchall())
+        return [pickle.loads(rows[key]) if key in rows else None for key in keys]
+
+    def _load(self, key):
+        return self._load_many([key])[0]
+
+    def _store(self, key, entry, timeout):
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, pickle.dumps(entry, pickle.HIGHEST_PROTOCOL), time.time() + timeout if timeout else None)
+        )
+        self._sets += 1
+        if self._sets % self.PRUNE_EVERY == 0:
+            self._prune(connection)
+
+    def _prune(self, connection):
+        connection.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+        # Beyond max_size, drop the entries closest to expiry
+        evicted = connection.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache WHERE expires IS NOT NULL "
+            "ORDER BY expires LIMIT max(0, (SELECT count(*) FROM cache) - ?))",
+            (self.max_size,)
+        ).rowcount
+        self.stats["evictions"] += max(evicted, 0)
+
+    def _remove(self, key):
+        self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache")
+
+
+class RedisCache(BaseCache):
+    """Redis store shared by every process and host."""
+
+    def __init__(self, url: str, default_timeout: int = 300):
+        super().__init__(default_timeout)
+        self.client = redis.Redis.from_url(url)
+
+    def _load_many(self, keys):
+        if not keys:
+            return []
+        return [pickle.loads(raw) if raw is not None else None for raw in self.client.mget(keys)]
+
+    def _load(self, key):
+        return self._load_many([key])[0]
+
+    def _store(self, key, entry, timeout):
+        self.client.set(key, pickle.dumps(entry, pickle.HIGHEST_PROTOCOL), ex=timeout or None)
+
+    def _remove(self, key):
+        self.client.delete(key)
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{KEY_PREFIX}:*"):
+            self.client.delete(key)
+
+
+def create_cache(config) -> BaseCache:
+    """Create the cache backend described by ``config``."""
+    cache_type = config.get("CACHE_TYPE", "simple")
+    timeout = config.get("CACHE_DEFAULT_TIMEOUT", 300)
+
+    if cache_type == "null":
+        return NullCache(timeout)
+    if cache_type == "simple":
+        return MemoryCache(timeout, config.get("CACHE_MAX_SIZE", 1024))
+    if cache_type == "redis" and redis is not None:
+        return RedisCache(config["CACHE_REDIS_URL"], timeout)
+    if cache_type in ("redis", "shared"):
+        path = config.get("CACHE_PATH") or os.path.join(tempfile.gettempdir(), "komunitech-cache.sqlite")
+        return SharedCache(path, timeout, config.get("CACHE_SHARED_MAX_SIZE", 10000))
+    raise ValueError(f"Unknown CACHE_TYPE: {cache_type}")
+
+
+def init_cache(app) -> BaseCache:
+    """Create the cache for ``app``."""
+    cache = create_cache(app.config)
+    if app.config.get("CACHE_TYPE") == "redis" and not isinstance(cache, RedisCache):
+        app.logger.warning("redis package not installed, using the shared file cache")
+    app.extensions["cache"] = cache
+    return cache
+
+
+_null_cache = NullCache()
+
+
+def get_cache() -> BaseCache:
+    """Get the current app's cache, or a null cache outside an app."""
+    if not has_app_context():
+        return _null_cache
+    return current_app.extensions.get("cache", _null_cache)
+
+
+def invalidate_tags(*tags: str):
+    """Expire cached entries of the current app tagged with any of ``tags``."""
+    get_cache().invalidate_tags(*tags)
@@ -2,6 +2,8 @@
 from functools import wraps
 from flask import abort, flash, redirect, url_for, request, jsonify
 from flask_login import current_user
+from app.utils.cache import get_cache, make_key
+from app.utils.tasks import Task
 import time
 
 
@@ -111,39 +113,44 @@ def rate_limit(max_calls=10, period=60):
     return decorator
 
 
-def async_task(f):
-    """Run function asynchronously (requires Celery in production)."""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        # In production, this would queue the task with Celery
-        # For now, run synchronously
-        return f(*args, **kwargs)
+def async_task(f=None, max_retries=None):
+    """Run function in the background task queue (see app.utils.tasks).
+
+    Calling the decorated function queues a job and returns its id rather
+    than the function's result, also with the inline ``sync`` backend; the
+    result is kept on the job, see get_job(). Use ``.run()`` to call it
+    directly. Decorate module-level functions only.
+
+    Args:
+        max_retries: Retries after a failure, TASK_MAX_RETRIES by default
+    """
+    def decorator(f):
+        return Task(f, max_retries)
     
-    return decorated_function
+    return decorator(f) if f is not None else decorator
+
 
+def cache_result(timeout=300, tags=None):
+    """Cache function result in the app cache (see app.utils.cache).
 
-def cache_result(timeout=300):
-    """Cache function result (requires Redis in production)."""
+    Args:
+        timeout: Seconds to keep the result
+        tags: Tags for invalidation, or a callable taking the function's
+            arguments and returning them
+    """
     def decorator(f):
-        cache = {}
-        
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            # Create cache key from function name and arguments
-            key = f"{f.__name__}:{str(args)}:{str(kwargs)}"
-            
-            # Check cache
-            if key in cache:
-                result, timestamp = cache[key]
-                if time.time() - timestamp < timeout:
-                    return result
-            
-            # Call function and cache result
-            result = f(*args, **kwargs)
-            cache[key] = (result, time.time())
-            
-            return result
+            cache = get_cache()
+            key = make_key(f.__module__, f.__qualname__, args, kwargs)
+            entry_tags = tags(*args, **kwargs) if callable(tags) else (tags or ())
+            return cache.get_or_set(key, lambda: f(*args, **kwargs), timeout, entry_tags)
+        
+        def invalidate(*args, **kwargs):
+            """Drop the cached result for these arguments."""
+            get_cache().delete(make_key(f.__module__, f.__qualname__, args, kwargs))
         
+        decorated_function.invalidate = invalidate
         return decorated_function
     
     return decorator
@@ -1,4 +1,14 @@
-from flask import url_for, request
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import NamedTuple, Tuple
+
+from flask import current_app, url_for, request
+from sqlalchemy import literal, tuple_
+
+from app.database.base import db
+from app.utils.cache import get_cache, make_key
 
 
 def generate_pagination_links(paginated_query, endpoint: str, **kwargs):
@@ -27,16 +37,252 @@ def generate_pagination_links(paginated_query, endpoint: str, **kwargs):
     return next_url, prev_url
 
 
-def get_pagination_args(default_page: int = 1, default_per_page: int = 10):
+class PaginationArgs(NamedTuple):
+    page: int
+    per_page: int
+    total_estimated: bool = False
+
+
+def get_pagination_args(default_page: int = 1, default_per_page: int = 10,
+                        total_estimated: bool = False) -> PaginationArgs:
     """Get pagination arguments from request.
 
     Args:
         default_page: Default page number
         default_per_page: Default items per page
+        total_estimated: Let large totals be estimated, see count_query()
 
     Returns:
-        tuple: (page, per_page)
+        PaginationArgs: (page, per_page, total_estimated), the arguments
+        of paginate()
     """
     page = request.args.get("halaman", default_page, type=int)
     per_page = request.args.get("per_halaman", default_per_page, type=int)
-    return page, per_page
+    return PaginationArgs(page, per_page, total_estimated)
+
+
+def count_query(query, estimated: bool = False) -> Tuple[int, bool]:
+    """Count the rows of ``query``.
+
+    With ``estimated``, counts below PAGINATION_EXACT_COUNT_LIMIT stay
+    exact. Above it PostgreSQL returns the planner's row estimate, which
+    costs an EXPLAIN instead of a scan; other databases reuse an exact
+    count cached for PAGINATION_COUNT_CACHE_TTL seconds.
+
+    Returns:
+        tuple: (total, whether it is an estimate)
+    """
+    query = query.order_by(None)
+    if not estimated:
+        return query.count(), False
+
+    limit = current_app.config.get("PAGINATION_EXACT_COUNT_LIMIT", 10000)
+    if db.engine.dialect.name == "postgresql":
+        estimate = _planner_estimate(query)
+        if estimate >= limit:
+            return estimate, True
+        return query.count(), False
+
+    compiled = query.statement.compile(db.engine)
+    key = make_key("count", compiled.string, compiled.params)
+    cache = get_cache()
+    total = cache.get(key)
+    if total is not None:
+        return total, True
+    total = query.count()
+    if total >= limit:
+        cache.set(key, total, timeout=current_app.config.get("PAGINATION_COUNT_CACHE_TTL", 300))
+    return total, False
+
+
+def _planner_estimate(query) -> int:
+    compiled = query.statement.compile(db.engine, compile_kwargs={"render_postcompile": True})
+    plan = db.session.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginate(query, page: int, per_page: int, total_estimated: bool = False):
+    """Paginate ``query`` like ``Query.paginate()``, counting with count_query().
+
+    The result's ``total_estimated`` tells whether ``total`` (and so
+    ``pages``) is an estimate.
+    """
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False, count=not total_estimated)
+    pagination.total_estimated = False
+    if total_estimated:
+        pagination.total, pagination.total_estimated = count_query(query, estimated=True)
+    return pagination
+
+
+class CursorPage:
+    """One page of a keyset-paginated query, newest first.
+
+    ``next_cursor`` and ``prev_cursor`` are opaque tokens for the
+    neighbouring pages, None at either end. ``total`` is only set when
+    it was asked for.
+    """
+
+    def __init__(self, items: list, per_page: int, next_cursor: str = None,
+                 prev_cursor: str = None, total: int = None, total_estimated: bool = False):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+        self.total_estimated = total_estimated
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+    def to_dict(self) -> dict:
+        """Pagination block for JSON responses."""
+        meta = {
+            'per_page': self.per_page,
+            'has_next': self.has_next,
+            'has_prev': self.has_prev,
+            'next_cursor': self.next_cursor,
+            'prev_cursor': self.prev_cursor,
+        }
+        if self.total is not None:
+            meta['total'] = self.total
+            meta['total_estimated'] = self.total_estimated
+        return meta
+
+
+def encode_cursor(timestamp, row_id: int, backwards: bool = False) -> str:
+    """Encode a ``(timestamp, id)`` position as an opaque token."""
+    payload = json.dumps(['p' if backwards else 'n', timestamp.isoformat() if timestamp else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """Decode a token from encode_cursor().
+
+    Returns:
+        tuple: (timestamp, id, backwards)
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, timestamp, row_id = json.loads(payload)
+        if direction not in ('n', 'p') or not isinstance(row_id, int):
+            raise ValueError
+        return datetime.fromisoformat(timestamp) if timestamp else None, row_id, direction == 'p'
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("Cursor tidak valid")
+
+
+def keyset_paginate(query, timestamp, id, cursor: str = None, per_page: int = 20,
+                    with_total: bool = False, total_estimated: bool = False) -> CursorPage:
+    """Paginate ``query`` newest first on ``(timestamp, id)`` without OFFSET.
+
+    Each page continues from the key of the row before it, so every page
+    costs the same as the first; an index on ``(timestamp, id)``, or on
+    the filter columns followed by ``timestamp``, serves it.
+
+    Args:
+        query: Filtered query; its ordering is replaced
+        timestamp: Timestamp column
+        id: Primary key column, the tie breaker
+        cursor: Token from a previous page, None for the first page
+        per_page: Items per page
+        with_total: Also count every row matching ``query``
+        total_estimated: Let a large total be estimated, see count_query()
+
+    Returns:
+        CursorPage: Items and the neighbouring cursors
+
+    Raises:
+        ValueError: If ``cursor`` is malformed
+    """
+    total, estimate = count_query(query, total_estimated) if with_total else (None, False)
+    backwards = False
+
+    key = tuple_(timestamp, id)
+
+    if cursor:
+        position_timestamp, position_id, backwards = decode_cursor(cursor)
+        position = tuple_(literal(position_timestamp, timestamp.type), literal(position_id))
+        query = query.filter(key > position if backwards else key < position)
+
+    order = (timestamp.asc(), id.asc()) if backwards else (timestamp.desc(), id.desc())
+    items = query.order_by(None).order_by(*order).limit(per_page + 1).all()
+    more = len(items) > per_page
+    items = items[:per_page]
+    if backwards:
+        items.reverse()
+
+    def position_of(item, towards_older):
+        return encode_cursor(getattr(item, timestamp.key), getattr(item, id.key), not towards_older)
+
+    has_next = True if backwards else more
+    has_prev = more if backwards else bool(cursor)
+    return CursorPage(
+        items,
+        per_page,
+        next_cursor=position_of(items[-1], True) if items and has_next else None,
+        prev_cursor=position_of(items[0], False) if items and has_prev else None,
+        total=total,
+        total_estimated=estimate,
+    )
+
+
+def generate_cursor_links(page: CursorPage, endpoint: str, **kwargs):
+    """Generate next and previous links for a CursorPage.
+
+    Returns:
+        tuple: (next_url, prev_url)
+    """
+    next_url = url_for(endpoint, cursor=page.next_cursor, **kwargs) if page.has_next else None
+    prev_url = url_for(endpoint, cursor=page.prev_cursor, **kwargs) if page.has_prev else None
+    return next_url, prev_url
+
+
+def get_list_pagination_args(default_per_page: int = 10, max_per_page: int = 100,
+                             total_estimated: bool = False) -> dict:
+    """Get the pagination keyword arguments of a JSON list endpoint.
+
+    A ``page`` argument selects the page-numbered listing, kept for older
+    clients. Otherwise the list is keyset-paginated from the ``cursor``
+    argument and only the first page is counted. ``total_estimated`` lets
+    large totals be estimated, see count_query().
+
+    Returns:
+        dict: Keyword arguments for the list service
+    """
+    args = {"per_page": min(request.args.get("per_page", default_per_page, type=int), max_per_page)}
+    page = request.args.get("page", type=int)
+    if page is not None:
+        args["page"] = page
+    else:
+        cursor = request.args.get("cursor") or None
+        args.update(keyset=True, cursor=cursor, with_total=cursor is None)
+    if total_estimated:
+        args["total_estimated"] = True
+    return args
+
+
+def pagination_meta(result) -> dict:
+    """Pagination block of a JSON response for a Pagination or CursorPage."""
+    if isinstance(result, CursorPage):
+        return result.to_dict()
+    return {
+        "page": result.page,
+        "pages": result.pages,
+        "per_page": result.per_page,
+        "total": result.total,
+        "total_estimated": getattr(result, "total_estimated", False),
+        "has_next": result.has_next,
+        "has_prev": result.has_prev,
+    }
@@ -0,0 +1,183 @@
+# app/utils/pubsub.py
+"""Publish/subscribe broker selected by the PUBSUB_TYPE setting.
+
+* ``memory`` - per-process; subscribers only see messages published by
+  the same worker process
+* ``redis`` - Redis channels at PUBSUB_REDIS_URL, shared by every worker
+  and host; falls back to ``memory`` when the redis package is not installed
+
+Messages are JSON-serializable dicts. Delivery is best effort: a slow
+subscriber drops messages once SUBSCRIBER_QUEUE_SIZE are waiting, and a
+failed publish is logged rather than raised.
+"""
+import json
+import queue
+import threading
+import time
+from typing import Iterable, Optional, Tuple
+
+from flask import current_app
+
+from app.utils.cache import KEY_PREFIX
+
+try:
+    import redis
+except ImportError:  # Optional dependency
+    redis = None
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class MemorySubscription:
+    """Messages for one channel, queued in this process."""
+
+    def __init__(self, broker: "MemoryBroker", channel: str):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue(SUBSCRIBER_QUEUE_SIZE)
+
+    def get(self, timeout: float = None) -> Optional[dict]:
+        """Wait up to ``timeout`` seconds for the next message."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MemoryBroker:
+    """Broker delivering to subscribers of the current process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, channel: str) -> MemorySubscription:
+        subscription = MemorySubscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: MemorySubscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def subscriber_count(self, channel: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+    def publish(self, channel: str, message: dict) -> int:
+        """Deliver ``message`` to the subscribers of ``channel``.
+
+        Returns:
+            int: Number of subscribers the message was queued for
+        """
+        return self.publish_many([(channel, message)])
+
+    def publish_many(self, messages: Iterable[Tuple[str, dict]]) -> int:
+        delivered = 0
+        with self._lock:
+            for channel, message in messages:
+                for subscription in self._subscribers.get(channel, ()):
+                    try:
+                        subscription.queue.put_nowait(message)
+                        delivered += 1
+                    except queue.Full:
+                        pass
+        return delivered
+
+
+class RedisSubscription:
+    """Messages for one channel, read from Redis."""
+
+    def __init__(self, client, channel: str):
+        self.channel = channel
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(_channel_key(channel))
+
+    def get(self, timeout: float = None) -> Optional[dict]:
+        """Wait up to ``timeout`` seconds for the next message."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = 1.0 if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            raw = self.pubsub.get_message(timeout=remaining)
+            if raw is not None and raw["type"] == "message":
+                return json.loads(raw["data"])
+
+    def close(self):
+        self.pubsub.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RedisBroker:
+    """Broker on Redis channels, shared by every process and host."""
+
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url)
+
+    def subscribe(self, channel: str) -> RedisSubscription:
+        return RedisSubscription(self.client, channel)
+
+    def subscriber_count(self, channel: str) -> int:
+        return self.client.pubsub_numsub(_channel_key(channel))[0][1]
+
+    def publish(self, channel: str, message: dict) -> int:
+        return self.publish_many([(channel, message)])
+
+    def publish_many(self, messages: Iterable[Tuple[str, dict]]) -> int:
+        pipeline = self.client.pipeline(transaction=False)
+        for channel, message in messages:
+            pipeline.publish(_channel_key(channel), json.dumps(message))
+        try:
+            return sum(pipeline.execute())
+        except redis.RedisError as e:
+            current_app.logger.warning(f"Publishing to redis failed: {e}")
+            return 0
+
+
+def _channel_key(channel: str) -> str:
+    return f"{KEY_PREFIX}:pubsub:{channel}"
+
+
+def create_broker(config):
+    """Create the broker described by ``config``."""
+    pubsub_type = config.get("PUBSUB_TYPE", "memory")
+
+    if pubsub_type == "redis" and redis is not None:
+        return RedisBroker(config["PUBSUB_REDIS_URL"])
+    if pubsub_type in ("redis", "memory"):
+        return MemoryBroker()
+    raise ValueError(f"Unknown PUBSUB_TYPE: {pubsub_type}")
+
+
+def init_pubsub(app):
+    """Create the pub/sub broker for ``app``."""
+    broker = create_broker(app.config)
+    if app.config.get("PUBSUB_TYPE") == "redis" and not isinstance(broker, RedisBroker):
+        app.logger.warning("redis package not installed, notifications stream from this process only")
+    app.extensions["pubsub"] = broker
+    return broker
+
+
+def get_broker():
+    """Get the current app's pub/sub broker."""
+    return current_app.extensions["pubsub"]
@@ -0,0 +1,79 @@
+# app/utils/retention.py
+"""Delete expired rows in bounded batches.
+
+One ``DELETE ... WHERE created_at < cutoff`` over a large table holds its
+locks, and writes its WAL, for as long as the whole delete takes.
+``prune()`` instead walks the primary key from the smallest ID to the
+largest expired one in windows of ``batch_size`` IDs. Each window is
+deleted and committed in its own transaction, with a pause in between
+so other writers get the table back. The timestamp column needs an index
+for the bounds and dry-run counts to be cheap.
+"""
+import time
+from typing import Callable, Optional
+
+from flask import current_app
+from sqlalchemy import and_, func, select
+
+from app.database.base import db
+
+
+def prune(
+    table,
+    timestamp,
+    cutoff,
+    batch_size: int = None,
+    sleep: float = None,
+    dry_run: bool = False,
+    before_delete: Optional[Callable] = None
+) -> int:
+    """Delete rows of ``table`` whose ``timestamp`` is before ``cutoff``.
+
+    Args:
+        table: Table to prune
+        timestamp: Its timestamp column
+        cutoff: Rows older than this are deleted
+        batch_size: Primary key values per batch, RETENTION_BATCH_SIZE by default
+        sleep: Seconds between batches, RETENTION_BATCH_SLEEP by default
+        dry_run: Only count the rows that would be deleted
+        before_delete: Called as ``before_delete(connection, condition)``
+            in each batch's transaction before its rows are deleted
+
+    Returns:
+        int: Number of rows deleted, or that would be with ``dry_run``
+    """
+    if batch_size is None:
+        batch_size = current_app.config.get("RETENTION_BATCH_SIZE", 5000)
+    if sleep is None:
+        sleep = current_app.config.get("RETENTION_BATCH_SLEEP", 0.1)
+
+    expired = timestamp < cutoff
+    (pk,) = table.primary_key.columns
+
+    with db.engine.connect() as connection:
+        if dry_run:
+            return connection.execute(select(func.count()).select_from(table).where(expired)).scalar()
+        low, high = connection.execute(
+            select(func.min(pk), func.max(pk)).where(expired)
+        ).one()
+    if low is None:
+        return 0
+
+    deleted = batches = 0
+    started = time.perf_counter()
+    while low <= high:
+        condition = and_(pk >= low, pk < low + batch_size, expired)
+        with db.engine.begin() as connection:
+            if before_delete is not None:
+                before_delete(connection, condition)
+            deleted += connection.execute(table.delete().where(condition)).rowcount
+        batches += 1
+        low += batch_size
+        if sleep and low <= high:
+            time.sleep(sleep)
+
+    current_app.logger.info(
+        f"Pruned {deleted} row(s) from {table.name} in {batches} batch(es), "
+        f"{time.perf_counter() - started:.2f}s"
+    )
+    return deleted
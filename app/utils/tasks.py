@@ -0,0 +1,423 @@
+# app/utils/tasks.py
+"""Background jobs selected by the TASK_BACKEND setting.
+
+* ``sync`` - runs each job inline when it is queued; the default outside
+  production
+* ``sqlite`` - durable queue in a SQLite file at TASK_QUEUE_PATH, drained
+  by TASK_WORKER_THREADS threads in every process serving requests and by
+  ``flask task-worker`` processes. CLI commands only queue jobs.
+* ``rq`` - Redis Queue at TASK_REDIS_URL; falls back to ``sqlite`` when the
+  rq package is not installed
+
+Jobs are functions decorated with ``async_task`` (see app.utils.decorators)
+at module level; calling one queues it and returns the job id, not the
+function's result, whatever the backend. The result is kept on the job,
+see get_job(), and ``.run()`` calls the function directly. Arguments and
+results are pickled, so pass ids and plain data rather than ORM
+instances. A failing job is retried up to ``max_retries`` times, waiting
+TASK_RETRY_BACKOFF * 2**n seconds before retry n + 1.
+"""
+import importlib
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter, OrderedDict
+from functools import update_wrapper
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app
+
+from app.database.base import db
+
+try:
+    import redis
+    import rq
+except ImportError:  # Optional dependency
+    rq = None
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_registry: Dict[str, "Task"] = {}
+
+
+class Task:
+    """Function run by the task queue; calling it queues a job."""
+
+    def __init__(self, func: Callable, max_retries: int = None):
+        update_wrapper(self, func)
+        self.func = func
+        self.name = f"{func.__module__}:{func.__qualname__}"
+        self.max_retries = max_retries
+        _registry[self.name] = self
+
+    def __call__(self, *args, **kwargs) -> str:
+        return get_task_queue().enqueue(self.name, args, kwargs, self.max_retries)
+
+    def run(self, *args, **kwargs):
+        """Run the function now, in the caller's context."""
+        return self.func(*args, **kwargs)
+
+
+def _resolve(name: str) -> Task:
+    if name not in _registry:
+        # Importing the module registers its tasks
+        importlib.import_module(name.split(":", 1)[0])
+    return _registry[name]
+
+
+class BaseTaskQueue:
+    """Task queue front end; subclasses implement job storage."""
+
+    def __init__(self, app, max_retries: int = 3, backoff: float = 5):
+        self.app = app
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def enqueue(self, name: str, args: tuple, kwargs: dict, max_retries: int = None) -> str:
+        """Queue a call of task ``name`` and return the job id."""
+        raise NotImplementedError
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get the status of a job, or None if it is unknown."""
+        raise NotImplementedError
+
+    def stats(self) -> Counter:
+        """Count jobs per status."""
+        return Counter()
+
+    def retry_delay(self, attempts: int) -> float:
+        return self.backoff * 2 ** (attempts - 1)
+
+    def execute(self, name: str, args: tuple, kwargs: dict):
+        """Run a job in its own application context and session."""
+        with self.app.app_context():
+            try:
+                return _resolve(name).func(*args, **kwargs)
+            finally:
+                db.session.remove()
+
+
+class SyncTaskQueue(BaseTaskQueue):
+    """Runs jobs inline, retrying at once; keeps recent job statuses."""
+
+    MAX_JOBS = 1000
+
+    def __init__(self, app, max_retries: int = 3, backoff: float = 5):
+        super().__init__(app, max_retries, backoff)
+        self._jobs = OrderedDict()
+
+    def enqueue(self, name, args, kwargs, max_retries=None):
+        max_retries = self.max_retries if max_retries is None else max_retries
+        job = {"id": uuid.uuid4().hex, "name": name, "status": RUNNING, "attempts": 0,
+               "result": None, "error": None, "created_at": time.time(), "finished_at": None}
+        self._jobs[job["id"]] = job
+        while len(self._jobs) > self.MAX_JOBS:
+            self._jobs.popitem(last=False)
+
+        while True:
+            job["attempts"] += 1
+            try:
+                job["result"] = self.execute(name, args, kwargs)
+                job["status"] = DONE
+                break
+            except Exception:
+                job["error"] = traceback.format_exc()
+                if job["attempts"] > max_retries:
+                    job["status"] = FAILED
+                    self.app.logger.error(f"Task {name} failed:\n{job['error']}")
+                    break
+        job["finished_at"] = time.time()
+        return job["id"]
+
+    def get_job(self, job_id):
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    def stats(self):
+        return Counter(job["status"] for job in self._jobs.values())
+
+
+class SQLiteTaskQueue(BaseTaskQueue):
+    """Durable queue in a SQLite file shared by every process on the host.
+
+    Workers claim a job inside BEGIN IMMEDIATE, so each job runs once at a
+    time. Jobs left running longer than ``timeout`` seconds, e.g. by a
+    killed worker, are queued again.
+    """
+
+    PRUNE_EVERY = 100  # Finished jobs between sweeps of old results
+
+    def __init__(self, app, path: str, max_retries: int = 3, backoff: float = 5,
+                 threads: int = 1, poll_interval: float = 1, timeout: float = 600,
+                 result_ttl: float = 86400):
+        super().__init__(app, max_retries, backoff)
+        self.path = path
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._pid = None
+        self._finished = 0
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, name TEXT NOT NULL, payload BLOB NOT NULL, "
+            "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "max_retries INTEGER NOT NULL, run_at REAL NOT NULL, created_at REAL NOT NULL, "
+            "started_at REAL, finished_at REAL, worker TEXT, result BLOB, error TEXT)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_run_at ON jobs (status, run_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork or be shared between threads
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def enqueue(self, name, args, kwargs, max_retries=None):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO jobs (id, name, payload, status, max_retries, run_at, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, name, pickle.dumps((args, kwargs), pickle.HIGHEST_PROTOCOL), QUEUED,
+             self.max_retries if max_retries is None else max_retries, now, now)
+        )
+        self._wake.set()
+        return job_id
+
+    def get_job(self, job_id):
+        row = self._connection().execute(
+            "SELECT id, name, status, attempts, max_retries, run_at, created_at, started_at, "
+            "finished_at, worker, result, error FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = pickle.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def stats(self):
+        return Counter(dict(self._connection().execute(
+            "SELECT status, count(*) FROM jobs GROUP BY status"
+        ).fetchall()))
+
+    def claim(self, worker: str) -> Optional[sqlite3.Row]:
+        """Take the next due job, marking it running."""
+        connection = self._connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "UPDATE jobs SET status = ? WHERE status = ? AND started_at < ?",
+                (QUEUED, RUNNING, now - self.timeout)
+            )
+            row = connection.execute(
+                "SELECT id, name, payload, attempts, max_retries FROM jobs "
+                "WHERE status = ? AND run_at <= ? ORDER BY run_at LIMIT 1",
+                (QUEUED, now)
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ?, worker = ? "
+                    "WHERE id = ?",
+                    (RUNNING, now, worker, row["id"])
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return row
+
+    def run_next(self, worker: str) -> bool:
+        """Run one due job; returns False when none is due."""
+        job = self.claim(worker)
+        if job is None:
+            return False
+
+        connection = self._connection()
+        args, kwargs = pickle.loads(job["payload"])
+        attempts = job["attempts"] + 1
+        try:
+            result = self.execute(job["name"], args, kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            if attempts > job["max_retries"]:
+                self.app.logger.error(f"Task {job['name']} failed after {attempts} attempt(s):\n{error}")
+                connection.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                    (FAILED, time.time(), error, job["id"])
+                )
+            else:
+                connection.execute(
+                    "UPDATE jobs SET status = ?, run_at = ?, error = ? WHERE id = ?",
+                    (QUEUED, time.time() + self.retry_delay(attempts), error, job["id"])
+                )
+            return True
+
+        try:
+            payload = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            payload = pickle.dumps(repr(result), pickle.HIGHEST_PROTOCOL)
+        connection.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = NULL WHERE id = ?",
+            (DONE, time.time(), payload, job["id"])
+        )
+        self._finished += 1
+        if self._finished % self.PRUNE_EVERY == 0:
+            self.prune()
+        return True
+
+    def prune(self) -> int:
+        """Delete finished jobs older than ``result_ttl`` seconds."""
+        return self._connection().execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+            (DONE, FAILED, time.time() - self.result_ttl)
+        ).rowcount
+
+    def work(self, burst: bool = False, stop: threading.Event = None):
+        """Run jobs until ``stop`` is set, or until none is due with ``burst``."""
+        worker = f"{os.uname().nodename}:{os.getpid()}:{threading.get_ident()}"
+        while stop is None or not stop.is_set():
+            try:
+                if self.run_next(worker):
+                    continue
+            except sqlite3.Error:
+                self.app.logger.exception("Task queue unavailable")
+            if burst:
+                return
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start_workers(self, count: int = None):
+        """Start ``count`` worker threads in this process, once per process.
+
+        Called before each request, so only processes serving requests run
+        workers; forked server processes start their own.
+        """
+        count = self.threads if count is None else count
+        if not count:
+            return
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._workers = [
+                threading.Thread(target=self.work, name=f"task-worker-{index}", daemon=True)
+                for index in range(count)
+            ]
+            for thread in self._workers:
+                thread.start()
+
+
+class RQTaskQueue(BaseTaskQueue):
+    """Redis Queue backend; run ``rq worker`` processes to drain it."""
+
+    STATUSES = {"queued": QUEUED, "deferred": QUEUED, "scheduled": QUEUED,
+                "started": RUNNING, "finished": DONE, "failed": FAILED}
+
+    def __init__(self, app, url: str, max_retries: int = 3, backoff: float = 5):
+        super().__init__(app, max_retries, backoff)
+        self.connection = redis.Redis.from_url(url)
+        self.queue = rq.Queue("komunitech", connection=self.connection)
+
+    def enqueue(self, name, args, kwargs, max_retries=None):
+        max_retries = self.max_retries if max_retries is None else max_retries
+        retry = rq.Retry(
+            max=max_retries,
+            interval=[int(self.retry_delay(attempt)) for attempt in range(1, max_retries + 1)]
+        ) if max_retries else None
+        return self.queue.enqueue(run_task, name, args, kwargs, retry=retry).id
+
+    def get_job(self, job_id):
+        try:
+            job = rq.job.Job.fetch(job_id, connection=self.connection)
+        except rq.exceptions.NoSuchJobError:
+            return None
+        return {
+            "id": job.id,
+            "name": job.args[0] if job.args else job.func_name,
+            "status": self.STATUSES.get(job.get_status(), job.get_status()),
+            "result": job.result,
+            "error": job.exc_info,
+            "created_at": job.created_at.timestamp() if job.created_at else None,
+            "finished_at": job.ended_at.timestamp() if job.ended_at else None,
+        }
+
+    def stats(self):
+        return Counter({
+            QUEUED: len(self.queue),
+            RUNNING: self.queue.started_job_registry.count,
+            DONE: self.queue.finished_job_registry.count,
+            FAILED: self.queue.failed_job_registry.count,
+        })
+
+
+_worker_app = None
+
+
+def run_task(name: str, args: tuple, kwargs: dict):
+    """Entry point for rq workers, which run outside the Flask app."""
+    global _worker_app
+    if _worker_app is None:
+        from app import create_app
+        _worker_app = create_app(os.environ.get("FLASK_ENV", "production"))
+    return _worker_app.extensions["task_queue"].execute(name, args, kwargs)
+
+
+def create_task_queue(app) -> BaseTaskQueue:
+    """Create the task queue described by ``app.config``."""
+    config = app.config
+    backend = config.get("TASK_BACKEND", "sqlite")
+    max_retries = config.get("TASK_MAX_RETRIES", 3)
+    backoff = config.get("TASK_RETRY_BACKOFF", 5)
+
+    if backend == "sync":
+        return SyncTaskQueue(app, max_retries, backoff)
+    if backend == "rq" and rq is not None:
+        return RQTaskQueue(app, config["TASK_REDIS_URL"], max_retries, backoff)
+    if backend in ("rq", "sqlite"):
+        path = config.get("TASK_QUEUE_PATH") or os.path.join(tempfile.gettempdir(), "komunitech-tasks.sqlite")
+        return SQLiteTaskQueue(
+            app, path, max_retries, backoff,
+            threads=config.get("TASK_WORKER_THREADS", 1),
+            poll_interval=config.get("TASK_POLL_INTERVAL", 1),
+            timeout=config.get("TASK_TIMEOUT", 600),
+        )
+    raise ValueError(f"Unknown TASK_BACKEND: {backend}")
+
+
+def init_tasks(app) -> BaseTaskQueue:
+    """Create the task queue for ``app``."""
+    queue = create_task_queue(app)
+    if app.config.get("TASK_BACKEND") == "rq" and not isinstance(queue, RQTaskQueue):
+        app.logger.warning("rq package not installed, using the SQLite task queue")
+    if isinstance(queue, SQLiteTaskQueue):
+        app.before_request(queue.start_workers)
+    app.extensions["task_queue"] = queue
+    return queue
+
+
+def get_task_queue() -> BaseTaskQueue:
+    """Get the current app's task queue."""
+    return current_app.extensions["task_queue"]
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Get the status of a job of the current app."""
+    return get_task_queue().get_job(job_id)
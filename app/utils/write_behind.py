@@ -0,0 +1,121 @@
+# app/utils/write_behind.py
+"""Base class for per-process buffers of deferred database writes.
+
+Subclasses collect pending writes with ``_queue()`` and implement
+``_write()``. A daemon thread flushes the buffer every ``interval``
+seconds, or early once ``max_pending`` keys are queued, and whatever is
+left is written at interpreter exit. With ``interval`` None no thread is
+started and the buffer is only written by ``flush()``.
+"""
+import atexit
+import os
+import threading
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database.base import db
+
+
+class WriteBehindBuffer:
+    """Dict of pending writes flushed in batches from a background thread."""
+
+    name = "write-behind"
+
+    def __init__(self, app, interval: float = None, max_pending: int = 10000):
+        self.app = app
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._flushing = {}  # Taken out of _pending, not committed yet
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        atexit.register(self._flush_at_exit)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _merge(self, pending: dict, key, value):
+        """Fold ``value`` into ``pending``; the default keeps the latest."""
+        pending[key] = value
+
+    def _queue(self, key, value):
+        with self._lock:
+            self._merge(self._pending, key, value)
+            full = len(self._pending) >= self.max_pending
+        if self.interval:
+            self._ensure_thread()
+            if full:
+                self._wake.set()
+
+    def _write(self, connection, batch: dict):
+        """Write ``batch`` using ``connection`` inside a transaction."""
+        raise NotImplementedError
+
+    def _written(self, batch: dict):
+        """Called after ``batch`` is committed."""
+
+    def _size(self, batch: dict) -> int:
+        return len(batch)
+
+    def discard(self):
+        """Drop every pending write."""
+        with self._lock:
+            self._pending = {}
+
+    def flush(self) -> int:
+        """Write pending changes in one transaction.
+
+        Returns:
+            int: Size of the batch written, see ``_size()``
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+            if not batch:
+                return 0
+
+            try:
+                with self.app.app_context(), db.engine.begin() as connection:
+                    self._write(connection, batch)
+            except SQLAlchemyError:
+                # Keep the changes for the next attempt
+                with self._lock:
+                    for key, value in batch.items():
+                        self._merge(self._pending, key, value)
+                raise
+            finally:
+                self._flushing = {}
+
+            with self.app.app_context():
+                self._written(batch)
+            return self._size(batch)
+
+    def _ensure_thread(self):
+        # Worker processes forked after startup need their own thread
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                self.app.logger.exception(f"Failed to write {self.name} buffer")
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception:
+            self.app.logger.exception(f"Failed to write {self.name} buffer at exit")
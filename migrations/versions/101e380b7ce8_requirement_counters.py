@@ -0,0 +1,49 @@
+"""requirement support and comment counters
+
+Adds requirements.support_count and comment_count and fills them with the
+same aggregate as `flask recount-counters`. db.create_all() already
+creates the columns on a new database, so each is only added where it is
+missing; the backfill runs either way.
+
+Revision ID: 101e380b7ce8
+Revises: 193aa0027d03
+Create Date: 2026-10-17 01:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '101e380b7ce8'
+down_revision = '193aa0027d03'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ['support_count', 'comment_count']
+
+
+def _existing(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    existing = _existing('requirements')
+    for name in COLUMNS:
+        if name not in existing:
+            op.add_column('requirements', sa.Column(name, sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        "UPDATE requirements SET "
+        "support_count = (SELECT count(supports.id) FROM supports "
+        "WHERE supports.kebutuhan_id = requirements.id), "
+        "comment_count = (SELECT count(comments.id) FROM comments "
+        "WHERE comments.kebutuhan_id = requirements.id)"
+    )
+
+
+def downgrade():
+    existing = _existing('requirements')
+    for name in reversed(COLUMNS):
+        if name in existing:
+            op.drop_column('requirements', name)
@@ -0,0 +1,28 @@
+"""baseline schema
+
+The schema db.create_all() produced before migrations were kept in this
+tree; existing databases are stamped with this revision. It changes
+nothing, the revisions after it bring such a database up to the models.
+
+Revision ID: 193aa0027d03
+Revises:
+Create Date: 2026-10-16 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '193aa0027d03'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    pass
+
+
+def downgrade():
+    pass
@@ -0,0 +1,49 @@
+"""composite indexes for hot queries
+
+Tables are created by db.create_all() at startup, which also creates these
+indexes on a new database but never adds them to an existing table. Each
+index is only created where it is missing, on PostgreSQL CONCURRENTLY so
+writes to large tables are not blocked while it builds.
+
+Revision ID: 2264958c161e
+Revises: 101e380b7ce8
+Create Date: 2026-10-17 00:58:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2264958c161e'
+down_revision = '101e380b7ce8'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_projects_status_timestamp', 'projects', ['status', 'timestamp']),
+    ('ix_requirements_project_status', 'requirements', ['project_id', 'status']),
+    ('ix_requirements_status_timestamp', 'requirements', ['status', 'timestamp']),
+    ('ix_supports_kebutuhan_timestamp', 'supports', ['kebutuhan_id', 'timestamp']),
+    ('ix_comments_kebutuhan_parent_timestamp', 'comments', ['kebutuhan_id', 'parent_id', 'timestamp']),
+    ('ix_notifications_user_read_created', 'notifications', ['user_id', 'is_read', 'created_at']),
+    ('ix_notifications_user_created', 'notifications', ['user_id', 'created_at']),
+]
+
+
+def _existing(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            if name not in _existing(table):
+                op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            if name in _existing(table):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
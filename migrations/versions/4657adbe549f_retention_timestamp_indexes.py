@@ -0,0 +1,54 @@
+"""retention timestamp indexes
+
+Indexes notifications.created_at and audit_logs.timestamp, which bound
+the retention jobs' batches. Each index is only created where it is
+missing, CONCURRENTLY on PostgreSQL unless the table is partitioned,
+which does not support it.
+
+Revision ID: 4657adbe549f
+Revises: bc40becabc56
+Create Date: 2026-10-17 01:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4657adbe549f'
+down_revision = 'bc40becabc56'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_notifications_created_at', 'notifications', ['created_at']),
+    ('ix_audit_logs_timestamp', 'audit_logs', ['timestamp']),
+]
+
+
+def _existing(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _concurrently(table):
+    connection = op.get_bind()
+    if connection.dialect.name != 'postgresql':
+        return False
+    return connection.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :name"
+    ), {'name': table}).first() is None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            if name not in _existing(table):
+                op.create_index(name, table, columns, postgresql_concurrently=_concurrently(table))
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            if name in _existing(table):
+                op.drop_index(name, table_name=table, postgresql_concurrently=_concurrently(table))
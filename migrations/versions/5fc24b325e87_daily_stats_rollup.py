@@ -0,0 +1,75 @@
+"""daily stats rollup
+
+Adds the daily_stats table where it is missing and, while it is empty,
+fills it from the source tables like `flask rollup-stats`. Without this
+the admin dashboard and the project/kebutuhan/support statistics read
+zero for rows created before the rollup existed.
+
+Revision ID: 5fc24b325e87
+Revises: b13c10683854
+Create Date: 2026-10-17 01:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5fc24b325e87'
+down_revision = 'b13c10683854'
+branch_labels = None
+depends_on = None
+
+# metric -> (table, creation timestamp column, {dimension name: column}),
+# as in app.services.stats_service.ROLLUPS
+ROLLUPS = {
+    'projects': ('projects', 'timestamp', {'status': 'status', 'category': 'kategori_id'}),
+    'kebutuhan': ('requirements', 'timestamp', {'status': 'status', 'priority': 'prioritas'}),
+    'users': ('users', 'created_at', {}),
+    'supports': ('supports', 'timestamp', {}),
+}
+
+
+def _day(column):
+    if op.get_bind().dialect.name == 'sqlite':
+        return f"date({column})"
+    return f"CAST({column} AS DATE)"
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'daily_stats' not in inspector.get_table_names():
+        op.create_table(
+            'daily_stats',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('metric', sa.String(length=30), nullable=False),
+            sa.Column('dimension', sa.String(length=60), server_default='', nullable=False),
+            sa.Column('value', sa.Integer(), server_default='0', nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('date', 'metric', 'dimension', name='unique_daily_stat'),
+        )
+    if 'ix_daily_stats_metric_date' not in {index['name'] for index in inspector.get_indexes('daily_stats')}:
+        op.create_index('ix_daily_stats_metric_date', 'daily_stats', ['metric', 'date'])
+
+    connection = op.get_bind()
+    if connection.execute(sa.text("SELECT count(*) FROM daily_stats")).scalar():
+        return
+    for metric, (table, timestamp, dimensions) in ROLLUPS.items():
+        day = _day(timestamp)
+        op.execute(
+            f"INSERT INTO daily_stats (date, metric, dimension, value) "
+            f"SELECT {day}, '{metric}', '', count(*) FROM {table} "
+            f"WHERE {timestamp} IS NOT NULL GROUP BY {day}"
+        )
+        for name, column in dimensions.items():
+            op.execute(
+                f"INSERT INTO daily_stats (date, metric, dimension, value) "
+                f"SELECT {day}, '{metric}', '{name}:' || CAST({column} AS VARCHAR), count(*) FROM {table} "
+                f"WHERE {timestamp} IS NOT NULL AND {column} IS NOT NULL GROUP BY {day}, {column}"
+            )
+
+
+def downgrade():
+    if 'daily_stats' in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table('daily_stats')
@@ -0,0 +1,52 @@
+"""normalise SQLite timestamps
+
+SQLite stores DateTime columns as text and compares them as text. Rows
+written by the func.now() defaults held CURRENT_TIMESTAMP, without the
+microseconds the DateTime type writes, so the two formats did not order
+as instants. Defaults now write the full format; this pads the rows
+written before. Other databases store real timestamps and are skipped.
+
+Revision ID: a906e18be7c0
+Revises: dc3b00c3ce81
+Create Date: 2026-10-17 01:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a906e18be7c0'
+down_revision = 'dc3b00c3ce81'
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ('users', ['created_at', 'last_seen']),
+    ('categories', ['created_at', 'updated_at']),
+    ('projects', ['timestamp', 'updated_at']),
+    ('requirements', ['timestamp', 'updated_at']),
+    ('comments', ['timestamp', 'updated_at']),
+    ('supports', ['timestamp']),
+    ('medias', ['timestamp']),
+    ('notifications', ['created_at']),
+    ('project_collaborators', ['added_at']),
+    ('audit_logs', ['timestamp']),
+]
+
+
+def upgrade():
+    connection = op.get_bind()
+    if connection.dialect.name != 'sqlite':
+        return
+    for table, columns in COLUMNS:
+        for column in columns:
+            # "YYYY-MM-DD HH:MM:SS" is 19 characters
+            connection.execute(sa.text(
+                f"UPDATE {table} SET {column} = {column} || '.000000' WHERE length({column}) = 19"
+            ))
+
+
+def downgrade():
+    # Both formats read back as the same datetime
+    pass
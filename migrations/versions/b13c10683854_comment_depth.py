@@ -0,0 +1,47 @@
+"""comment depth
+
+Adds comments.depth where it is missing and computes it from parent_id,
+one nesting level per UPDATE like rebuild_comment_depths.
+
+Revision ID: b13c10683854
+Revises: 2264958c161e
+Create Date: 2026-10-17 01:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b13c10683854'
+down_revision = '2264958c161e'
+branch_labels = None
+depends_on = None
+
+
+def _existing(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if 'depth' not in _existing('comments'):
+        op.add_column('comments', sa.Column('depth', sa.Integer(), server_default='0', nullable=False))
+
+    connection = op.get_bind()
+    connection.execute(sa.text("UPDATE comments SET depth = 0"))
+    # Each pass moves the replies of the previous level one level deeper,
+    # until a level has no replies
+    level = 1
+    while connection.execute(
+        sa.text(
+            "UPDATE comments SET depth = :level "
+            "WHERE parent_id IN (SELECT id FROM comments WHERE depth = :parent_level)"
+        ),
+        {'level': level, 'parent_level': level - 1},
+    ).rowcount:
+        level += 1
+
+
+def downgrade():
+    if 'depth' in _existing('comments'):
+        op.drop_column('comments', 'depth')
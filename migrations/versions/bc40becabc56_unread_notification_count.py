@@ -0,0 +1,42 @@
+"""unread notification counter
+
+Adds users.unread_notification_count where it is missing and fills it
+from the unread notifications like `flask recount-counters`.
+
+Revision ID: bc40becabc56
+Revises: 5fc24b325e87
+Create Date: 2026-10-17 01:25:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bc40becabc56'
+down_revision = '5fc24b325e87'
+branch_labels = None
+depends_on = None
+
+def _existing_columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if 'unread_notification_count' not in _existing_columns('users'):
+        op.add_column(
+            'users',
+            sa.Column('unread_notification_count', sa.Integer(), server_default='0', nullable=False)
+        )
+    op.get_bind().execute(
+        sa.text(
+            "UPDATE users SET unread_notification_count = (SELECT count(notifications.id) "
+            "FROM notifications WHERE notifications.user_id = users.id AND notifications.is_read = :unread)"
+        ),
+        {'unread': False},
+    )
+
+
+def downgrade():
+    if 'unread_notification_count' in _existing_columns('users'):
+        op.drop_column('users', 'unread_notification_count')
@@ -0,0 +1,99 @@
+"""audit action lookup and audit log indexes
+
+Adds the audit_actions table and audit_logs.action_id, fills action_id
+from action like backfill_action_ids(), and adds the per-user, per-entity
+and per-action listing indexes. Each is only added where it is missing;
+indexes are built CONCURRENTLY on PostgreSQL unless the table is
+partitioned, which does not support it.
+
+Partitioning an existing audit_logs on PostgreSQL is not part of this
+revision: it copies every row while holding the table, so it is a
+separate step run after the upgrade, in a maintenance window:
+
+    flask audit-partitions
+
+Revision ID: dc3b00c3ce81
+Revises: 4657adbe549f
+Create Date: 2026-10-17 01:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'dc3b00c3ce81'
+down_revision = '4657adbe549f'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_audit_logs_user_timestamp', 'audit_logs', ['user_id', 'timestamp']),
+    ('ix_audit_logs_entity_timestamp', 'audit_logs', ['entity_type', 'entity_id', 'timestamp']),
+    ('ix_audit_logs_action_timestamp', 'audit_logs', ['action_id', 'timestamp']),
+]
+
+
+def _existing_tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _existing_columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _concurrently(table):
+    connection = op.get_bind()
+    if connection.dialect.name != 'postgresql':
+        return False
+    return connection.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :name"
+    ), {'name': table}).first() is None
+
+
+def upgrade():
+    if 'audit_actions' not in _existing_tables():
+        op.create_table(
+            'audit_actions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name'),
+        )
+    if 'action_id' not in _existing_columns('audit_logs'):
+        # SQLite cannot add a foreign key in place; batch mode copies the table
+        with op.batch_alter_table('audit_logs') as batch_op:
+            batch_op.add_column(sa.Column('action_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_audit_logs_action_id', 'audit_actions', ['action_id'], ['id'])
+
+    op.execute(
+        "INSERT INTO audit_actions (name) SELECT DISTINCT action FROM audit_logs "
+        "WHERE action_id IS NULL AND action NOT IN (SELECT name FROM audit_actions)"
+    )
+    op.execute(
+        "UPDATE audit_logs SET action_id = (SELECT audit_actions.id FROM audit_actions "
+        "WHERE audit_actions.name = audit_logs.action) WHERE action_id IS NULL"
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            if name not in _existing_indexes(table):
+                op.create_index(name, table, columns, postgresql_concurrently=_concurrently(table))
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            if name in _existing_indexes(table):
+                op.drop_index(name, table_name=table, postgresql_concurrently=_concurrently(table))
+
+    if 'action_id' in _existing_columns('audit_logs'):
+        with op.batch_alter_table('audit_logs') as batch_op:
+            batch_op.drop_column('action_id')
+    if 'audit_actions' in _existing_tables():
+        op.drop_table('audit_actions')